@@ -4,7 +4,8 @@ from elearning.models import (
 
 
     LessonAssignment, LessonProgress, LiveClassSchedule, ModuleAssignment,
-    ModuleProgress, UserProgress, UserActivity,AssignmentSubmission, Assignment, SubscriptionPlan
+    ModuleProgress, UserProgress, UserActivity,AssignmentSubmission, Assignment, SubscriptionPlan,
+    CourseRollup, DailySubmissionCount, LiveClassOccurrence,
 
 
 )
@@ -24,3 +25,6 @@ admin.site.register(Assignment)
 admin.site.register(UserActivity)
 admin.site.register(UserProgress)
 admin.site.register(SubscriptionPlan)
+admin.site.register(CourseRollup)
+admin.site.register(DailySubmissionCount)
+admin.site.register(LiveClassOccurrence)
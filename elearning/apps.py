@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class ElearningConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "elearning"
+
+    def ready(self):
+        from . import signals  # noqa: F401
+        from . import email_templates  # noqa: F401  # compiles the email templates at startup
@@ -0,0 +1,229 @@
+import hashlib
+import time
+from datetime import datetime, timedelta, timezone as dt_timezone
+from functools import lru_cache
+from django.conf import settings
+from django.core import signing
+from django.core.cache import cache
+from django.utils import timezone
+from .models import LiveClassFeedKey, generate_feed_key
+from .occurrences import iter_occurrence_starts, parse_weekdays
+
+FEED_CACHE_TIMEOUT = getattr(settings, 'LIVE_CLASS_FEED_CACHE_TIMEOUT', 3600)
+# How far past the current year the VTIMEZONE lists offset transitions
+FEED_TIMEZONE_YEARS_AHEAD = 5
+FEED_TOKEN_SALT = 'elearning.live-class-feed'
+WEEKDAY_CODES = ['MO', 'TU', 'WE', 'TH', 'FR', 'SA', 'SU']
+
+
+def make_feed_token(user):
+    """
+    Signed token that identifies a user's feed; calendar clients cannot send a JWT.
+
+    It carries the user's current feed key, so rotating the key revokes it.
+    """
+    feed_key, _ = LiveClassFeedKey.objects.get_or_create(user=user)
+    return signing.dumps([user.id, feed_key.key], salt=FEED_TOKEN_SALT)
+
+
+def rotate_feed_token(user):
+    """Replace the user's feed key, revoking every feed URL issued so far, and return a new token."""
+    LiveClassFeedKey.objects.update_or_create(user=user, defaults={'key': generate_feed_key()})
+    return make_feed_token(user)
+
+
+def read_feed_token(token):
+    """Return the user id of a feed token, or None if it is invalid, revoked or its user is inactive."""
+    try:
+        user_id, key = signing.loads(token, salt=FEED_TOKEN_SALT)
+    except (signing.BadSignature, TypeError, ValueError):
+        return None
+    if not LiveClassFeedKey.objects.filter(user_id=user_id, key=key, user__is_active=True).exists():
+        return None
+    return user_id
+
+
+def _user_version_key(user_id):
+    return f'live_class_feed:version:user:{user_id}'
+
+
+def _course_version_key(course_id):
+    return f'live_class_feed:version:course:{course_id}'
+
+
+def bump_feed_versions(user_ids=(), course_ids=()):
+    """Mark the feeds of the given users, and of everyone enrolled in the given courses, as changed."""
+    token = time.time_ns()
+    keys = [_user_version_key(user_id) for user_id in user_ids if user_id]
+    keys += [_course_version_key(course_id) for course_id in course_ids if course_id]
+    cache.set_many({key: token for key in keys}, timeout=None)
+
+
+def get_feed_version(user_id, course_ids):
+    """
+    Return the (etag, last_modified) pair of a user's feed without touching the database.
+
+    Versions are nanosecond timestamps, so the newest one doubles as the
+    Last-Modified time. Missing keys start at the current time.
+    """
+    keys = [_user_version_key(user_id)] + [_course_version_key(course_id) for course_id in sorted(course_ids)]
+    versions = cache.get_many(keys)
+    missing = [key for key in keys if key not in versions]
+    if missing:
+        token = time.time_ns()
+        for key in missing:
+            cache.add(key, token, timeout=None)
+        versions.update(cache.get_many(missing))
+
+    digest = hashlib.md5(repr([(key, versions.get(key)) for key in keys]).encode()).hexdigest()
+    last_modified = max(version for version in versions.values() if version) // 10**9
+    return f'"{digest}"', last_modified
+
+
+def get_cached_feed(user_id, etag):
+    return cache.get(f'live_class_feed:body:{user_id}:{etag}')
+
+
+def cache_feed(user_id, etag, body):
+    cache.set(f'live_class_feed:body:{user_id}:{etag}', body, timeout=FEED_CACHE_TIMEOUT)
+
+
+def _escape(text):
+    return text.replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,').replace('\r\n', '\\n').replace('\n', '\\n')
+
+
+def _fold(line):
+    # Content lines are limited to 75 octets; continuation lines start with a space
+    encoded = line.encode()
+    if len(encoded) <= 75:
+        return line + '\r\n'
+    parts, start = [], 0
+    while start < len(encoded):
+        end = min(start + (75 if not parts else 74), len(encoded))
+        while end < len(encoded) and (encoded[end] & 0xC0) == 0x80:
+            end -= 1
+        parts.append(encoded[start:end].decode())
+        start = end
+    return '\r\n '.join(parts) + '\r\n'
+
+
+def _local(moment):
+    return timezone.localtime(moment, timezone.get_default_timezone()).strftime('%Y%m%dT%H%M%S')
+
+
+def _offset(delta):
+    minutes = int(delta.total_seconds()) // 60
+    return f"{'-' if minutes < 0 else '+'}{abs(minutes) // 60:02d}{abs(minutes) % 60:02d}"
+
+
+def _is_utc(tz):
+    return all(tz.utcoffset(datetime(year, month, 1)) == timedelta() for year in (2000, 2030) for month in (1, 7))
+
+
+@lru_cache(maxsize=16)
+def _timezone_lines(tz, first_year, last_year):
+    """
+    The VTIMEZONE component for ``tz``: its offset at the start of
+    ``first_year``, then every transition up to the end of ``last_year``,
+    each found by scanning days and narrowing down to the minute.
+    """
+    def observance(moment):
+        local = moment.astimezone(tz)
+        return local.utcoffset(), bool(local.dst()), local.tzname()
+
+    moment = datetime(first_year, 1, 1, tzinfo=dt_timezone.utc)
+    end = datetime(last_year + 1, 1, 1, tzinfo=dt_timezone.utc)
+    current = observance(moment)
+    components = [(moment, current[0], current)]
+    while moment < end:
+        following = moment + timedelta(days=1)
+        if observance(following) != current:
+            low, high = moment, following
+            while high - low > timedelta(minutes=1):
+                middle = low + timedelta(minutes=(high - low) // timedelta(minutes=2))
+                low, high = (middle, high) if observance(middle) == current else (low, middle)
+            components.append((high, current[0], observance(high)))
+            current = observance(high)
+        moment = following
+
+    lines = ['BEGIN:VTIMEZONE', f'TZID:{tz}']
+    for start, offset_from, (offset_to, is_dst, name) in components:
+        kind = 'DAYLIGHT' if is_dst else 'STANDARD'
+        lines += [
+            f'BEGIN:{kind}',
+            # Observance starts are written in the local time in force before them
+            f"DTSTART:{(start.replace(tzinfo=None) + offset_from).strftime('%Y%m%dT%H%M%S')}",
+            f'TZOFFSETFROM:{_offset(offset_from)}',
+            f'TZOFFSETTO:{_offset(offset_to)}',
+        ]
+        if name:
+            lines.append(f'TZNAME:{_escape(name)}')
+        lines.append(f'END:{kind}')
+    lines.append('END:VTIMEZONE')
+    return tuple(_fold(line) for line in lines)
+
+
+def _utc(moment):
+    return moment.astimezone(dt_timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+
+
+def _recurrence_rule(schedule, first_start):
+    if schedule.recurrence == 'none':
+        return None
+    if schedule.recurrence == 'daily':
+        rule = 'FREQ=DAILY'
+    else:
+        weekdays = parse_weekdays(schedule.weekdays) or (first_start.weekday(),)
+        rule = 'FREQ=WEEKLY;BYDAY=' + ','.join(WEEKDAY_CODES[day] for day in weekdays)
+    if schedule.occurrence_count is not None:
+        rule += f';COUNT={schedule.occurrence_count}'
+    if schedule.until is not None:
+        last_moment = timezone.make_aware(datetime.combine(schedule.until, datetime.max.time()), timezone.get_default_timezone())
+        rule += f';UNTIL={_utc(last_moment)}'
+    return rule
+
+
+def render_feed(schedules, cancelled, host):
+    """
+    Yield an iCalendar document line by line, one VEVENT per schedule.
+
+    Recurring schedules are written as an RRULE rather than expanded, and
+    cancelled occurrences as EXDATEs, so the feed stays small however far
+    ahead a client looks. Times are in UTC when that is the project time
+    zone; otherwise they are local times with a VTIMEZONE describing the zone.
+
+    :param cancelled: Mapping of schedule id to the start times of its cancelled occurrences
+    """
+    tz = timezone.get_default_timezone()
+    now = timezone.now()
+    stamp = _utc(now)
+    events = [(schedule, next(iter_occurrence_starts(schedule), None)) for schedule in schedules]
+    events = [(schedule, first_start) for schedule, first_start in events if first_start is not None]
+
+    yield _fold('BEGIN:VCALENDAR')
+    yield _fold('VERSION:2.0')
+    yield _fold('PRODID:-//elearning//Live classes//EN')
+    yield _fold('CALSCALE:GREGORIAN')
+    if _is_utc(tz):
+        start_property, exdate_property, moment_format = 'DTSTART', 'EXDATE', _utc
+    else:
+        first_year = min([first_start.year for _, first_start in events], default=now.year)
+        yield from _timezone_lines(tz, min(first_year, now.year), now.year + FEED_TIMEZONE_YEARS_AHEAD)
+        start_property, exdate_property, moment_format = f'DTSTART;TZID={tz}', f'EXDATE;TZID={tz}', _local
+
+    for schedule, first_start in events:
+        yield _fold('BEGIN:VEVENT')
+        yield _fold(f'UID:live-class-{schedule.id}@{host}')
+        yield _fold(f'DTSTAMP:{stamp}')
+        yield _fold(f'{start_property}:{moment_format(first_start)}')
+        yield _fold(f'DURATION:PT{max(int(schedule.duration.total_seconds()), 0)}S')
+        rule = _recurrence_rule(schedule, first_start)
+        if rule:
+            yield _fold(f'RRULE:{rule}')
+        if cancelled.get(schedule.id):
+            yield _fold(f'{exdate_property}:' + ','.join(moment_format(start) for start in cancelled[schedule.id]))
+        yield _fold(f'SUMMARY:{_escape(schedule.title)} ({_escape(schedule.course.name)})')
+        yield _fold(f'DESCRIPTION:{_escape(schedule.description)}')
+        yield _fold(f'LOCATION:{_escape(schedule.room)}')
+        yield _fold('END:VEVENT')
+    yield _fold('END:VCALENDAR')
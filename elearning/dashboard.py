@@ -0,0 +1,133 @@
+import logging
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, wait
+from threading import Lock
+from django.conf import settings
+from django.db import close_old_connections, connection, connections
+from .query_budget import active_recorders, record_into
+
+logger = logging.getLogger(__name__)
+
+
+class DashboardContext:
+    """Per-request state shared by the sections of one dashboard build."""
+
+    def __init__(self, user):
+        self.user = user
+        self._memo = {}
+        self._locks = defaultdict(Lock)
+        self._locks_guard = Lock()
+
+    def memo(self, key, factory):
+        """
+        Compute ``factory()`` once per request and reuse it across sections.
+
+        Safe to call from concurrently evaluated sections: the first caller
+        computes the value while the others wait for it.
+        """
+        with self._locks_guard:
+            lock = self._locks[key]
+        with lock:
+            if key not in self._memo:
+                self._memo[key] = factory()
+        return self._memo[key]
+
+
+class DashboardSection:
+    """
+    An independently computable part of the analytics dashboard.
+
+    ``method`` names the view method that builds the section's keys from a
+    DashboardContext. ``cost`` is the declared weight ('light' or 'heavy');
+    the measured cost (calls, time, queries) accumulates per process and is
+    served to staff by the analytics-dashboard-metrics endpoint.
+    """
+
+    def __init__(self, name, method, cost='light'):
+        self.name = name
+        self.method = method
+        self.cost = cost
+        self.calls = 0
+        self.total_seconds = 0.0
+        self.total_queries = 0
+        self._lock = Lock()
+
+    def evaluate(self, view, context):
+        queries = []
+
+        def count_queries(execute, sql, params, many, query_context):
+            queries.append(sql)
+            return execute(sql, params, many, query_context)
+
+        started = time.perf_counter()
+        with connection.execute_wrapper(count_queries):
+            data = getattr(view, self.method)(context)
+        self.record(time.perf_counter() - started, len(queries))
+        return data
+
+    def record(self, seconds, queries):
+        with self._lock:
+            self.calls += 1
+            self.total_seconds += seconds
+            self.total_queries += queries
+        logger.debug("Dashboard section %s: %.1f ms, %d queries", self.name, seconds * 1000, queries)
+
+    def metrics(self):
+        calls = self.calls or 1
+        return {
+            'cost': self.cost,
+            'calls': self.calls,
+            'avg_ms': round(self.total_seconds * 1000 / calls, 2),
+            'avg_queries': round(self.total_queries / calls, 2),
+        }
+
+
+_executor = None
+_executor_lock = Lock()
+
+
+def get_section_executor():
+    """Process-wide pool bounding how many sections run at once across all requests."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=getattr(settings, 'DASHBOARD_MAX_WORKERS', 4),
+                thread_name_prefix='dashboard-section',
+            )
+    return _executor
+
+
+def _evaluate_in_worker(section, view, context, recorders):
+    # Worker threads get their own database connections; release them like a request would
+    close_old_connections()
+    try:
+        with record_into(recorders):
+            return section.evaluate(view, context)
+    finally:
+        connections.close_all()
+
+
+def evaluate_concurrently(sections, view, context):
+    """
+    Evaluate sections in the shared pool and return their results in section order.
+
+    Sections still queued after DASHBOARD_QUEUE_TIMEOUT seconds, because the
+    pool is busy with other requests, are taken back and evaluated in the
+    calling thread, so a few slow dashboards cannot stall everyone else's.
+    The workers' queries are counted by the query recorders of the calling thread.
+    """
+    executor = get_section_executor()
+    recorders = active_recorders()
+    futures = [executor.submit(_evaluate_in_worker, section, view, context, recorders) for section in sections]
+    wait(futures, timeout=getattr(settings, 'DASHBOARD_QUEUE_TIMEOUT', 1))
+
+    results = []
+    for section, future in zip(sections, futures):
+        if future.cancel():
+            logger.info("Dashboard section %s evaluated in the request thread; the section pool is busy", section.name)
+            results.append(section.evaluate(view, context))
+        else:
+            results.append(future.result())
+    return results
@@ -0,0 +1,80 @@
+import time
+from django.conf import settings
+from django.core.cache import cache
+
+DASHBOARD_CACHE_TIMEOUT = getattr(settings, 'DASHBOARD_CACHE_TIMEOUT', 300)
+
+GLOBAL_VERSION_KEY = 'dashboard:version:global'
+
+
+def _user_version_key(user_id):
+    return f'dashboard:version:user:{user_id}'
+
+
+def _course_version_key(course_id):
+    return f'dashboard:version:course:{course_id}'
+
+
+def _payload_key(user, variant=None):
+    key = f'dashboard:payload:{user.role}:{user.id}'
+    return f'{key}:{variant}' if variant else key
+
+
+def bump_dashboard_versions(user_ids=(), course_ids=()):
+    """
+    Invalidate every cached dashboard that depends on the given users or courses.
+
+    Versions are opaque tokens rather than integers so an evicted key can never
+    come back with a value an old snapshot already holds. The global version
+    is always bumped because the admin dashboard covers every course.
+    """
+    token = time.time_ns()
+    keys = [GLOBAL_VERSION_KEY]
+    keys += [_user_version_key(user_id) for user_id in user_ids if user_id]
+    keys += [_course_version_key(course_id) for course_id in course_ids if course_id]
+    cache.set_many({key: token for key in keys}, timeout=None)
+
+
+def _current_versions(keys):
+    versions = cache.get_many(keys)
+    missing = [key for key in keys if key not in versions]
+    if missing:
+        token = time.time_ns()
+        for key in missing:
+            cache.add(key, token, timeout=None)
+        versions.update(cache.get_many(missing))
+    return versions
+
+
+def _dependency_keys(user, course_ids):
+    if user.role == 'Administrator':
+        return [GLOBAL_VERSION_KEY]
+    return [_user_version_key(user.id)] + [_course_version_key(course_id) for course_id in sorted(course_ids)]
+
+
+def get_cached_dashboard(user, variant=None):
+    """
+    Return the cached dashboard payload for the user, or None if missing or stale.
+
+    ``variant`` names the subset of sections the payload holds; None is the full payload.
+    """
+    entry = cache.get(_payload_key(user, variant))
+    if entry is None:
+        return None
+    if _current_versions(list(entry['versions'])) != entry['versions']:
+        return None
+    return entry['data']
+
+
+def snapshot_dashboard_versions(user, course_ids):
+    """
+    Read the versions a dashboard depends on.
+
+    Take the snapshot before building the payload so a write that lands while
+    it is being computed invalidates the stored entry.
+    """
+    return _current_versions(_dependency_keys(user, course_ids))
+
+
+def cache_dashboard(user, versions, data, variant=None):
+    cache.set(_payload_key(user, variant), {'versions': versions, 'data': data}, timeout=DASHBOARD_CACHE_TIMEOUT)
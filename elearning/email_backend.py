@@ -1,28 +1,175 @@
+import smtplib
+import time
+from collections import defaultdict
+from threading import Lock
 from django.core.mail import get_connection, EmailMessage, EmailMultiAlternatives
+from django.core.mail.backends.smtp import EmailBackend as SMTPBackend
 from django.conf import settings
 
-def send_email(
-    subject : str, message : str, recipient_list : list, from_email=None, 
-    use_accounts_backend=False, use_styling=True,
-):
-    
-    email_user = settings.EMAIL_HOST_USER
-    email_password = settings.EMAIL_HOST_PASSWORD
 
-    # Set up the email connection with the specific credentials
-    connection = get_connection(
+class SMTPSession:
+    def __init__(self, smtp):
+        self.smtp = smtp
+        self.created = time.monotonic()
+        self.last_used = self.created
+        self.sent = 0
+        self.broken = False
+
+
+class SMTPConnectionPool:
+    """
+    Authenticated SMTP sessions kept warm between sends, keyed by server and credentials.
+
+    A session is retired once it is too old or has sent too many messages,
+    and one that sat idle is checked with NOOP before reuse, so sessions the
+    server dropped are replaced instead of failing a send.
+    """
+
+    def __init__(self, max_idle=4, max_age=300, max_messages=100, check_after=30):
+        self.max_idle = max_idle
+        self.max_age = max_age
+        self.max_messages = max_messages
+        self.check_after = check_after
+        self._idle = defaultdict(list)
+        self._lock = Lock()
+        self.created = 0
+        self.reused = 0
+
+    def acquire(self, key, connect):
+        while True:
+            with self._lock:
+                session = self._idle[key].pop() if self._idle[key] else None
+            if session is None:
+                break
+            if self._is_fresh(session) and self._is_alive(session):
+                self.reused += 1
+                return session
+            self._discard(session)
+
+        smtp = connect()
+        if smtp is None:
+            return None
+        self.created += 1
+        return SMTPSession(smtp)
+
+    def release(self, key, session):
+        session.last_used = time.monotonic()
+        if self._is_fresh(session):
+            with self._lock:
+                if len(self._idle[key]) < self.max_idle:
+                    self._idle[key].append(session)
+                    return
+        self._discard(session)
+
+    def clear(self):
+        with self._lock:
+            sessions = [session for sessions in self._idle.values() for session in sessions]
+            self._idle.clear()
+        for session in sessions:
+            self._discard(session)
+
+    def _is_fresh(self, session):
+        return (
+            not session.broken
+            and time.monotonic() - session.created < self.max_age
+            and session.sent < self.max_messages
+        )
+
+    def _is_alive(self, session):
+        if time.monotonic() - session.last_used < self.check_after:
+            return True
+        try:
+            return session.smtp.noop()[0] == 250
+        except (smtplib.SMTPException, OSError):
+            return False
+
+    def _discard(self, session):
+        try:
+            session.smtp.quit()
+        except (smtplib.SMTPException, OSError):
+            session.smtp.close()
+
+
+smtp_pool = SMTPConnectionPool(
+    max_idle=getattr(settings, 'EMAIL_POOL_MAX_IDLE', 4),
+    max_age=getattr(settings, 'EMAIL_POOL_MAX_AGE', 300),
+    max_messages=getattr(settings, 'EMAIL_POOL_MAX_MESSAGES', 100),
+    check_after=getattr(settings, 'EMAIL_POOL_CHECK_AFTER', 30),
+)
+
+
+class PooledSMTPBackend(SMTPBackend):
+    """
+    SMTP backend that borrows sessions from ``smtp_pool`` instead of dialling
+    and authenticating for every send. ``close()`` returns the session to the
+    pool rather than quitting it.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.session = None
+
+    def pool_key(self):
+        return (self.host, self.port, self.username, self.password, self.use_tls, self.use_ssl)
+
+    def connect(self):
+        if not super().open():
+            return None
+        smtp, self.connection = self.connection, None
+        return smtp
+
+    def open(self):
+        if self.connection:
+            return False
+        self.session = smtp_pool.acquire(self.pool_key(), self.connect)
+        if self.session is None:
+            return None
+        self.connection = self.session.smtp
+        return True
+
+    def close(self):
+        if self.connection is None:
+            return
+        session, self.session, self.connection = self.session, None, None
+        smtp_pool.release(self.pool_key(), session)
+
+    def _send(self, email_message):
+        try:
+            sent = super()._send(email_message)
+        except (smtplib.SMTPServerDisconnected, OSError):
+            self.session.broken = True
+            raise
+        if sent:
+            self.session.sent += 1
+        return sent
+
+
+def get_email_connection():
+    """Connection of the configured backend with the project's SMTP credentials; share it to send several messages."""
+    return get_connection(
         host=settings.EMAIL_HOST,
         port=settings.EMAIL_PORT,
-        username=email_user,
-        password=email_password,
+        username=settings.EMAIL_HOST_USER,
+        password=settings.EMAIL_HOST_PASSWORD,
         use_tls=settings.EMAIL_USE_TLS,
         use_ssl=settings.EMAIL_USE_SSL
     )
+
+
+def send_email(
+    subject : str, message : str, recipient_list : list, from_email=None, 
+    use_accounts_backend=False, use_styling=True, connection=None, html_message=None,
+):
+    
+    email_user = settings.EMAIL_HOST_USER
+
+    # Pass a shared connection to send several messages over one session
+    connection = connection or get_email_connection()
     
     
     
     # Send the email
-    if use_styling:
+    if use_styling or html_message:
         email = EmailMultiAlternatives(
             subject,
             body=message,
@@ -30,6 +177,9 @@ def send_email(
             to=recipient_list,
             connection=connection
         )
+        # Registered templates pass precompiled HTML
+        if html_message:
+            email.attach_alternative(html_message, "text/html")
     else:
         email = EmailMessage(
             subject,
@@ -40,8 +190,3 @@ def send_email(
         )
     
     return email
-    
-    if(use_styling):
-        email.attach_alternative(html_message, "text/html")
-        
-    email.send()
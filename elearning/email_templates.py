@@ -0,0 +1,258 @@
+import re
+from html import escape
+from string import Formatter
+from textwrap import dedent
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives
+
+# Styles inlined into the HTML at build time; mail clients drop <style> blocks
+EMAIL_STYLES = {
+    'body': 'margin:0;padding:0;background-color:#f4f5f7;',
+    'table': 'width:100%;border-collapse:collapse;',
+    'td': 'padding:24px;',
+    'p': 'margin:0 0 16px;font-family:Arial,Helvetica,sans-serif;font-size:15px;line-height:1.5;color:#1f2933;',
+    '.card': 'max-width:600px;margin:24px auto;background-color:#ffffff;border-radius:6px;',
+    '.footer': 'font-size:12px;color:#7b8794;',
+}
+
+EMAIL_LAYOUT = """<!DOCTYPE html>
+<html><body><table class="card" role="presentation"><tr><td>{content}</td></tr></table>
+<table role="presentation"><tr><td><p class="footer">This is an automated message, please do not reply.</p></td></tr></table>
+</body></html>"""
+
+_OPENING_TAG = re.compile(r'<([a-zA-Z][a-zA-Z0-9]*)((?:\s[^<>]*?)?)(/?)>')
+_CLASS_ATTRIBUTE = re.compile(r'\sclass="([^"]*)"')
+_STYLE_ATTRIBUTE = re.compile(r'\sstyle="([^"]*)"')
+
+
+def inline_css(html, styles=EMAIL_STYLES):
+    """Copy tag and ``.class`` styles into each opening tag's style attribute, ahead of any style it already has."""
+
+    def apply(match):
+        tag, attributes, closing = match.groups()
+        classes = _CLASS_ATTRIBUTE.search(attributes)
+        declarations = [styles.get(tag.lower(), '')]
+        declarations += [styles.get(f'.{name}', '') for name in (classes.group(1).split() if classes else [])]
+        existing = _STYLE_ATTRIBUTE.search(attributes)
+        if existing:
+            declarations.append(existing.group(1))
+            attributes = _STYLE_ATTRIBUTE.sub('', attributes)
+        style = ''.join(declaration for declaration in declarations if declaration)
+        if style:
+            attributes += f' style="{escape(style)}"'
+        return f'<{tag}{attributes}{closing}>'
+
+    return _OPENING_TAG.sub(apply, html)
+
+
+STYLED_LAYOUT = inline_css(EMAIL_LAYOUT)
+STYLED_PARAGRAPH = inline_css('<p>')
+
+
+def text_to_html(text, paragraph_tag='<p>'):
+    """Plain text as HTML paragraphs; ``{placeholders}`` pass through untouched."""
+    paragraphs = [paragraph.strip() for paragraph in re.split(r'\n\s*\n', text.strip())]
+    return ''.join(
+        f'{paragraph_tag}{escape(paragraph, quote=False).replace(chr(10), "<br>")}</p>' for paragraph in paragraphs if paragraph
+    )
+
+
+def styled_html(text):
+    """Plain text in the styled email layout, for messages sent without a registered template."""
+    return STYLED_LAYOUT.replace('{content}', text_to_html(dedent(text), STYLED_PARAGRAPH))
+
+
+def _fields(source, name):
+    fields = set()
+    for _, field, spec, conversion in Formatter().parse(source):
+        if field is None:
+            continue
+        if not field.isidentifier() or spec or conversion:
+            raise ValueError(f"Email template {name!r}: only plain {{name}} placeholders are supported, got {{{field}}}")
+        fields.add(field)
+    return frozenset(fields)
+
+
+class RenderedEmail:
+    __slots__ = ('subject', 'text', 'html')
+
+    def __init__(self, subject, text, html):
+        self.subject = subject
+        self.text = text
+        self.html = html
+
+
+class EmailTemplate:
+    """
+    Subject, text and HTML bodies compiled once: the text is dedented, the
+    HTML (derived from the text unless given) is wrapped in the layout with
+    its CSS already inlined, and placeholders are validated. Rendering is
+    just ``str.format_map``, with values HTML-escaped for the HTML part.
+    """
+
+    def __init__(self, name, subject, text, html=None):
+        self.name = name
+        self.subject = subject
+        self.text = dedent(text).strip() + '\n'
+        self.html = inline_css(EMAIL_LAYOUT.replace('{content}', html if html is not None else text_to_html(self.text)))
+        self.html_fields = _fields(self.html, name)
+        self.fields = _fields(self.subject, name) | _fields(self.text, name) | self.html_fields
+
+    def render(self, context):
+        missing = self.fields - context.keys()
+        if missing:
+            raise KeyError(f"Email template {self.name!r} is missing {', '.join(sorted(missing))}")
+        html_context = {field: escape(str(context[field])) for field in self.html_fields}
+        return RenderedEmail(self.subject.format_map(context), self.text.format_map(context), self.html.format_map(html_context))
+
+
+class EmailTemplateRegistry:
+    def __init__(self):
+        self._templates = {}
+
+    def register(self, name, subject, text, html=None):
+        self._templates[name] = EmailTemplate(name, subject, text, html)
+        return self._templates[name]
+
+    def get(self, name):
+        return self._templates[name]
+
+    def render(self, name, context):
+        return self._templates[name].render(context)
+
+    def render_many(self, name, contexts):
+        """Render one template for many recipients, e.g. when fanning out."""
+        template = self._templates[name]
+        return [template.render(context) for context in contexts]
+
+    def build_message(self, name, context, to, from_email=None, connection=None):
+        """
+        An EmailMultiAlternatives with the text body and the HTML alternative,
+        on the project's SMTP connection unless ``connection`` is given.
+        """
+        return _to_message(self.render(name, context), to, from_email, connection)
+
+    def build_messages(self, name, recipients, from_email=None, connection=None):
+        """
+        Messages for ``(to, context)`` pairs; send them with one
+        ``connection.send_messages()`` call.
+        """
+        recipients = list(recipients)
+        connection = connection or _default_connection()
+        rendered = self.render_many(name, [context for _, context in recipients])
+        return [_to_message(email, to, from_email, connection) for email, (to, _) in zip(rendered, recipients)]
+
+
+def _default_connection():
+    # Imported here: the email backend module imports this one
+    from .email_backend import get_email_connection
+    return get_email_connection()
+
+
+def _to_message(email, to, from_email, connection):
+    message = EmailMultiAlternatives(
+        email.subject, email.text, from_email or settings.EMAIL_HOST_USER,
+        to=to if isinstance(to, (list, tuple)) else [to], connection=connection or _default_connection(),
+    )
+    message.attach_alternative(email.html, 'text/html')
+    return message
+
+
+email_templates = EmailTemplateRegistry()
+
+email_templates.register(
+    'registration_welcome',
+    subject="Welcome to My Site!",
+    text="""
+    Hi {username},
+
+    Thank you for registering with My Site. We are excited to have you on board as a {role}!
+
+    If you have any questions or need assistance, feel free to reach out to our support team.
+
+    Best regards,
+    My Site Team
+    """,
+)
+
+email_templates.register(
+    'registration_notice',
+    subject="New User Registration Notification",
+    text="""
+    A new user has registered on My Site.
+
+    Details:
+    Name: {first_name} {last_name}
+    Username: {username}
+    Email: {email}
+    Role: {role}
+
+    Please follow up as necessary.
+
+    Best regards,
+    System Notification
+    """,
+)
+
+email_templates.register(
+    'invitation',
+    subject="Invitation to join My Site as a {role}",
+    text="""
+    Hello {username},
+
+    You have been invited to join our platform as a {role}. Below are your login credentials to access your account:
+
+    Login Details:
+    Email: {email}
+    Password: {password}
+
+    Please log in to your account using the link below and update your password for security purposes:
+
+    {login_url}
+
+    We are excited to have you on board. If you have any questions or need assistance, feel free to reach out to us at {support_email}.
+
+    Best regards,
+    My Site Team
+    """,
+)
+
+email_templates.register(
+    'invitation_notice',
+    subject="New {role} Invitation",
+    text="""
+    {inviter_email} has invited a new {role}.
+
+    Details:
+    Email: {email}
+
+    Please follow up as necessary.
+
+    Best regards,
+    System Notification
+    """,
+)
+
+email_templates.register(
+    'new_device_alert',
+    subject="Security Alert: New Device Login Notification",
+    text="""
+    Dear {email},
+
+    We wanted to inform you that a new device has logged into your wHTa Networks account. For your security, we want to ensure that it was you who authorized this login.
+
+    Login Details:
+    Date and Time: {login_time}
+    Device: {device}
+    Location: {city}
+
+    If this login was authorized by you, no further action is needed. However, if you do not recognize this activity, please follow these steps immediately:
+    Change Your Password: [link to change password]
+    Report Unauthorized Access: Contact Support via the form on the website.
+    Review Account Activity: [link to account activities]
+
+    Your security is our priority, and we are here to assist you with any concerns.
+
+    Best Regards,
+    """,
+)
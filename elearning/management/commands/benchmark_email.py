@@ -0,0 +1,94 @@
+import socketserver
+import threading
+import time
+from django.core.mail import EmailMessage
+from django.core.mail.backends.smtp import EmailBackend as SMTPBackend
+from django.core.management.base import BaseCommand
+from elearning.email_backend import PooledSMTPBackend, smtp_pool
+
+
+class StandInSMTPHandler(socketserver.StreamRequestHandler):
+    """Minimal SMTP server that accepts everything; ``server.setup_delay`` stands in for TCP/TLS/AUTH setup."""
+
+    def reply(self, line):
+        self.wfile.write(f'{line}\r\n'.encode())
+
+    def handle(self):
+        time.sleep(self.server.setup_delay)
+        self.reply('220 stand-in ESMTP')
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line.decode(errors='replace').strip().upper()
+            if command.startswith('EHLO'):
+                self.reply('250-stand-in')
+                self.reply('250 8BITMIME')
+            elif command == 'DATA':
+                self.reply('354 End data with <CR><LF>.<CR><LF>')
+                while self.rfile.readline() not in (b'.\r\n', b'.\n', b''):
+                    pass
+                self.server.received += 1
+                self.reply('250 OK')
+            elif command == 'QUIT':
+                self.reply('221 Bye')
+                return
+            else:
+                self.reply('250 OK')
+
+
+class StandInSMTPServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, setup_delay):
+        super().__init__(('127.0.0.1', 0), StandInSMTPHandler)
+        self.setup_delay = setup_delay
+        self.received = 0
+
+
+class Command(BaseCommand):
+    help = "Compare per-message, pooled and batched SMTP sending against a local stand-in server."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--messages', type=int, default=200, help="Messages sent per strategy.")
+        parser.add_argument('--setup-ms', type=float, default=20.0,
+                            help="Simulated connection setup cost (TCP, TLS and AUTH) in milliseconds.")
+
+    def handle(self, *args, **options):
+        server = StandInSMTPServer(options['setup_ms'] / 1000)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        host, port = server.server_address
+        count = options['messages']
+        messages = [
+            EmailMessage(f'Benchmark {index}', 'Body', 'bench@example.com', [f'user{index}@example.com'])
+            for index in range(count)
+        ]
+
+        def per_message():
+            # What send_email(...).send() did: a new connection for every message
+            for message in messages:
+                SMTPBackend(host=host, port=port).send_messages([message])
+
+        def pooled():
+            for message in messages:
+                PooledSMTPBackend(host=host, port=port).send_messages([message])
+
+        def batched():
+            PooledSMTPBackend(host=host, port=port).send_messages(messages)
+
+        try:
+            for name, run in [('per-message connection', per_message), ('pooled sessions', pooled), ('one batch', batched)]:
+                smtp_pool.clear()
+                received = server.received
+                started = time.perf_counter()
+                run()
+                elapsed = time.perf_counter() - started
+                self.stdout.write(
+                    f"{name:<24} {server.received - received:>5} messages in {elapsed * 1000:8.1f} ms "
+                    f"({count / elapsed:8.1f}/s)"
+                )
+        finally:
+            smtp_pool.clear()
+            server.shutdown()
+            server.server_close()
@@ -0,0 +1,70 @@
+import time
+from django.core.management.base import BaseCommand
+from django.template import Context, Engine
+from elearning.email_templates import email_templates, styled_html
+
+
+class Command(BaseCommand):
+    help = "Measure email body renders per second: inline f-strings, Django templates and the precompiled registry."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--renders', type=int, default=20000, help="Renders per strategy.")
+        parser.add_argument('--template', default='invitation', help="Registered template to render.")
+
+    def handle(self, *args, **options):
+        count = options['renders']
+        template = email_templates.get(options['template'])
+        contexts = [
+            {field: f'{field}-{index}' for field in template.fields}
+            for index in range(count)
+        ]
+        engine = Engine()
+        django_source = template.html.replace('{', '{{ ').replace('}', ' }}')
+        django_template = engine.from_string(django_source)
+
+        def inline_text():
+            # What send_mails did: an f-string body built per message, text only
+            for context in contexts:
+                f"""
+                Hello {context['username']},
+
+                You have been invited to join our platform as a {context['role']}.
+                Email: {context['email']}
+                Password: {context['password']}
+
+                {context['login_url']}
+                """
+
+        def runtime_styling():
+            # send_email(use_styling=True) without a template: layout built from the text per message
+            for context in contexts:
+                styled_html(template.text.format_map(context))
+
+        def django_per_render():
+            for context in contexts[:max(count // 10, 1)]:
+                engine.from_string(django_source).render(Context(context))
+
+        def django_compiled():
+            for context in contexts:
+                django_template.render(Context(context))
+
+        def registry_render():
+            for context in contexts:
+                template.render(context)
+
+        def registry_render_many():
+            email_templates.render_many(options['template'], contexts)
+
+        strategies = [
+            ('inline f-string (text)', inline_text, count),
+            ('runtime styled HTML', runtime_styling, count),
+            ('Django, compiled per render', django_per_render, max(count // 10, 1)),
+            ('Django, compiled once', django_compiled, count),
+            ('registry render', registry_render, count),
+            ('registry render_many', registry_render_many, count),
+        ]
+        for name, run, renders in strategies:
+            started = time.perf_counter()
+            run()
+            elapsed = time.perf_counter() - started
+            self.stdout.write(f"{name:<30} {renders:>7} renders in {elapsed * 1000:8.1f} ms ({renders / elapsed:10.0f}/s)")
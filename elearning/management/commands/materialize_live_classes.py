@@ -0,0 +1,18 @@
+from datetime import timedelta
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from elearning.models import LiveClassSchedule
+from elearning.occurrences import LIVE_CLASS_HORIZON_DAYS, materialize_occurrences
+
+
+class Command(BaseCommand):
+    help = "Extend the materialized live class occurrences over the rolling window. Run daily."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=LIVE_CLASS_HORIZON_DAYS, help="How many days ahead to generate.")
+
+    def handle(self, *args, **options):
+        start = timezone.now()
+        schedules = LiveClassSchedule.objects.filter(is_active=True).iterator()
+        count = materialize_occurrences(schedules, start=start, end=start + timedelta(days=options['days']))
+        self.stdout.write(self.style.SUCCESS(f"Materialized {count} live class occurrence(s)."))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+from elearning.rollups import rebuild_course_rollups
+
+
+class Command(BaseCommand):
+    help = "Rebuild the per-course dashboard rollups from enrollments, assignments and submissions."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--course', type=int, action='append', dest='courses',
+                            help="Only rebuild the given course id (repeatable).")
+
+    def handle(self, *args, **options):
+        count = rebuild_course_rollups(options['courses'])
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {count} course rollup(s)."))
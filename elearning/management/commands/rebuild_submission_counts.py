@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from elearning.rollups import rebuild_daily_submission_counts
+
+
+class Command(BaseCommand):
+    help = "Backfill the daily submission counters used by the dashboard submission charts."
+
+    def handle(self, *args, **options):
+        count = rebuild_daily_submission_counts()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {count} daily submission counter(s)."))
@@ -0,0 +1,44 @@
+from django.core.management.base import BaseCommand
+from elearning.models import Enrollment
+from elearning.progress import get_user_course_progress, rebuild_progress_store, sync_user_progress
+from elearning.utils import calculate_user_progress
+
+
+class Command(BaseCommand):
+    help = "Verify the progress store against calculate_user_progress for every enrollment."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--course', type=int, action='append', dest='courses',
+                            help="Only check the given course id (repeatable).")
+        parser.add_argument('--fix', action='store_true',
+                            help="Rebuild the store for mismatched courses and resync derived progress.")
+
+    def handle(self, *args, **options):
+        enrollments = Enrollment.objects.select_related('student__user', 'course')
+        if options['courses']:
+            enrollments = enrollments.filter(course_id__in=options['courses'])
+
+        mismatched = []
+        checked = 0
+        for enrollment in enrollments.iterator():
+            user, course = enrollment.student.user, enrollment.course
+            expected = calculate_user_progress(user, course)
+            actual = get_user_course_progress(user, course)
+            checked += 1
+
+            expected_modules = [module['progress'] for module in expected['module_progresses']]
+            actual_modules = [module['progress'] for module in actual['module_progresses']]
+            if expected['course_progress'] != actual['course_progress'] or expected_modules != actual_modules:
+                mismatched.append((user.id, course.id))
+                self.stdout.write(self.style.WARNING(
+                    f"{user.username} / {course.name}: store {actual['course_progress']}% "
+                    f"!= computed {expected['course_progress']}%"
+                ))
+
+        self.stdout.write(f"Checked {checked} enrollment(s), {len(mismatched)} mismatch(es).")
+
+        if options['fix'] and mismatched:
+            rebuild_progress_store({course_id for _, course_id in mismatched})
+            for user_id, course_id in mismatched:
+                sync_user_progress(user_id, course_id)
+            self.stdout.write(self.style.SUCCESS(f"Rebuilt progress for {len(mismatched)} enrollment(s)."))
@@ -0,0 +1,80 @@
+import logging
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from .query_budget import QueryRecorder, get_query_budget
+
+logger = logging.getLogger(__name__)
+
+
+class QueryBudgetMiddleware:
+    """
+    Record query count, database time and repeated queries for every request.
+
+    In debug mode (or with QUERY_BUDGET_HEADERS) the numbers are returned as
+    ``X-Query-Count`` and ``Server-Timing`` headers. Requests that exceed the
+    budget configured for their URL name are logged as warnings.
+
+    Streaming responses run most of their queries while the body is sent, so
+    their budget is checked once it has been, and they get no headers. Async
+    streams (the notification stream) are not counted: their queries run in
+    threads outside this middleware.
+
+    The middleware runs natively under both WSGI and ASGI, so async requests
+    do not pay a thread hop for it.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        recorder = QueryRecorder()
+        with recorder.record():
+            response = self.get_response(request)
+        return self.process_response(request, recorder, response)
+
+    async def __acall__(self, request):
+        # sync_to_async carries the recorder into the threads that run the queries
+        recorder = QueryRecorder()
+        with recorder.record():
+            response = await self.get_response(request)
+        return self.process_response(request, recorder, response)
+
+    def process_response(self, request, recorder, response):
+        if response.streaming:
+            if not response.is_async:
+                response.streaming_content = self.record_stream(request, recorder, response.streaming_content)
+            return response
+
+        if getattr(settings, 'QUERY_BUDGET_HEADERS', settings.DEBUG):
+            response['X-Query-Count'] = str(recorder.count)
+            response['Server-Timing'] = f'db;desc="{recorder.count} queries";dur={recorder.seconds * 1000:.1f}'
+        self.check_budget(request, recorder)
+        return response
+
+    def record_stream(self, request, recorder, content):
+        # Each chunk is produced under the recorder, in whichever thread consumes the stream
+        chunks = iter(content)
+        while True:
+            with recorder.record():
+                chunk = next(chunks, None)
+            if chunk is None:
+                break
+            yield chunk
+        self.check_budget(request, recorder)
+
+    def check_budget(self, request, recorder):
+        match = getattr(request, 'resolver_match', None)
+        view_name = match.view_name if match else None
+        budget = get_query_budget(view_name)
+        if budget is not None and recorder.count > budget:
+            logger.warning(
+                "%s %s (%s) exceeded its query budget of %d: %s",
+                request.method, request.path, view_name, budget, recorder.summary(),
+            )
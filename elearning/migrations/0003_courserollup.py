@@ -0,0 +1,25 @@
+# Generated by Django 5.0.7 on 2026-10-18 09:31
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('elearning', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CourseRollup',
+            fields=[
+                ('course', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='rollup', serialize=False, to='elearning.course')),
+                ('enrollment_count', models.PositiveIntegerField(default=0)),
+                ('assignment_count', models.PositiveIntegerField(default=0)),
+                ('submission_count', models.PositiveIntegerField(default=0)),
+                ('pending_submission_count', models.PositiveIntegerField(default=0)),
+                ('last_activity', models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,58 @@
+# Generated by Django 5.0.7 on 2026-10-18 09:33
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def backfill_progress_store(apps, schema_editor):
+    CourseModule = apps.get_model('elearning', 'CourseModule')
+    Lesson = apps.get_model('elearning', 'Lesson')
+    LessonProgress = apps.get_model('elearning', 'LessonProgress')
+    ModuleCompletion = apps.get_model('elearning', 'ModuleCompletion')
+
+    for row in Lesson.objects.values('module_id').annotate(total=Count('id')):
+        CourseModule.objects.filter(id=row['module_id']).update(lesson_count=row['total'])
+
+    ModuleCompletion.objects.bulk_create([
+        ModuleCompletion(
+            user_id=row['user_id'],
+            course_id=row['lesson__module__course_id'],
+            module_id=row['lesson__module_id'],
+            completed_lessons=row['total'],
+        )
+        for row in LessonProgress.objects.filter(completed=True)
+        .values('user_id', 'lesson__module_id', 'lesson__module__course_id').annotate(total=Count('id'))
+    ], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('elearning', '0003_courserollup'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='coursemodule',
+            name='lesson_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.CreateModel(
+            name='ModuleCompletion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('completed_lessons', models.PositiveIntegerField(default=0)),
+                ('course', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='elearning.course')),
+                ('module', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='elearning.coursemodule')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['user', 'course'], name='elearning_m_user_id_e3238d_idx')],
+                'unique_together': {('user', 'module')},
+            },
+        ),
+        migrations.RunPython(backfill_progress_store, migrations.RunPython.noop),
+    ]
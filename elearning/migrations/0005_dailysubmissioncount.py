@@ -0,0 +1,49 @@
+# Generated by Django 5.0.7 on 2026-10-18 09:38
+
+from collections import Counter
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import TruncDate
+
+
+def backfill_daily_submission_counts(apps, schema_editor):
+    AssignmentSubmission = apps.get_model('elearning', 'AssignmentSubmission')
+    DailySubmissionCount = apps.get_model('elearning', 'DailySubmissionCount')
+
+    totals = Counter()
+    for row in AssignmentSubmission.objects.annotate(date=TruncDate('submitted_date')).values(
+        'date', 'assignment__course__instructor_id', 'student_id'
+    ).annotate(total=Count('id')):
+        totals[('all', 0, row['date'])] += row['total']
+        totals[('student', row['student_id'], row['date'])] += row['total']
+        if row['assignment__course__instructor_id']:
+            totals[('instructor', row['assignment__course__instructor_id'], row['date'])] += row['total']
+
+    DailySubmissionCount.objects.bulk_create([
+        DailySubmissionCount(scope=scope, scope_id=scope_id, date=date, count=count)
+        for (scope, scope_id, date), count in totals.items()
+    ], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('elearning', '0004_progress_store'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailySubmissionCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('scope', models.CharField(choices=[('all', 'All'), ('instructor', 'Instructor'), ('student', 'Student')], max_length=20)),
+                ('scope_id', models.PositiveIntegerField(default=0)),
+                ('count', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'unique_together': {('scope', 'scope_id', 'date')},
+            },
+        ),
+        migrations.RunPython(backfill_daily_submission_counts, migrations.RunPython.noop),
+    ]
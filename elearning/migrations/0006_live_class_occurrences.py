@@ -0,0 +1,95 @@
+# Generated by Django 5.0.7 on 2026-10-18 09:44
+
+import django.db.models.deletion
+from datetime import datetime, timedelta
+from django.conf import settings
+from django.db import migrations, models
+from django.utils import timezone
+
+
+# A frozen copy of elearning.occurrences as of this migration, so later changes
+# to the app code cannot change what the backfill produces
+def occurrence_starts(schedule, start, end):
+    tz = timezone.get_default_timezone()
+    day = timezone.localtime(schedule.date, tz).date()
+    if schedule.recurrence == 'none':
+        days = [day]
+    else:
+        weekdays = {int(weekday) for weekday in schedule.weekdays.split(',') if weekday.strip()} or {day.weekday()}
+        if schedule.occurrence_count is None:
+            day = max(day, timezone.localtime(start, tz).date())
+        days = []
+        while schedule.until is None or day <= schedule.until:
+            if schedule.recurrence == 'daily' or day.weekday() in weekdays:
+                if timezone.make_aware(datetime.combine(day, schedule.start_time), tz) >= end:
+                    break
+                days.append(day)
+                if schedule.occurrence_count is not None and len(days) >= schedule.occurrence_count:
+                    break
+            day += timedelta(days=1)
+
+    for day in days:
+        start_at = timezone.make_aware(datetime.combine(day, schedule.start_time), tz)
+        if start <= start_at < end:
+            yield start_at
+
+
+def backfill_occurrences(apps, schema_editor):
+    LiveClassSchedule = apps.get_model('elearning', 'LiveClassSchedule')
+    LiveClassOccurrence = apps.get_model('elearning', 'LiveClassOccurrence')
+
+    start = timezone.now()
+    end = start + timedelta(days=getattr(settings, 'LIVE_CLASS_HORIZON_DAYS', 90))
+    LiveClassOccurrence.objects.bulk_create([
+        LiveClassOccurrence(
+            schedule_id=schedule.id, course_id=schedule.course_id, start_at=start_at, end_at=start_at + schedule.duration
+        )
+        for schedule in LiveClassSchedule.objects.filter(is_active=True)
+        for start_at in occurrence_starts(schedule, start, end)
+    ], batch_size=500)
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('elearning', '0005_dailysubmissioncount'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='liveclassschedule',
+            name='occurrence_count',
+            field=models.PositiveIntegerField(blank=True, help_text='Number of occurrences in the series', null=True),
+        ),
+        migrations.AddField(
+            model_name='liveclassschedule',
+            name='recurrence',
+            field=models.CharField(choices=[('none', 'Does not repeat'), ('daily', 'Daily'), ('weekly', 'Weekly')], default='daily', max_length=10),
+        ),
+        migrations.AddField(
+            model_name='liveclassschedule',
+            name='until',
+            field=models.DateField(blank=True, help_text='Last day the class can occur', null=True),
+        ),
+        migrations.AddField(
+            model_name='liveclassschedule',
+            name='weekdays',
+            field=models.CharField(blank=True, help_text='Comma-separated weekdays for weekly classes (0 is Monday); defaults to the weekday of date', max_length=13),
+        ),
+        migrations.CreateModel(
+            name='LiveClassOccurrence',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('start_at', models.DateTimeField()),
+                ('end_at', models.DateTimeField()),
+                ('is_cancelled', models.BooleanField(default=False)),
+                ('course', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='live_class_occurrences', to='elearning.course')),
+                ('schedule', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='occurrences', to='elearning.liveclassschedule')),
+            ],
+            options={
+                'ordering': ['start_at'],
+                'indexes': [models.Index(fields=['start_at'], name='elearning_l_start_a_5945dd_idx'), models.Index(fields=['course', 'start_at'], name='elearning_l_course__cfadb6_idx')],
+                'unique_together': {('schedule', 'start_at')},
+            },
+        ),
+        migrations.RunPython(backfill_occurrences, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.0.7 on 2026-10-18 10:21
+
+import django.db.models.deletion
+import elearning.models
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('elearning', '0006_live_class_occurrences'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LiveClassFeedKey',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(default=elearning.models.generate_feed_key, max_length=32)),
+                ('rotated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='live_class_feed_key', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+    ]
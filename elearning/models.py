@@ -1,3 +1,4 @@
+import secrets
 from django.db import models
 from user_auth.models import Instructor as User, Student
 from datetime import timedelta
@@ -34,6 +35,7 @@ class CourseModule(models.Model):
     title = models.CharField(max_length=100)
     description = models.TextField()
     objectives = models.TextField(default='Default objective')
+    lesson_count = models.PositiveIntegerField(default=0)  # Maintained by elearning.signals
 
     def __str__(self) -> str:
 
@@ -90,6 +92,20 @@ class LessonProgress(models.Model):
     def __str__(self) -> str:
         return f'{self.user.username} - {self.lesson.title} - {"Completed" if self.completed else "Incomplete"}'
 
+class ModuleCompletion(models.Model):
+    """Denormalized count of the lessons a user has completed in a module."""
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
+    course = models.ForeignKey(Course, on_delete=models.CASCADE)
+    module = models.ForeignKey(CourseModule, on_delete=models.CASCADE)
+    completed_lessons = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ('user', 'module')
+        indexes = [models.Index(fields=['user', 'course'])]
+
+    def __str__(self) -> str:
+        return f'{self.user.username} - {self.module.title} - {self.completed_lessons} lessons'
+
 class Assignment(models.Model):
     title = models.CharField(max_length=100)
     description = models.TextField()
@@ -195,7 +211,41 @@ class UserProgress(models.Model):
         return f"{self.user.username} - {self.module} in {self.course}"
 
 
+class LiveClassScheduleQuerySet(models.QuerySet):
+    def with_next_start(self, now=None):
+        """Annotate ``next_start_at`` from the occurrence table; None when nothing is upcoming."""
+        now = now or timezone.now()
+        upcoming = LiveClassOccurrence.objects.filter(
+            schedule=models.OuterRef('pk'), start_at__gt=now, is_cancelled=False
+        ).order_by('start_at').values('start_at')[:1]
+        return self.annotate(next_start_at=models.Subquery(upcoming))
+
+    def order_by_next_occurrence(self, now=None):
+        """Order schedules by their next uncancelled occurrence; series with none left come last."""
+        return self.with_next_start(now).order_by(
+            models.F('next_start_at').asc(nulls_last=True), 'start_time', 'id'
+        )
+
+    def next_class(self, now=None):
+        """Return the schedule that occurs next, found with one range scan over the occurrence table."""
+        now = now or timezone.now()
+        occurrence = LiveClassOccurrence.objects.filter(
+            schedule__in=self.values('pk'), start_at__gt=now, is_cancelled=False
+        ).select_related('schedule__course').order_by('start_at').first()
+        if occurrence is None:
+            return None
+        schedule = occurrence.schedule
+        schedule.next_start_at = occurrence.start_at
+        return schedule
+
+
 class LiveClassSchedule(models.Model):
+    RECURRENCE_CHOICES = [
+        ('none', 'Does not repeat'),
+        ('daily', 'Daily'),
+        ('weekly', 'Weekly'),
+    ]
+
     course = models.ForeignKey(Course, on_delete=models.CASCADE, related_name='live_class_schedules')
     instructor = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='instructed_schedules')
     title = models.CharField(max_length=200)
@@ -205,6 +255,15 @@ class LiveClassSchedule(models.Model):
     duration = models.DurationField(default=timedelta())
     room = models.CharField(max_length=255, help_text="Zoom link or physical venue")
     is_active = models.BooleanField(default=True)
+    recurrence = models.CharField(max_length=10, choices=RECURRENCE_CHOICES, default='daily')
+    weekdays = models.CharField(
+        max_length=13, blank=True,
+        help_text="Comma-separated weekdays for weekly classes (0 is Monday); defaults to the weekday of date",
+    )
+    until = models.DateField(null=True, blank=True, help_text="Last day the class can occur")
+    occurrence_count = models.PositiveIntegerField(null=True, blank=True, help_text="Number of occurrences in the series")
+
+    objects = LiveClassScheduleQuerySet.as_manager()
 
     class Meta:
         ordering = ['start_time']
@@ -213,14 +272,75 @@ class LiveClassSchedule(models.Model):
         return f"{self.course.name} - {self.title} at {self.start_time}"
 
     def next_occurrence(self):
-        now = timezone.localtime()
-        today = now.date()
-        class_time = timezone.make_aware(timezone.datetime.combine(today, self.start_time))
-        
-        if class_time <= now:
-            # If the class time has passed for today, schedule for tomorrow
-            class_time += timezone.timedelta(days=1)
-        
-        return class_time
+        """Next start of the series after now, computed from the recurrence rule."""
+        from .occurrences import iter_occurrence_starts
+
+        now = timezone.now()
+        return next((start for start in iter_occurrence_starts(self, after=now) if start > now), None)
+
+
+class LiveClassOccurrence(models.Model):
+    """One materialized session of a live class series, generated ahead over a rolling window."""
+    schedule = models.ForeignKey(LiveClassSchedule, on_delete=models.CASCADE, related_name='occurrences')
+    course = models.ForeignKey(Course, on_delete=models.CASCADE, related_name='live_class_occurrences')
+    start_at = models.DateTimeField()
+    end_at = models.DateTimeField()
+    is_cancelled = models.BooleanField(default=False)
+
+    class Meta:
+        ordering = ['start_at']
+        unique_together = ('schedule', 'start_at')
+        indexes = [
+            models.Index(fields=['start_at']),
+            models.Index(fields=['course', 'start_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.schedule.title} at {self.start_at}"
+
+
+def generate_feed_key():
+    return secrets.token_hex(16)
+
+
+class LiveClassFeedKey(models.Model):
+    """Per-user secret carried in calendar feed tokens; replacing it revokes every feed URL issued before."""
+    user = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='live_class_feed_key')
+    key = models.CharField(max_length=32, default=generate_feed_key)
+    rotated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Feed key for {self.user}"
 
 
+class CourseRollup(models.Model):
+    """Precomputed per-course counters read by the analytics dashboards."""
+    course = models.OneToOneField(Course, on_delete=models.CASCADE, primary_key=True, related_name='rollup')
+    enrollment_count = models.PositiveIntegerField(default=0)
+    assignment_count = models.PositiveIntegerField(default=0)
+    submission_count = models.PositiveIntegerField(default=0)
+    pending_submission_count = models.PositiveIntegerField(default=0)
+    last_activity = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"Rollup for {self.course.name}"
+
+
+class DailySubmissionCount(models.Model):
+    """Submissions per day for one dashboard scope, maintained as submissions are made."""
+    SCOPE_CHOICES = [
+        ('all', 'All'),
+        ('instructor', 'Instructor'),
+        ('student', 'Student'),
+    ]
+
+    date = models.DateField()
+    scope = models.CharField(max_length=20, choices=SCOPE_CHOICES)
+    scope_id = models.PositiveIntegerField(default=0)  # Instructor or Student id; 0 for 'all'
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ('scope', 'scope_id', 'date')
+
+    def __str__(self):
+        return f"{self.scope} {self.scope_id} - {self.date}: {self.count}"
@@ -0,0 +1,84 @@
+from datetime import datetime, timedelta
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+LIVE_CLASS_HORIZON_DAYS = getattr(settings, 'LIVE_CLASS_HORIZON_DAYS', 90)
+
+
+def parse_weekdays(value):
+    """Parse a comma-separated weekday list ('0,2,4', Monday is 0) into a sorted tuple."""
+    return tuple(sorted({int(day) for day in value.split(',') if day.strip()})) if value else ()
+
+
+def iter_occurrence_starts(schedule, after=None):
+    """
+    Yield the aware start datetimes of a schedule's series, in order.
+
+    Series without a count limit start at ``after``'s date instead of the
+    series start, so looking up an occurrence far into a long series stays
+    cheap. Works with historical models in migrations too.
+    """
+    tz = timezone.get_default_timezone()
+    day = timezone.localtime(schedule.date, tz).date()
+    if schedule.recurrence == 'none':
+        yield timezone.make_aware(datetime.combine(day, schedule.start_time), tz)
+        return
+
+    weekdays = parse_weekdays(schedule.weekdays) or (day.weekday(),)
+    if after is not None and schedule.occurrence_count is None:
+        day = max(day, timezone.localtime(after, tz).date())
+
+    emitted = 0
+    while schedule.until is None or day <= schedule.until:
+        if schedule.recurrence == 'daily' or day.weekday() in weekdays:
+            yield timezone.make_aware(datetime.combine(day, schedule.start_time), tz)
+            emitted += 1
+            if schedule.occurrence_count is not None and emitted >= schedule.occurrence_count:
+                return
+        day += timedelta(days=1)
+
+
+def occurrences_between(schedule, start, end):
+    """Return (start_at, end_at) pairs for the occurrences starting in [start, end)."""
+    occurrences = []
+    for start_at in iter_occurrence_starts(schedule, after=start):
+        if start_at >= end:
+            break
+        if start_at >= start:
+            occurrences.append((start_at, start_at + schedule.duration))
+    return occurrences
+
+
+def materialize_occurrences(schedules, start=None, end=None):
+    """
+    Create the missing occurrence rows of each schedule over [start, end).
+
+    Defaults to the rolling window from now to LIVE_CLASS_HORIZON_DAYS ahead.
+    Existing rows, cancelled ones included, are left untouched.
+
+    :return: Number of occurrence rows inserted or already present
+    """
+    from .models import LiveClassOccurrence
+
+    start = start or timezone.now()
+    end = end or start + timedelta(days=LIVE_CLASS_HORIZON_DAYS)
+    occurrences = [
+        LiveClassOccurrence(schedule_id=schedule.id, course_id=schedule.course_id, start_at=start_at, end_at=end_at)
+        for schedule in schedules if schedule.is_active
+        for start_at, end_at in occurrences_between(schedule, start, end)
+    ]
+    LiveClassOccurrence.objects.bulk_create(occurrences, batch_size=500, ignore_conflicts=True)
+    return len(occurrences)
+
+
+def refresh_schedule_occurrences(schedule):
+    """
+    Regenerate a schedule's upcoming occurrences after its series changed.
+
+    Cancelled occurrences are kept so a cancellation outlives edits to the series.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        schedule.occurrences.filter(start_at__gte=now, is_cancelled=False).delete()
+        materialize_occurrences([schedule], start=now)
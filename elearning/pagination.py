@@ -0,0 +1,11 @@
+from rest_framework.pagination import LimitOffsetPagination
+
+
+class LiveClassPagination(LimitOffsetPagination):
+    """
+    Opt-in limit/offset pagination for live classes.
+
+    Without ``?limit=`` the full list is returned as before, so existing
+    clients keep working; with it, only the requested window is loaded.
+    """
+    max_limit = 200
@@ -0,0 +1,209 @@
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F
+from django.utils import timezone
+from .models import CourseModule, Enrollment, Lesson, LessonProgress, ModuleCompletion, ModuleProgress
+
+
+def _percentage(completed, total):
+    return round((completed / total) * 100, 2) if total > 0 else 0
+
+
+def get_user_course_progress(user, course):
+    """
+    Read a user's course progress from the progress store.
+
+    Returns the same structure as ``utils.calculate_user_progress`` using two
+    queries regardless of how many modules or lessons the course has.
+    """
+    user_id = getattr(user, 'id', user)
+    course_id = getattr(course, 'id', course)
+    modules = CourseModule.objects.filter(course_id=course_id).values('id', 'title', 'lesson_count')
+    completed = dict(
+        ModuleCompletion.objects.filter(user_id=user_id, course_id=course_id).values_list('module_id', 'completed_lessons')
+    )
+
+    module_progresses = [{
+        'module_id': module['id'],
+        'module': module['title'],
+        'progress': _percentage(completed.get(module['id'], 0), module['lesson_count']),
+    } for module in modules]
+
+    if module_progresses:
+        average_module_progress = sum(module['progress'] for module in module_progresses) / len(module_progresses)
+    else:
+        average_module_progress = 0
+
+    return {
+        'course_progress': round(average_module_progress, 2),
+        'module_progresses': module_progresses,
+    }
+
+
+def bump_module_completion(user_id, module, delta):
+    """Apply a completed-lesson delta for one user and module, then refresh the derived progress."""
+    updated = ModuleCompletion.objects.filter(user_id=user_id, module_id=module.id).update(
+        completed_lessons=F('completed_lessons') + delta
+    )
+    if not updated:
+        # First completion in this module: seed the row from the source table
+        completed = LessonProgress.objects.filter(user_id=user_id, lesson__module_id=module.id, completed=True).count()
+        try:
+            with transaction.atomic():
+                ModuleCompletion.objects.create(
+                    user_id=user_id, course_id=module.course_id, module_id=module.id, completed_lessons=completed
+                )
+        except IntegrityError:
+            ModuleCompletion.objects.filter(user_id=user_id, module_id=module.id).update(
+                completed_lessons=F('completed_lessons') + delta
+            )
+
+    sync_user_progress(user_id, module.course_id)
+
+
+def sync_user_progress(user_id, course_id):
+    """Copy the store's values into ModuleProgress and Enrollment.progress for one user and course."""
+    progress = get_user_course_progress(user_id, course_id)
+    now = timezone.now()
+    for module in progress['module_progresses']:
+        updated = ModuleProgress.objects.filter(user_id=user_id, module_id=module['module_id']).update(
+            progress=module['progress'], last_updated=now
+        )
+        if not updated and module['progress']:
+            ModuleProgress.objects.create(user_id=user_id, module_id=module['module_id'], progress=module['progress'])
+
+    Enrollment.objects.filter(student__user_id=user_id, course_id=course_id).update(
+        progress=round(progress['course_progress'])
+    )
+    return progress
+
+
+def bump_module_lesson_count(module_id, delta):
+    """
+    Track a lesson being added to or removed from a module, then rescale the
+    course's stored progress.
+
+    :return: Ids of the users whose progress was rescaled
+    """
+    CourseModule.objects.filter(id=module_id).update(lesson_count=F('lesson_count') + delta)
+    course_id = CourseModule.objects.filter(id=module_id).values_list('course_id', flat=True).first()
+    if course_id is None:
+        return []
+    return sync_course_progress(course_id, module_ids=[module_id])
+
+
+def move_lesson_completions(lesson_id, old_module_id, new_module_id):
+    """
+    Carry a moved lesson's completions from one module's store rows to the
+    other's and fix both lesson counts.
+
+    :return: Ids of the users whose progress was rescaled
+    """
+    user_ids = list(LessonProgress.objects.filter(lesson_id=lesson_id, completed=True).values_list('user_id', flat=True))
+    new_module = CourseModule.objects.filter(id=new_module_id).values('course_id').first()
+    if user_ids:
+        ModuleCompletion.objects.filter(module_id=old_module_id, user_id__in=user_ids).update(
+            completed_lessons=F('completed_lessons') - 1
+        )
+        seeded = set(
+            ModuleCompletion.objects.filter(module_id=new_module_id, user_id__in=user_ids).values_list('user_id', flat=True)
+        )
+        ModuleCompletion.objects.filter(module_id=new_module_id, user_id__in=seeded).update(
+            completed_lessons=F('completed_lessons') + 1
+        )
+        # Users without a row yet are seeded from the source table, which already counts the moved lesson
+        ModuleCompletion.objects.bulk_create([
+            ModuleCompletion(user_id=row['user_id'], course_id=new_module['course_id'], module_id=new_module_id,
+                             completed_lessons=row['total'])
+            for row in LessonProgress.objects.filter(
+                lesson__module_id=new_module_id, completed=True, user_id__in=set(user_ids) - seeded
+            ).values('user_id').annotate(total=Count('id'))
+        ], ignore_conflicts=True)
+
+    return sorted(set(bump_module_lesson_count(old_module_id, -1)) | set(bump_module_lesson_count(new_module_id, 1)))
+
+
+def sync_course_progress(course_id, module_ids=None):
+    """
+    Recompute ModuleProgress (for ``module_ids``, or every module) and
+    Enrollment.progress for everyone in a course from the progress store,
+    rounded the same way as ``get_user_course_progress``.
+
+    Runs a fixed number of queries however many users are affected.
+
+    :return: Ids of the users whose rows were rewritten
+    """
+    lesson_counts = dict(CourseModule.objects.filter(course_id=course_id).values_list('id', 'lesson_count'))
+    completed = {
+        (user_id, module_id): count
+        for user_id, module_id, count in ModuleCompletion.objects.filter(course_id=course_id)
+        .values_list('user_id', 'module_id', 'completed_lessons')
+    }
+    now = timezone.now()
+
+    module_ids = set(lesson_counts if module_ids is None else module_ids)
+    module_progresses = list(ModuleProgress.objects.filter(module_id__in=module_ids))
+    for module_progress in module_progresses:
+        module_progress.progress = _percentage(
+            completed.get((module_progress.user_id, module_progress.module_id), 0),
+            lesson_counts.get(module_progress.module_id, 0),
+        )
+        module_progress.last_updated = now
+    ModuleProgress.objects.bulk_update(module_progresses, ['progress', 'last_updated'], batch_size=500)
+
+    # Like sync_user_progress, rows are only created once there is progress to record
+    existing = {(row.user_id, row.module_id) for row in module_progresses}
+    created = [
+        ModuleProgress(user_id=user_id, module_id=module_id, progress=_percentage(count, lesson_counts[module_id]))
+        for (user_id, module_id), count in completed.items()
+        if module_id in module_ids and count and lesson_counts.get(module_id) and (user_id, module_id) not in existing
+    ]
+    ModuleProgress.objects.bulk_create(created, batch_size=500)
+    module_progresses += created
+
+    enrollments = list(Enrollment.objects.filter(course_id=course_id).annotate(user_id=F('student__user_id')))
+    for enrollment in enrollments:
+        percentages = [
+            _percentage(completed.get((enrollment.user_id, module_id), 0), lesson_count)
+            for module_id, lesson_count in lesson_counts.items()
+        ]
+        course_progress = round(sum(percentages) / len(percentages), 2) if percentages else 0
+        enrollment.progress = round(course_progress)
+    Enrollment.objects.bulk_update(enrollments, ['progress'], batch_size=500)
+
+    return sorted({row.user_id for row in module_progresses} | {enrollment.user_id for enrollment in enrollments})
+
+
+def rebuild_progress_store(course_ids=None):
+    """
+    Recompute module lesson counts and every ModuleCompletion row from Lesson and LessonProgress.
+
+    :param course_ids: Courses to rebuild, or None to rebuild every course
+    :return: Number of ModuleCompletion rows written
+    """
+    modules = CourseModule.objects.all()
+    if course_ids is not None:
+        modules = modules.filter(course_id__in=course_ids)
+
+    lesson_counts = dict(
+        Lesson.objects.filter(module__in=modules).values('module_id').annotate(total=Count('id')).values_list('module_id', 'total')
+    )
+    modules = list(modules.only('id', 'lesson_count'))
+    for module in modules:
+        module.lesson_count = lesson_counts.get(module.id, 0)
+
+    completions = [
+        ModuleCompletion(
+            user_id=row['user_id'],
+            course_id=row['lesson__module__course_id'],
+            module_id=row['lesson__module_id'],
+            completed_lessons=row['total'],
+        )
+        for row in LessonProgress.objects.filter(lesson__module__in=[module.id for module in modules], completed=True)
+        .values('user_id', 'lesson__module_id', 'lesson__module__course_id').annotate(total=Count('id'))
+    ]
+
+    with transaction.atomic():
+        CourseModule.objects.bulk_update(modules, ['lesson_count'], batch_size=500)
+        ModuleCompletion.objects.filter(module__in=[module.id for module in modules]).delete()
+        ModuleCompletion.objects.bulk_create(completions, batch_size=500)
+    return len(completions)
@@ -0,0 +1,130 @@
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import partial
+from threading import Lock
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+_IN_LIST = re.compile(r'\(\s*%s(?:\s*,\s*%s)+\s*\)')
+_WHITESPACE = re.compile(r'\s+')
+_active_recorders = ContextVar('active_query_recorders', default=())
+
+
+def fingerprint(sql):
+    """Normalise a query so repeats that differ only in parameters or IN-list length compare equal."""
+    return _WHITESPACE.sub(' ', _IN_LIST.sub('(%s, ...)', sql)).strip()
+
+
+class QueryRecorder:
+    """
+    Record the SQL run while the recorder is active, in the current context.
+
+    Active recorders live in a context variable, which sync_to_async carries
+    into the threads it runs code in. Plain thread pools do not copy it, so
+    their work is counted only if the worker records into the submitting
+    thread's recorders with ``record_into(active_recorders())``, as the
+    concurrent dashboard does.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.fingerprints = Counter()
+        self._lock = Lock()
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            with self._lock:
+                self.seconds += time.perf_counter() - started
+                self.count += 1
+                self.fingerprints[fingerprint(sql)] += 1
+
+    @contextmanager
+    def record(self):
+        with record_into(_active_recorders.get() + (self,)):
+            yield self
+
+    @property
+    def duplicates(self):
+        """Fingerprints run more than once, most repeated first."""
+        return [(sql, count) for sql, count in self.fingerprints.most_common() if count > 1]
+
+    def summary(self, limit=5):
+        lines = [f"{self.count} queries in {self.seconds * 1000:.1f} ms"]
+        lines += [f"  {count}x {sql}" for sql, count in self.duplicates[:limit]]
+        return '\n'.join(lines)
+
+
+def _record_query(execute, sql, params, many, context):
+    for recorder in _active_recorders.get():
+        execute = partial(recorder, execute)
+    return execute(sql, params, many, context)
+
+
+def _install_recorder_hook(sender=None, connection=None, **kwargs):
+    # First in line, so connection.execute_wrapper() blocks still pop their own wrapper
+    if _record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, _record_query)
+
+
+# Connections are per thread, so hook each one as it is opened
+connection_created.connect(_install_recorder_hook)
+
+
+def active_recorders():
+    """The recorders recording the current context, to pass on to work run in other threads."""
+    return _active_recorders.get()
+
+
+@contextmanager
+def record_into(recorders):
+    """Record the current thread's queries into recorders started in another thread."""
+    for connection in connections.all():
+        _install_recorder_hook(connection=connection)
+    token = _active_recorders.set(recorders)
+    try:
+        yield
+    finally:
+        _active_recorders.reset(token)
+
+
+def get_query_budget(view_name):
+    """
+    Return the query budget for a URL name, falling back to QUERY_BUDGET_DEFAULT.
+
+    Budgets are read from the QUERY_BUDGETS setting; None means unlimited.
+    """
+    budgets = getattr(settings, 'QUERY_BUDGETS', {})
+    return budgets.get(view_name, getattr(settings, 'QUERY_BUDGET_DEFAULT', None))
+
+
+@contextmanager
+def assert_query_budget(max_queries=None, max_duplicates=None):
+    """
+    Fail if the wrapped block runs more than ``max_queries`` queries, or repeats
+    one query fingerprint more than ``max_duplicates`` times.
+
+    Usage in a test::
+
+        with assert_query_budget(max_queries=10, max_duplicates=1) as queries:
+            self.client.get(url)
+    """
+    recorder = QueryRecorder()
+    with recorder.record():
+        yield recorder
+
+    if max_queries is not None and recorder.count > max_queries:
+        raise AssertionError(f"Query budget of {max_queries} exceeded: {recorder.summary()}")
+    if max_duplicates is not None:
+        repeated = [count for _, count in recorder.duplicates if count > max_duplicates]
+        if repeated:
+            raise AssertionError(
+                f"A query was repeated {max(repeated)} times (allowed {max_duplicates}): {recorder.summary()}"
+            )
@@ -0,0 +1,184 @@
+from collections import Counter
+from datetime import datetime, time
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Max, Q
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+from .models import Assignment, AssignmentSubmission, Course, CourseRollup, DailySubmissionCount, Enrollment
+
+
+def rebuild_course_rollups(course_ids=None):
+    """
+    Recompute the rollup rows from the source tables.
+
+    :param course_ids: Courses to rebuild, or None to rebuild every course
+    :return: Number of rollup rows written
+    """
+    courses = Course.objects.all()
+    if course_ids is not None:
+        courses = courses.filter(id__in=course_ids)
+    course_ids = list(courses.values_list('id', flat=True))
+
+    enrollments = {
+        row['course_id']: row for row in Enrollment.objects.filter(course_id__in=course_ids)
+        .values('course_id').annotate(total=Count('id'), latest=Max('enrollment_date'))
+    }
+    assignments = {
+        row['course_id']: row for row in Assignment.objects.filter(course_id__in=course_ids)
+        .values('course_id').annotate(total=Count('id'), latest=Max('posted_date'))
+    }
+    submissions = {
+        row['assignment__course_id']: row for row in AssignmentSubmission.objects.filter(assignment__course_id__in=course_ids)
+        .values('assignment__course_id').annotate(
+            total=Count('id'),
+            pending=Count('id', filter=Q(status='pending')),
+            latest=Max('submitted_date'),
+        )
+    }
+
+    rollups = []
+    for course_id in course_ids:
+        enrollment = enrollments.get(course_id, {})
+        assignment = assignments.get(course_id, {})
+        submission = submissions.get(course_id, {})
+
+        activity = [assignment.get('latest'), submission.get('latest')]
+        if enrollment.get('latest'):
+            activity.append(timezone.make_aware(datetime.combine(enrollment['latest'], time.min)))
+        activity = [moment for moment in activity if moment]
+
+        rollups.append(CourseRollup(
+            course_id=course_id,
+            enrollment_count=enrollment.get('total', 0),
+            assignment_count=assignment.get('total', 0),
+            submission_count=submission.get('total', 0),
+            pending_submission_count=submission.get('pending', 0),
+            last_activity=max(activity) if activity else None,
+        ))
+
+    with transaction.atomic():
+        CourseRollup.objects.filter(course_id__in=course_ids).delete()
+        CourseRollup.objects.bulk_create(rollups, batch_size=500)
+    return len(rollups)
+
+
+def bump_course_rollup(course_id, touch=True, **deltas):
+    """
+    Apply counter deltas to a course rollup with a single UPDATE.
+
+    Writes that add activity (``touch=True``) also refresh ``last_activity`` and
+    rebuild the row if it does not exist yet. Deletions only decrement, so a
+    course that is itself being deleted is never recreated.
+    """
+    updates = {field: F(field) + delta for field, delta in deltas.items() if delta}
+    if touch:
+        updates['last_activity'] = timezone.now()
+    if not updates:
+        return
+
+    updated = CourseRollup.objects.filter(course_id=course_id).update(**updates)
+    if not updated and touch:
+        rebuild_course_rollups([course_id])
+
+
+def move_assignment_counts(assignment_id, from_course_id, to_course_id):
+    """
+    Move an assignment and its submissions from one course's counters to
+    another's after the assignment changed course.
+    """
+    submissions = AssignmentSubmission.objects.filter(assignment_id=assignment_id)
+    totals = submissions.aggregate(total=Count('id'), pending=Count('id', filter=Q(status='pending')))
+    bump_course_rollup(
+        from_course_id, touch=False,
+        assignment_count=-1, submission_count=-totals['total'], pending_submission_count=-totals['pending'],
+    )
+    bump_course_rollup(
+        to_course_id, assignment_count=1, submission_count=totals['total'], pending_submission_count=totals['pending'],
+    )
+
+    instructors = dict(Course.objects.filter(id__in=[from_course_id, to_course_id]).values_list('id', 'instructor_id'))
+    from_instructor, to_instructor = instructors.get(from_course_id), instructors.get(to_course_id)
+    if from_instructor == to_instructor or not totals['total']:
+        return
+    for row in submissions.annotate(date=TruncDate('submitted_date')).values('date').annotate(total=Count('id')):
+        if from_instructor:
+            _bump_daily_submission_count('instructor', from_instructor, row['date'], -row['total'])
+        if to_instructor:
+            _bump_daily_submission_count('instructor', to_instructor, row['date'], row['total'])
+
+
+def get_course_rollups(courses):
+    """
+    Map course ids to their rollup rows.
+
+    ``courses`` should be loaded with ``select_related('rollup')``; courses
+    without a rollup yet are rebuilt together in one pass.
+    """
+    rollups, missing = {}, []
+    for course in courses:
+        try:
+            rollups[course.id] = course.rollup
+        except CourseRollup.DoesNotExist:
+            missing.append(course.id)
+
+    if missing:
+        rebuild_course_rollups(missing)
+        rollups.update({rollup.course_id: rollup for rollup in CourseRollup.objects.filter(course_id__in=missing)})
+    return rollups
+
+
+def _submission_scopes(instructor_id, student_id):
+    scopes = [('all', 0), ('student', student_id)]
+    if instructor_id:
+        scopes.append(('instructor', instructor_id))
+    return scopes
+
+
+def bump_daily_submission_counts(submission, delta):
+    """Add ``delta`` to the day's counters for every scope the submission belongs to."""
+    instructor_id = submission.assignment.course.instructor_id
+    date = timezone.localdate(submission.submitted_date)
+    for scope, scope_id in _submission_scopes(instructor_id, submission.student_id):
+        _bump_daily_submission_count(scope, scope_id, date, delta)
+
+
+def _bump_daily_submission_count(scope, scope_id, date, delta):
+    counters = DailySubmissionCount.objects.filter(scope=scope, scope_id=scope_id, date=date)
+    if counters.update(count=F('count') + delta) or delta < 0:
+        return
+    try:
+        with transaction.atomic():
+            DailySubmissionCount.objects.create(scope=scope, scope_id=scope_id, date=date, count=delta)
+    except IntegrityError:
+        counters.update(count=F('count') + delta)
+
+
+def rebuild_daily_submission_counts():
+    """
+    Recompute every daily submission counter from AssignmentSubmission.
+
+    :return: Number of counter rows written
+    """
+    totals = Counter()
+    rows = AssignmentSubmission.objects.annotate(date=TruncDate('submitted_date')).values(
+        'date', 'assignment__course__instructor_id', 'student_id'
+    ).annotate(total=Count('id'))
+    for row in rows:
+        for scope, scope_id in _submission_scopes(row['assignment__course__instructor_id'], row['student_id']):
+            totals[(scope, scope_id, row['date'])] += row['total']
+
+    counters = [
+        DailySubmissionCount(scope=scope, scope_id=scope_id, date=date, count=count)
+        for (scope, scope_id, date), count in totals.items()
+    ]
+    with transaction.atomic():
+        DailySubmissionCount.objects.all().delete()
+        DailySubmissionCount.objects.bulk_create(counters, batch_size=500)
+    return len(counters)
+
+
+def get_daily_submission_counts(scope, scope_id, years):
+    """Return (date, count) pairs for one scope; at most one row per day."""
+    return DailySubmissionCount.objects.filter(
+        scope=scope, scope_id=scope_id, date__year__in=years
+    ).values_list('date', 'count')
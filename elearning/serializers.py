@@ -12,11 +12,13 @@ from .models import (
     Lesson,
     LessonAssignment,
     LessonProgress,
+    LiveClassOccurrence,
     LiveClassSchedule,
     ModuleAssignment,
     ModuleProgress,
     UserProgress,
 )
+from .occurrences import parse_weekdays
 
 class LessonSerializer(serializers.ModelSerializer):
     class Meta:
@@ -158,11 +160,37 @@ class LiveClassScheduleSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = LiveClassSchedule
-        fields = ['id', 'course', 'course_name', 'instructor', 'title', 'description','date', 'start_time', 'duration', 'room', 'is_active', 'next_class_time']
+        fields = [
+            'id', 'course', 'course_name', 'instructor', 'title', 'description','date', 'start_time', 'duration', 'room', 'is_active',
+            'recurrence', 'weekdays', 'until', 'occurrence_count', 'next_class_time',
+        ]
         read_only_fields = ['instructor', 'course_name']
 
     def get_next_class_time(self, obj):
+        # Querysets ordered by next occurrence already carry it from the occurrence table
+        if hasattr(obj, 'next_start_at'):
+            return obj.next_start_at
         return obj.next_occurrence()
+
+    def validate_weekdays(self, value):
+        try:
+            weekdays = parse_weekdays(value)
+        except ValueError:
+            raise serializers.ValidationError("Use comma-separated weekday numbers, e.g. '0,2,4'.")
+        if any(day not in range(7) for day in weekdays):
+            raise serializers.ValidationError("Weekdays run from 0 (Monday) to 6 (Sunday).")
+        return ','.join(str(day) for day in weekdays)
+
+
+class LiveClassOccurrenceSerializer(serializers.ModelSerializer):
+    title = serializers.CharField(source='schedule.title', read_only=True)
+    room = serializers.CharField(source='schedule.room', read_only=True)
+    course_name = serializers.CharField(source='course.name', read_only=True)
+
+    class Meta:
+        model = LiveClassOccurrence
+        fields = ['id', 'schedule', 'course', 'course_name', 'title', 'room', 'start_at', 'end_at', 'is_cancelled']
+        read_only_fields = fields
     
 class AssignmentMarkingSerializer(serializers.Serializer):
     submission_id = serializers.IntegerField()
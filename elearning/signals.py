@@ -0,0 +1,222 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from user_auth.models import Instructor, Student
+from .calendar_feed import bump_feed_versions
+from .dashboard_cache import bump_dashboard_versions
+from .models import (
+    Assignment, AssignmentSubmission, Course, CourseModule, CourseRollup, Enrollment, Lesson, LessonProgress,
+    LiveClassOccurrence, LiveClassSchedule, ModuleProgress,
+)
+from .occurrences import refresh_schedule_occurrences
+from .progress import bump_module_completion, bump_module_lesson_count, move_lesson_completions
+from .rollups import bump_course_rollup, bump_daily_submission_counts, move_assignment_counts
+
+
+# Course rollups
+@receiver(post_save, sender=Course)
+def create_course_rollup(sender, instance, created, **kwargs):
+    if created:
+        CourseRollup.objects.get_or_create(course=instance)
+
+
+@receiver(post_save, sender=Enrollment)
+def enrollment_saved(sender, instance, created, **kwargs):
+    if created:
+        bump_course_rollup(instance.course_id, enrollment_count=1)
+
+
+@receiver(post_delete, sender=Enrollment)
+def enrollment_deleted(sender, instance, **kwargs):
+    bump_course_rollup(instance.course_id, touch=False, enrollment_count=-1)
+
+
+@receiver(pre_save, sender=Assignment)
+def remember_assignment_course(sender, instance, **kwargs):
+    # Needed to move the assignment's counts when it changes course
+    instance._previous_course_id = None
+    if instance.pk:
+        instance._previous_course_id = Assignment.objects.filter(pk=instance.pk).values_list('course_id', flat=True).first()
+
+
+@receiver(post_save, sender=Assignment)
+def assignment_saved(sender, instance, created, **kwargs):
+    previous_course_id = getattr(instance, '_previous_course_id', None)
+    if created:
+        bump_course_rollup(instance.course_id, assignment_count=1)
+    elif previous_course_id and previous_course_id != instance.course_id:
+        move_assignment_counts(instance.pk, previous_course_id, instance.course_id)
+
+
+@receiver(post_delete, sender=Assignment)
+def assignment_deleted(sender, instance, **kwargs):
+    bump_course_rollup(instance.course_id, touch=False, assignment_count=-1)
+
+
+@receiver(pre_save, sender=AssignmentSubmission)
+def remember_submission_status(sender, instance, **kwargs):
+    # Needed to tell whether a review moved the submission out of 'pending'
+    instance._previous_status = None
+    if instance.pk:
+        instance._previous_status = (
+            AssignmentSubmission.objects.filter(pk=instance.pk).values_list('status', flat=True).first()
+        )
+
+
+@receiver(post_save, sender=AssignmentSubmission)
+def submission_saved(sender, instance, created, **kwargs):
+    is_pending = instance.status == 'pending'
+    if created:
+        bump_course_rollup(instance.assignment.course_id, submission_count=1, pending_submission_count=int(is_pending))
+        bump_daily_submission_counts(instance, 1)
+        return
+
+    was_pending = getattr(instance, '_previous_status', None) == 'pending'
+    if was_pending != is_pending:
+        bump_course_rollup(instance.assignment.course_id, pending_submission_count=int(is_pending) - int(was_pending))
+
+
+@receiver(post_delete, sender=AssignmentSubmission)
+def submission_deleted(sender, instance, **kwargs):
+    try:
+        course_id = instance.assignment.course_id
+    except Assignment.DoesNotExist:
+        return
+    bump_course_rollup(
+        course_id, touch=False,
+        submission_count=-1, pending_submission_count=-int(instance.status == 'pending'),
+    )
+    bump_daily_submission_counts(instance, -1)
+
+
+# Progress store
+@receiver(pre_save, sender=Lesson)
+def remember_lesson_module(sender, instance, **kwargs):
+    # Needed to move the lesson's count and completions when it changes module
+    instance._previous_module_id = None
+    if instance.pk:
+        instance._previous_module_id = Lesson.objects.filter(pk=instance.pk).values_list('module_id', flat=True).first()
+
+
+@receiver(post_save, sender=Lesson)
+def lesson_saved(sender, instance, created, **kwargs):
+    previous_module_id = getattr(instance, '_previous_module_id', None)
+    if created:
+        user_ids = bump_module_lesson_count(instance.module_id, 1)
+    elif previous_module_id and previous_module_id != instance.module_id:
+        user_ids = move_lesson_completions(instance.pk, previous_module_id, instance.module_id)
+    else:
+        return
+    # The rescale writes progress with bulk updates, which send no signals
+    bump_dashboard_versions(user_ids=user_ids)
+
+
+@receiver(post_delete, sender=Lesson)
+def lesson_deleted(sender, instance, **kwargs):
+    bump_dashboard_versions(user_ids=bump_module_lesson_count(instance.module_id, -1))
+
+
+@receiver(pre_save, sender=LessonProgress)
+def remember_lesson_completion(sender, instance, **kwargs):
+    instance._was_completed = False
+    if instance.pk:
+        instance._was_completed = bool(
+            LessonProgress.objects.filter(pk=instance.pk).values_list('completed', flat=True).first()
+        )
+
+
+@receiver(post_save, sender=LessonProgress)
+def lesson_progress_saved(sender, instance, created, **kwargs):
+    delta = int(instance.completed) - int(getattr(instance, '_was_completed', False))
+    if delta:
+        bump_module_completion(instance.user_id, instance.lesson.module, delta)
+
+
+@receiver(post_delete, sender=LessonProgress)
+def lesson_progress_deleted(sender, instance, **kwargs):
+    if not instance.completed:
+        return
+    try:
+        module = instance.lesson.module
+    except (Lesson.DoesNotExist, CourseModule.DoesNotExist):
+        return
+    bump_module_completion(instance.user_id, module, -1)
+
+
+# Live class occurrences
+@receiver(post_save, sender=LiveClassSchedule)
+def schedule_saved(sender, instance, **kwargs):
+    refresh_schedule_occurrences(instance)
+
+
+# Calendar feed invalidation
+@receiver([post_save, post_delete], sender=LiveClassSchedule)
+@receiver(post_save, sender=LiveClassOccurrence)
+def feed_schedule_changed(sender, instance, **kwargs):
+    bump_feed_versions(course_ids=[instance.course_id])
+
+
+@receiver([post_save, post_delete], sender=Course)
+def feed_course_changed(sender, instance, **kwargs):
+    # Event summaries include the course name
+    bump_feed_versions(course_ids=[instance.pk])
+
+
+@receiver([post_save, post_delete], sender=Enrollment)
+def feed_enrollment_changed(sender, instance, **kwargs):
+    user_id = Student.objects.filter(pk=instance.student_id).values_list('user_id', flat=True).first()
+    bump_feed_versions(user_ids=[user_id])
+
+
+# Dashboard cache invalidation
+@receiver([post_save, post_delete], sender=Course)
+def course_changed(sender, instance, **kwargs):
+    # The instructor's dashboard lists their courses, so a new or removed one changes it
+    user_id = Instructor.objects.filter(pk=instance.instructor_id).values_list('user_id', flat=True).first()
+    bump_dashboard_versions(user_ids=[user_id], course_ids=[instance.pk])
+
+
+@receiver([post_save, post_delete], sender=CourseModule)
+def module_changed(sender, instance, **kwargs):
+    bump_dashboard_versions(course_ids=[instance.course_id])
+
+
+@receiver([post_save, post_delete], sender=Lesson)
+def lesson_changed(sender, instance, **kwargs):
+    course_ids = CourseModule.objects.filter(
+        pk__in=[instance.module_id, getattr(instance, '_previous_module_id', None)]
+    ).values_list('course_id', flat=True)
+    bump_dashboard_versions(course_ids=list(course_ids))
+
+
+@receiver([post_save, post_delete], sender=Enrollment)
+def enrollment_changed(sender, instance, **kwargs):
+    user_id = Student.objects.filter(pk=instance.student_id).values_list('user_id', flat=True).first()
+    bump_dashboard_versions(user_ids=[user_id], course_ids=[instance.course_id])
+
+
+@receiver([post_save, post_delete], sender=ModuleProgress)
+@receiver([post_save, post_delete], sender=LessonProgress)
+def progress_changed(sender, instance, **kwargs):
+    bump_dashboard_versions(user_ids=[instance.user_id])
+
+
+@receiver([post_save, post_delete], sender=AssignmentSubmission)
+def submission_changed(sender, instance, **kwargs):
+    user_id = Student.objects.filter(pk=instance.student_id).values_list('user_id', flat=True).first()
+    course_id = Assignment.objects.filter(pk=instance.assignment_id).values_list('course_id', flat=True).first()
+    bump_dashboard_versions(user_ids=[user_id], course_ids=[course_id])
+
+
+@receiver([post_save, post_delete], sender=Assignment)
+def assignment_changed(sender, instance, **kwargs):
+    bump_dashboard_versions(course_ids=[instance.course_id, getattr(instance, '_previous_course_id', None)])
+
+
+@receiver([post_save, post_delete], sender=LiveClassSchedule)
+def live_class_changed(sender, instance, **kwargs):
+    bump_dashboard_versions(user_ids=[instance.instructor_id], course_ids=[instance.course_id])
+
+
+@receiver(post_save, sender=LiveClassOccurrence)
+def occurrence_changed(sender, instance, **kwargs):
+    bump_dashboard_versions(course_ids=[instance.course_id])
@@ -1,3 +1,554 @@
-from django.test import TestCase
+from datetime import time, timedelta
+from decimal import Decimal
+from importlib import import_module
+from smtplib import SMTPServerDisconnected
+from unittest import mock
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.apps import apps
+from django.core import mail
+from django.core.cache import cache
+from django.db import connection
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import AsyncRequestFactory, RequestFactory, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory, force_authenticate
+from user_auth.models import CustomUser, Instructor, Student
+from .middleware import QueryBudgetMiddleware
+from .models import (
+    Assignment, AssignmentSubmission, Course, CourseModule, CourseRollup, DailySubmissionCount, Enrollment, Lesson, LessonProgress,
+    LiveClassSchedule, ModuleProgress,
+)
+from .calendar_feed import get_feed_version, make_feed_token, read_feed_token, render_feed, rotate_feed_token
+from .dashboard import DashboardContext, DashboardSection, evaluate_concurrently
+from .dashboard_cache import cache_dashboard, get_cached_dashboard, snapshot_dashboard_versions
+from .email_backend import SMTPConnectionPool, send_email
+from .email_templates import EmailTemplate
+from .progress import get_user_course_progress
+from .query_budget import assert_query_budget, fingerprint
+from .rollups import rebuild_course_rollups, rebuild_daily_submission_counts
+from .utils import calculate_user_progress
+from .views import AnalyticsDashboard, ConcurrentAnalyticsDashboard, DashboardSectionMetricsView
 
-# Create your tests here.
+
+class InstructorDashboardQueryCountTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = CustomUser.objects.create_user(
+            email='instructor@example.com', username='instructor', password='secret', role='Instructor'
+        )
+        self.instructor = Instructor.objects.create(user=self.user)
+        self.student_number = 0
+
+    def add_course(self, assignments, students):
+        course = Course.objects.create(
+            code='C', name=f'Course {Course.objects.count()}', description='', instructor=self.instructor
+        )
+        module = CourseModule.objects.create(course=course, title='Module', description='')
+        Lesson.objects.create(module=module, title='Lesson', content='')
+        LiveClassSchedule.objects.create(
+            course=course, instructor=self.user, title='Live', description='',
+            start_time=time(10), date=timezone.now(), room='Room',
+        )
+
+        enrolled = []
+        for _ in range(students):
+            self.student_number += 1
+            user = CustomUser.objects.create_user(
+                email=f'student{self.student_number}@example.com', username=f'student{self.student_number}', password='secret'
+            )
+            student = Student.objects.create(user=user)
+            Enrollment.objects.create(student=student, course=course)
+            enrolled.append(student)
+
+        for _ in range(assignments):
+            assignment = Assignment.objects.create(
+                title='Assignment', description='', due_date=timezone.now() + timedelta(days=7), course=course, points=10
+            )
+            for student in enrolled:
+                AssignmentSubmission.objects.create(assignment=assignment, student=student, content='', status='pending')
+
+    def fetch_dashboard(self):
+        cache.clear()
+        request = APIRequestFactory().get('/api/elearning/analytics-dashboard/')
+        force_authenticate(request, user=self.user)
+        with CaptureQueriesContext(connection) as queries:
+            response = AnalyticsDashboard.as_view()(request)
+        self.assertEqual(response.status_code, 200)
+        return response.data, len(queries)
+
+    def test_query_count_is_independent_of_courses_and_assignments(self):
+        self.add_course(assignments=1, students=1)
+        data, small_count = self.fetch_dashboard()
+        self.assertEqual(data['Course_count'], 1)
+        self.assertEqual(data['Total Submissions'], 1)
+
+        self.add_course(assignments=3, students=2)
+        self.add_course(assignments=2, students=3)
+        data, large_count = self.fetch_dashboard()
+
+        self.assertEqual(data['Course_count'], 3)
+        self.assertEqual(data['Total Students'], 6)
+        self.assertEqual(data['Total Submissions'], 1 + 3 * 2 + 2 * 3)
+        self.assertEqual(large_count, small_count)
+
+
+class DashboardCacheInvalidationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = CustomUser.objects.create_user(
+            email='instructor@example.com', username='instructor', password='secret', role='Instructor'
+        )
+        self.instructor = Instructor.objects.create(user=self.user)
+        self.course = Course.objects.create(code='C', name='Course', description='', instructor=self.instructor)
+        self.module = CourseModule.objects.create(course=self.course, title='Module', description='')
+        self.student = CustomUser.objects.create_user(email='student@example.com', username='student', password='secret')
+        Enrollment.objects.create(student=Student.objects.create(user=self.student), course=self.course)
+
+    def fetch_dashboard(self):
+        request = APIRequestFactory().get('/api/elearning/analytics-dashboard/')
+        force_authenticate(request, user=self.user)
+        return AnalyticsDashboard.as_view()(request).data
+
+    def test_new_course_invalidates_instructor_dashboard(self):
+        self.assertEqual(self.fetch_dashboard()['Course_count'], 1)
+        Course.objects.create(code='D', name='Other', description='', instructor=self.instructor)
+        self.assertEqual(self.fetch_dashboard()['Course_count'], 2)
+
+    def test_lesson_changes_invalidate_student_dashboard(self):
+        cache_dashboard(self.student, snapshot_dashboard_versions(self.student, [self.course.pk]), {'cached': True})
+        self.assertIsNotNone(get_cached_dashboard(self.student))
+        Lesson.objects.create(module=self.module, title='Lesson', content='')
+        self.assertIsNone(get_cached_dashboard(self.student))
+
+
+# Committed data, so the section pool's threads can read it
+class ConcurrentDashboardTests(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+        self.instructor = CustomUser.objects.create_user(
+            email='instructor@example.com', username='instructor', password='secret', role='Instructor'
+        )
+        course = Course.objects.create(
+            code='C', name='Course', description='', instructor=Instructor.objects.create(user=self.instructor)
+        )
+        lesson = Lesson.objects.create(
+            module=CourseModule.objects.create(course=course, title='Module', description=''), title='Lesson', content=''
+        )
+        LiveClassSchedule.objects.create(
+            course=course, instructor=self.instructor, title='Live', description='',
+            start_time=time(10), date=timezone.now(), room='Room',
+        )
+        self.student = CustomUser.objects.create_user(email='student@example.com', username='student', password='secret')
+        student = Student.objects.create(user=self.student)
+        Enrollment.objects.create(student=student, course=course)
+        LessonProgress.objects.create(user=self.student, lesson=lesson, completed=True)
+        assignment = Assignment.objects.create(
+            title='Assignment', description='', due_date=timezone.now() + timedelta(days=7), course=course, points=10
+        )
+        AssignmentSubmission.objects.create(assignment=assignment, student=student, content='', status='pending')
+        self.admin = CustomUser.objects.create_user(
+            email='admin@example.com', username='admin', password='secret', role='Administrator'
+        )
+
+    def fetch(self, view, user):
+        cache.clear()
+        request = APIRequestFactory().get('/')
+        force_authenticate(request, user=user)
+        response = view.as_view()(request)
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def assertSamePayloads(self):
+        for user in (self.student, self.instructor, self.admin):
+            with self.subTest(role=user.role):
+                self.assertEqual(self.fetch(ConcurrentAnalyticsDashboard, user), self.fetch(AnalyticsDashboard, user))
+
+    def test_concurrent_payload_matches_sequential(self):
+        self.assertSamePayloads()
+
+    @override_settings(DASHBOARD_QUEUE_TIMEOUT=0)
+    def test_sections_fall_back_to_the_request_thread(self):
+        with self.assertLogs('elearning.dashboard', 'INFO') as logs:
+            self.assertSamePayloads()
+        self.assertIn('evaluated in the request thread', logs.output[0])
+
+
+class DashboardSectionMetricsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.instructor = CustomUser.objects.create_user(
+            email='instructor@example.com', username='instructor', password='secret', role='Instructor'
+        )
+        Instructor.objects.create(user=self.instructor)
+        self.staff = CustomUser.objects.create_user(
+            email='staff@example.com', username='staff', password='secret', role='Administrator', is_staff=True
+        )
+
+    def get(self, view, user):
+        request = APIRequestFactory().get('/')
+        force_authenticate(request, user=user)
+        return view.as_view()(request)
+
+    def test_metrics_report_evaluated_sections(self):
+        before = self.get(DashboardSectionMetricsView, self.staff).data['Instructor']['summary']['calls']
+        self.get(AnalyticsDashboard, self.instructor)
+
+        response = self.get(DashboardSectionMetricsView, self.staff)
+        summary = response.data['Instructor']['summary']
+        self.assertEqual(summary['calls'], before + 1)
+        self.assertEqual(summary['cost'], 'light')
+        self.assertGreater(summary['avg_queries'], 0)
+        self.assertEqual(self.get(DashboardSectionMetricsView, self.instructor).status_code, 403)
+
+
+class LiveClassFeedTests(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(email='student@example.com', username='student', password='secret')
+        instructor = Instructor.objects.create(user=CustomUser.objects.create_user(
+            email='instructor@example.com', username='instructor', password='secret', role='Instructor'
+        ))
+        self.schedule = LiveClassSchedule(
+            id=1, course=Course(name='Course', instructor=instructor), title='Live', description='', room='Room',
+            start_time=time(9), date=timezone.now(), duration=timedelta(hours=1), recurrence='weekly',
+        )
+
+    def render(self):
+        return ''.join(render_feed([self.schedule], {}, 'example.com'))
+
+    def test_rotating_the_key_revokes_issued_tokens(self):
+        token = make_feed_token(self.user)
+        self.assertEqual(read_feed_token(token), self.user.id)
+        new_token = rotate_feed_token(self.user)
+        self.assertIsNone(read_feed_token(token))
+        self.assertEqual(read_feed_token(new_token), self.user.id)
+
+    @override_settings(TIME_ZONE='UTC')
+    def test_utc_feed_uses_utc_times(self):
+        feed = self.render()
+        self.assertIn('\r\nDTSTART:', feed)
+        self.assertNotIn('TZID', feed)
+
+    @override_settings(TIME_ZONE='Europe/Berlin')
+    def test_local_feed_describes_its_time_zone(self):
+        feed = self.render()
+        self.assertIn('BEGIN:VTIMEZONE\r\nTZID:Europe/Berlin\r\n', feed)
+        self.assertIn('TZOFFSETFROM:+0100\r\nTZOFFSETTO:+0200\r\n', feed)
+        self.assertIn('DTSTART;TZID=Europe/Berlin:', feed)
+        self.assertLess(feed.index('END:VTIMEZONE'), feed.index('BEGIN:VEVENT'))
+
+    def test_renaming_a_course_changes_the_feed_version(self):
+        course = self.schedule.course
+        course.save()
+        version = get_feed_version(self.user.id, [course.pk])
+        course.name = 'Renamed'
+        course.save()
+        self.assertNotEqual(get_feed_version(self.user.id, [course.pk]), version)
+
+
+class QueryBudgetTests(TestCase):
+    def test_fingerprint_ignores_in_list_length(self):
+        self.assertEqual(
+            fingerprint('SELECT * FROM t WHERE id IN (%s, %s)'),
+            fingerprint('SELECT * FROM t WHERE id IN (%s, %s, %s)'),
+        )
+
+    def test_assert_query_budget(self):
+        with assert_query_budget(max_queries=2) as queries:
+            list(Course.objects.all())
+        self.assertEqual(queries.count, 1)
+
+        with self.assertRaisesMessage(AssertionError, 'Query budget of 1 exceeded'):
+            with assert_query_budget(max_queries=1):
+                list(Course.objects.all())
+                list(Course.objects.all())
+
+        with self.assertRaisesMessage(AssertionError, 'repeated 3 times'):
+            with assert_query_budget(max_duplicates=1):
+                for _ in range(3):
+                    list(Course.objects.filter(pk=1))
+
+    @override_settings(QUERY_BUDGET_HEADERS=True)
+    def test_middleware_reports_queries(self):
+        def view(request):
+            list(Course.objects.all())
+            return HttpResponse()
+
+        response = QueryBudgetMiddleware(view)(RequestFactory().get('/'))
+        self.assertEqual(response['X-Query-Count'], '1')
+        self.assertTrue(response['Server-Timing'].startswith('db;desc="1 queries";dur='))
+
+    @override_settings(QUERY_BUDGET_HEADERS=True)
+    async def test_middleware_runs_async_views_natively(self):
+        async def view(request):
+            await sync_to_async(list)(Course.objects.all())
+            return HttpResponse()
+
+        middleware = QueryBudgetMiddleware(view)
+        self.assertTrue(iscoroutinefunction(middleware))
+        response = await middleware(AsyncRequestFactory().get('/'))
+        self.assertEqual(response['X-Query-Count'], '1')
+
+    def test_recorder_counts_section_worker_queries(self):
+        class View:
+            def count_courses(self, context):
+                return {'courses': Course.objects.count()}
+
+        sections = [DashboardSection(f'section{number}', 'count_courses') for number in range(3)]
+        with assert_query_budget() as queries:
+            evaluate_concurrently(sections, View(), DashboardContext(None))
+        self.assertEqual(queries.count, 3)
+
+    @override_settings(QUERY_BUDGET_HEADERS=True, QUERY_BUDGET_DEFAULT=2)
+    def test_middleware_counts_streamed_queries(self):
+        def rows():
+            for _ in range(3):
+                yield str(Course.objects.count())
+
+        def view(request):
+            return StreamingHttpResponse(rows())
+
+        response = QueryBudgetMiddleware(view)(RequestFactory().get('/'))
+        self.assertNotIn('X-Query-Count', response)
+        with self.assertLogs('elearning.middleware', 'WARNING') as logs:
+            self.assertEqual(b''.join(response.streaming_content), b'000')
+        self.assertIn('exceeded its query budget of 2: 3 queries', logs.output[0])
+
+
+class ProgressStoreTests(TestCase):
+    def setUp(self):
+        instructor = Instructor.objects.create(user=CustomUser.objects.create_user(
+            email='instructor@example.com', username='instructor', password='secret', role='Instructor'
+        ))
+        self.user = CustomUser.objects.create_user(email='student@example.com', username='student', password='secret')
+        self.course = Course.objects.create(code='C', name='Course', description='', instructor=instructor)
+        self.first = CourseModule.objects.create(course=self.course, title='First', description='')
+        self.second = CourseModule.objects.create(course=self.course, title='Second', description='')
+        self.enrollment = Enrollment.objects.create(student=Student.objects.create(user=self.user), course=self.course)
+        self.lesson = Lesson.objects.create(module=self.first, title='One', content='')
+        Lesson.objects.create(module=self.first, title='Two', content='')
+        Lesson.objects.create(module=self.second, title='Three', content='')
+        LessonProgress.objects.create(user=self.user, lesson=self.lesson, completed=True)
+
+    def assertStoreMatchesSource(self):
+        expected = calculate_user_progress(self.user, self.course)
+        self.assertEqual(get_user_course_progress(self.user, self.course)['course_progress'], expected['course_progress'])
+        self.enrollment.refresh_from_db()
+        self.assertEqual(self.enrollment.progress, round(expected['course_progress']))
+        for module in expected['module_progresses']:
+            stored = ModuleProgress.objects.filter(user=self.user, module__title=module['module']).first()
+            self.assertEqual(float(stored.progress) if stored else 0, module['progress'])
+
+    def test_adding_a_lesson_rescales_module_and_enrollment(self):
+        Lesson.objects.create(module=self.first, title='Four', content='')
+        self.assertStoreMatchesSource()
+        self.assertEqual(ModuleProgress.objects.get(user=self.user, module=self.first).progress, Decimal('33.33'))
+
+    def test_moving_a_lesson_updates_both_modules(self):
+        self.lesson.module = self.second
+        self.lesson.save()
+        self.first.refresh_from_db()
+        self.second.refresh_from_db()
+        self.assertEqual((self.first.lesson_count, self.second.lesson_count), (1, 2))
+        self.assertStoreMatchesSource()
+
+
+class CourseRollupTests(TestCase):
+    fields = ('course_id', 'enrollment_count', 'assignment_count', 'submission_count', 'pending_submission_count')
+
+    def setUp(self):
+        self.courses = [
+            Course.objects.create(code=name, name=name, description='', instructor=Instructor.objects.create(
+                user=CustomUser.objects.create_user(
+                    email=f'{name}@example.com', username=name, password='secret', role='Instructor'
+                )
+            ))
+            for name in ('first', 'second')
+        ]
+        self.student = Student.objects.create(user=CustomUser.objects.create_user(
+            email='student@example.com', username='student', password='secret'
+        ))
+        Enrollment.objects.create(student=self.student, course=self.courses[0])
+        self.assignment = Assignment.objects.create(
+            title='A', description='', due_date=timezone.now(), course=self.courses[0], points=10
+        )
+        self.submissions = [
+            AssignmentSubmission.objects.create(assignment=self.assignment, student=self.student, content='', status=status)
+            for status in ('pending', 'pending', 'reviewed')
+        ]
+
+    def counts(self, course):
+        return CourseRollup.objects.values_list(*self.fields[1:]).get(course=course)
+
+    def snapshot(self):
+        # Decrements leave zero rows behind that a rebuild does not write
+        daily_counts = DailySubmissionCount.objects.filter(count__gt=0).values_list('scope', 'scope_id', 'date', 'count')
+        return list(CourseRollup.objects.order_by('course_id').values_list(*self.fields)), set(daily_counts)
+
+    def assertRollupsMatchSource(self):
+        maintained = self.snapshot()
+        rebuild_course_rollups()
+        rebuild_daily_submission_counts()
+        self.assertEqual(self.snapshot(), maintained)
+
+    def test_counters_follow_creates(self):
+        self.assertEqual(self.counts(self.courses[0]), (1, 1, 3, 2))
+        self.assertRollupsMatchSource()
+
+    def test_reviewing_a_submission_lowers_pending(self):
+        self.submissions[0].status = 'reviewed'
+        self.submissions[0].save()
+        self.submissions[2].content = 'Edited'
+        self.submissions[2].save()
+        self.assertEqual(self.counts(self.courses[0]), (1, 1, 3, 1))
+        self.assertRollupsMatchSource()
+
+    def test_deletes_lower_the_counters(self):
+        self.submissions[0].delete()
+        self.submissions[2].delete()
+        self.assertEqual(self.counts(self.courses[0]), (1, 1, 1, 1))
+        self.assignment.delete()
+        self.assertEqual(self.counts(self.courses[0]), (1, 0, 0, 0))
+        self.assertRollupsMatchSource()
+
+    def test_moving_an_assignment_updates_both_courses(self):
+        self.assignment.course = self.courses[1]
+        self.assignment.save()
+        self.assertEqual(self.counts(self.courses[0]), (1, 0, 0, 0))
+        self.assertEqual(self.counts(self.courses[1]), (0, 1, 3, 2))
+        self.assertRollupsMatchSource()
+
+
+class DailySubmissionCountTests(TestCase):
+    def setUp(self):
+        self.instructor = Instructor.objects.create(user=CustomUser.objects.create_user(
+            email='instructor@example.com', username='instructor', password='secret', role='Instructor'
+        ))
+        course = Course.objects.create(code='C', name='Course', description='', instructor=self.instructor)
+        self.assignment = Assignment.objects.create(title='A', description='', due_date=timezone.now(), course=course, points=10)
+        self.students = [
+            Student.objects.create(user=CustomUser.objects.create_user(email=f'{name}@example.com', username=name, password='secret'))
+            for name in ('first', 'second')
+        ]
+        self.submissions = [
+            AssignmentSubmission.objects.create(assignment=self.assignment, student=student, content='', status='pending')
+            for student in self.students + self.students[:1]
+        ]
+        self.years = (timezone.localdate().year, timezone.localdate().year - 1)
+
+    def source_stats(self, submissions):
+        chart_data = {year: [0] * 12 for year in reversed(self.years)}
+        for submitted_date in submissions.values_list('submitted_date', flat=True):
+            date = timezone.localdate(submitted_date)
+            chart_data[date.year][date.month - 1] += 1
+        return chart_data
+
+    def assertCountersMatchSource(self):
+        dashboard = AnalyticsDashboard()
+        scopes = [('all', 0, AssignmentSubmission.objects.all())]
+        scopes.append(('instructor', self.instructor.id, AssignmentSubmission.objects.filter(assignment__course__instructor=self.instructor)))
+        scopes += [('student', student.id, AssignmentSubmission.objects.filter(student=student)) for student in self.students]
+        for scope, scope_id, submissions in scopes:
+            self.assertEqual(dashboard.aggregate_submission_stats(scope, scope_id, *self.years), self.source_stats(submissions))
+
+    def test_counters_follow_creates_and_deletes(self):
+        self.assertCountersMatchSource()
+        self.submissions[0].delete()
+        self.assertCountersMatchSource()
+        self.assertFalse(DailySubmissionCount.objects.exclude(scope__in=['all', 'instructor', 'student']).exists())
+
+    def test_rebuild_matches_source(self):
+        AssignmentSubmission.objects.filter(pk=self.submissions[1].pk).update(submitted_date=timezone.now() - timedelta(days=400))
+        rebuild_daily_submission_counts()
+        self.assertCountersMatchSource()
+
+    def test_migration_backfills_counters(self):
+        DailySubmissionCount.objects.all().delete()
+        import_module('elearning.migrations.0005_dailysubmissioncount').backfill_daily_submission_counts(apps, None)
+        self.assertCountersMatchSource()
+
+
+class EmailTemplateTests(TestCase):
+    def test_only_plain_placeholders_are_accepted(self):
+        for text in ('Hi {username!r}', 'Hi {username:>10}', 'Hi {}', 'Hi {user.name}'):
+            with self.assertRaises(ValueError):
+                EmailTemplate('broken', 'Subject', text)
+
+    def test_values_are_escaped_in_html_only(self):
+        email = EmailTemplate('welcome', 'Welcome {username}', 'Hi {username},\n\nWelcome & enjoy.').render(
+            {'username': '<b>Ada</b>'}
+        )
+        self.assertEqual(email.subject, 'Welcome <b>Ada</b>')
+        self.assertEqual(email.text, 'Hi <b>Ada</b>,\n\nWelcome & enjoy.\n')
+        self.assertIn('Hi &lt;b&gt;Ada&lt;/b&gt;,</p>', email.html)
+        self.assertIn('Welcome &amp; enjoy.</p>', email.html)
+        self.assertIn('<p style="', email.html)
+
+    def test_missing_values_raise_key_error(self):
+        template = EmailTemplate('invitation', 'Join as a {role}', 'Hello {username}')
+        with self.assertRaisesMessage(KeyError, 'missing role'):
+            template.render({'username': 'ada'})
+
+    def test_send_email_only_adds_html_when_given(self):
+        connection = mail.get_connection('django.core.mail.backends.locmem.EmailBackend')
+        self.assertEqual(send_email('Subject', 'Body', ['to@example.com'], connection=connection).alternatives, [])
+        email = send_email('Subject', 'Body', ['to@example.com'], connection=connection, html_message='<p>Body</p>')
+        self.assertEqual(email.alternatives, [('<p>Body</p>', 'text/html')])
+
+
+class SMTPConnectionPoolTests(TestCase):
+    key = ('smtp.example.com', 587, 'user', 'secret', True, False)
+
+    def setUp(self):
+        self.now = 1000.0
+        patcher = mock.patch('elearning.email_backend.time.monotonic', side_effect=lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.pool = SMTPConnectionPool(max_idle=2, max_age=300, max_messages=2, check_after=30)
+
+    def connect(self):
+        smtp = mock.Mock()
+        smtp.noop.return_value = (250, b'OK')
+        return smtp
+
+    def cycle(self, seconds=0):
+        session = self.pool.acquire(self.key, self.connect)
+        self.now += seconds
+        self.pool.release(self.key, session)
+        return session
+
+    def test_recently_used_sessions_are_reused_without_noop(self):
+        session = self.cycle()
+        self.assertIs(self.cycle(), session)
+        session.smtp.noop.assert_not_called()
+        self.assertEqual((self.pool.created, self.pool.reused), (1, 1))
+
+    def test_old_and_busy_sessions_are_retired(self):
+        session = self.cycle(seconds=301)
+        session.smtp.quit.assert_called_once()
+        self.assertIsNot(self.cycle(), session)
+
+        session = self.pool.acquire(self.key, self.connect)
+        session.sent = 2
+        self.pool.release(self.key, session)
+        session.smtp.quit.assert_called_once()
+        self.assertIsNot(self.pool.acquire(self.key, self.connect), session)
+        self.assertEqual(self.pool.created, 3)
+
+    def test_idle_sessions_are_checked_with_noop(self):
+        session = self.cycle()
+        self.now += 31
+        self.assertIs(self.cycle(), session)
+        session.smtp.noop.assert_called_once()
+
+        self.now += 31
+        session.smtp.noop.side_effect = SMTPServerDisconnected
+        session.smtp.quit.side_effect = SMTPServerDisconnected
+        self.assertIsNot(self.pool.acquire(self.key, self.connect), session)
+        session.smtp.close.assert_called_once()
+
+    def test_broken_sessions_are_not_returned(self):
+        session = self.pool.acquire(self.key, self.connect)
+        session.broken = True
+        self.pool.release(self.key, session)
+        self.assertIsNot(self.pool.acquire(self.key, self.connect), session)
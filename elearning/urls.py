@@ -3,8 +3,8 @@ from rest_framework.routers import DefaultRouter
 from .views import(
     AssignmentViewSet, CourseModuleViewSet, CourseViewSet, CourseProfileViewSet, 
     EnrollmentViewSet, LessonAssignmentViewSet, LessonProgressViewSet, 
-    LessonViewSet, LiveClassScheduleViewSet, ModuleAssignmentViewSet, 
-    ModuleProgressViewSet, AnalyticsDashboard, UserProgressView, SubscriptionPlanViewSet, get_enrolled_course,
+    LessonViewSet, LiveClassCalendarViewSet, LiveClassFeedView, LiveClassScheduleViewSet, ModuleAssignmentViewSet, 
+    ModuleProgressViewSet, AnalyticsDashboard, ConcurrentAnalyticsDashboard, DashboardSectionMetricsView, UserProgressView, SubscriptionPlanViewSet, get_enrolled_course,
     ElearningTransactionViewSet, InviteInstructorViewSet, InviteStudentViewSet, SubmissionViewSet
 )
 
@@ -12,6 +12,7 @@ from .views import(
 router = DefaultRouter()
 router.register(r'courses', CourseViewSet)
 router.register(r'live-classes', LiveClassScheduleViewSet)
+router.register(r'live-class-calendar', LiveClassCalendarViewSet, basename='live-class-calendar')
 router.register(r'course-profiles', CourseProfileViewSet)
 router.register(r'course-modules', CourseModuleViewSet)
 router.register(r'lessons', LessonViewSet)
@@ -28,7 +29,10 @@ router.register(r'transactions', ElearningTransactionViewSet, basename='transact
 
 urlpatterns = [
     path('', include(router.urls)),
+    path('live-classes/feed/<str:token>.ics', LiveClassFeedView.as_view(), name='live-class-feed'),
     path('analytics-dashboard/', AnalyticsDashboard.as_view(), name='analytics-dashboard'),
+    path('analytics-dashboard/concurrent/', ConcurrentAnalyticsDashboard.as_view(), name='analytics-dashboard-concurrent'),
+    path('analytics-dashboard/metrics/', DashboardSectionMetricsView.as_view(), name='analytics-dashboard-metrics'),
     path('invite-instructor/', InviteInstructorViewSet.as_view(), name='invite-instractor'),
     path('invite-student/', InviteStudentViewSet.as_view(), name='invite-student'),
     path('enrolled-course/', get_enrolled_course ),
@@ -1,7 +1,7 @@
 # utils.py
 from datetime import timedelta
 from django.db.models.functions import TruncMonth
-from django.db.models import Sum, Avg
+from django.db.models import Sum, Avg, Count, Q
 from .models import CourseModule, Enrollment, Lesson, LessonProgress, UserActivity, LessonAssignment, ModuleAssignment, ModuleProgress, UserProgress
 from django.db.models import Prefetch
 from django.contrib.auth import get_user_model
@@ -10,18 +10,36 @@ User = get_user_model()
 
 from django.utils import timezone
 
-def calculate_time_spent(user, course, start_date=None, end_date=None):
-    # This is an estimation based on module progress
-    progress_query = ModuleProgress.objects.filter(user=user, module__course=course)
+def _progress_window(start_date=None, end_date=None):
+    window = Q()
     if start_date:
-        progress_query = progress_query.filter(last_updated__gte=start_date)
+        window &= Q(last_updated__gte=start_date)
     if end_date:
-        progress_query = progress_query.filter(last_updated__lt=end_date)
-    
+        window &= Q(last_updated__lt=end_date)
+    return window
+
+def time_spent_aggregate(start_date=None, end_date=None):
+    # This is an estimation based on module progress
+    return Sum('progress', filter=_progress_window(start_date, end_date))
+
+def course_progress_aggregate(start_date=None, end_date=None):
+    return Avg('progress', filter=_progress_window(start_date, end_date))
+
+def calculate_time_spent(user, course, start_date=None, end_date=None):
+    progress_query = ModuleProgress.objects.filter(user=user, module__course=course)
+
     # Assuming each 1% progress takes 1 minute (adjust as needed)
-    total_progress = progress_query.aggregate(Sum('progress'))['progress__sum'] or 0
+    total_progress = progress_query.aggregate(total=time_spent_aggregate(start_date, end_date))['total'] or 0
     return total_progress * 60  # Convert to seconds
 
+def weekly_change(this_week, last_week):
+    if last_week > 0:
+        change = ((this_week - last_week) / last_week) * 100
+    else:
+        change = 100 if this_week > 0 else 0
+
+    return round(change, 1)
+
 def get_weekly_change(user, course, calculation_func):
     now = timezone.now()
     week_ago = now - timedelta(days=7)
@@ -29,21 +47,11 @@ def get_weekly_change(user, course, calculation_func):
 
     this_week = calculation_func(user, course, start_date=week_ago, end_date=now)
     last_week = calculation_func(user, course, start_date=two_weeks_ago, end_date=week_ago)
-
-    if last_week > 0:
-        change = ((this_week - last_week) / last_week) * 100
-    else:
-        change = 100 if this_week > 0 else 0
-
-    return round(change, 1)
+    return weekly_change(this_week, last_week)
 
 def calculate_course_progress(user, course, start_date=None, end_date=None):
     progress_query = ModuleProgress.objects.filter(user=user, module__course=course)
-    if start_date:
-        progress_query = progress_query.filter(last_updated__gte=start_date)
-    if end_date:
-        progress_query = progress_query.filter(last_updated__lt=end_date)
-    return progress_query.aggregate(Avg('progress'))['progress__avg'] or 0
+    return progress_query.aggregate(avg=course_progress_aggregate(start_date, end_date))['avg'] or 0
 
 
 def get_monthly_progress(user, course):
@@ -62,6 +70,63 @@ def get_monthly_progress(user, course):
     )
     return list(monthly_progress)
 
+def _month_windows(since):
+    """Split ``since``..now into calendar-month windows; the last one is open-ended."""
+    month = timezone.localtime(since).replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    windows = []
+    while month <= timezone.localtime():
+        next_month = (month + timedelta(days=32)).replace(day=1)
+        windows.append((month, max(month, since), next_month))
+        month = next_month
+    month, start, _ = windows[-1]
+    windows[-1] = (month, start, None)
+    return windows
+
+def get_progress_analytics(user, course):
+    """
+    Compute the student dashboard's progress figures in one aggregate query.
+
+    Covers the current time spent and course progress, their this-week and
+    last-week windows, and the six-month series returned by
+    ``get_monthly_progress``, using conditional aggregation over the user's
+    ModuleProgress rows for the course.
+    """
+    now = timezone.now()
+    week_ago = now - timedelta(days=7)
+    two_weeks_ago = now - timedelta(days=14)
+    months = _month_windows(now - timedelta(days=180))
+
+    aggregates = {
+        'time_spent': time_spent_aggregate(),
+        'time_spent_this_week': time_spent_aggregate(week_ago, now),
+        'time_spent_last_week': time_spent_aggregate(two_weeks_ago, week_ago),
+        'course_progress': course_progress_aggregate(end_date=now),
+        'course_progress_this_week': course_progress_aggregate(week_ago, now),
+        'course_progress_last_week': course_progress_aggregate(two_weeks_ago, week_ago),
+    }
+    for index, (_, start, end) in enumerate(months):
+        aggregates[f'month_{index}'] = course_progress_aggregate(start, end)
+        aggregates[f'month_{index}_rows'] = Count('id', filter=_progress_window(start, end))
+
+    row = ModuleProgress.objects.filter(user=user, module__course=course).aggregate(**aggregates)
+    row = {key: value or 0 for key, value in row.items()}
+
+    return {
+        'time_spent': {
+            'value': row['time_spent'] * 60,
+            'change': weekly_change(row['time_spent_this_week'] * 60, row['time_spent_last_week'] * 60),
+        },
+        'course_progress': {
+            'value': row['course_progress'],
+            'change': weekly_change(row['course_progress_this_week'], row['course_progress_last_week']),
+        },
+        'monthly_progress': [
+            {'month': month, 'avg_progress': row[f'month_{index}']}
+            for index, (month, _, _) in enumerate(months)
+            if row[f'month_{index}_rows']
+        ],
+    }
+
 def calculate_user_course_progress(user, course=None):
     base_query = ModuleProgress.objects.filter(user=user)
     
@@ -4,13 +4,18 @@ from datetime import datetime
 from django.db import transaction
 from django.core.validators import EmailValidator
 from django.core.exceptions import ValidationError, PermissionDenied, ObjectDoesNotExist
-from rest_framework.viewsets import ModelViewSet, ViewSet
+from rest_framework.viewsets import ModelViewSet, ReadOnlyModelViewSet, ViewSet
 from rest_framework.decorators import action
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated,IsAdminUser
 from django.db.models.functions import TruncMonth, TruncYear
-from django.db.models import Prefetch, Case, When, F, ExpressionWrapper, TimeField, Count, Q, When
+from django.db.models import Prefetch, Case, When, F, ExpressionWrapper, TimeField, Count, Q, Sum, When
+from django.http import HttpResponse, StreamingHttpResponse
+from django.urls import reverse
 from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.dateparse import parse_date, parse_datetime
+from django.utils.http import http_date
 from rest_framework import serializers
 from rest_framework.response import Response
 from rest_framework.views import APIView
@@ -20,19 +25,27 @@ from notifications.services import NotificationService
 from payments.serializers import TransactionSerializer
 from payments.utils import PaymentUtils
 from user_auth.models import CustomUser as User, Instructor, Student
-from user_auth.utils import generate_password
+from user_auth.utils import generate_password, get_role_count
 from .models import (
     Assignment, AssignmentSubmission, Course, CourseModule, CourseProfile, Enrollment, Lesson, 
-    LessonAssignment, LessonProgress, LiveClassSchedule, ModuleAssignment, 
-    ModuleProgress, UserProgress, SubscriptionPlan,
+    LessonAssignment, LessonProgress, LiveClassOccurrence, LiveClassSchedule, ModuleAssignment, 
+    ModuleCompletion, ModuleProgress, UserProgress, SubscriptionPlan,
 )
+from .calendar_feed import (
+    cache_feed, get_cached_feed, get_feed_version, make_feed_token, read_feed_token, render_feed, rotate_feed_token,
+)
+from .dashboard import DashboardContext, DashboardSection, evaluate_concurrently
+from .dashboard_cache import cache_dashboard, get_cached_dashboard, snapshot_dashboard_versions
+from .pagination import LiveClassPagination
+from .progress import get_user_course_progress
+from .rollups import get_course_rollups, get_daily_submission_counts
 from .send_mails import send_invitation_emails
 from .serializers import (
     AssignmentSerializer, AssignmentSubmissionSerializer, Assignment_SubmissionSerializer, CourseModuleSerializer,
     ModuleSerializer, CourseSerializer, CourseProfileSerializer, 
     EnrollmentSerializer, LessonAssignmentSerializer, 
     LessonProgressSerializer, LessonSerializer, 
-    LiveClassScheduleSerializer, ModuleAssignmentSerializer, 
+    LiveClassOccurrenceSerializer, LiveClassScheduleSerializer, ModuleAssignmentSerializer, 
     ModuleProgressSerializer, UserProgressSerializer, CourseDetailSerializer,
     SubscriptionPlanSerializer, AssignmentMarkingSerializer, StudentAssignmentSerializer
 )
@@ -40,7 +53,7 @@ from rest_framework.permissions import IsAuthenticated,AllowAny
 from django.db.models import Prefetch
 from .utils import (
     calculate_course_progress, calculate_time_spent,
-    calculate_module_progress, calculate_user_progress, get_monthly_progress, get_weekly_change
+    calculate_module_progress, get_monthly_progress, get_progress_analytics, get_weekly_change
 )
 
 class SubmissionViewSet(ModelViewSet):
@@ -147,7 +160,7 @@ class CourseViewSet(ModelViewSet):
                     return Response({"error": "No active enrollment found for this student."}, status=status.HTTP_404_NOT_FOUND)
                 course = enrollment.course
 
-                progress_data = calculate_user_progress(user, course)
+                progress_data = get_user_course_progress(user, course)
                 serializer = CourseDetailSerializer(course, context={'request': request})
                 course_data = serializer.data
                 course_data['course_progress'] = progress_data['course_progress']
@@ -212,6 +225,7 @@ class LiveClassScheduleViewSet(ModelViewSet):
     queryset = LiveClassSchedule.objects.all()
     serializer_class = LiveClassScheduleSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = LiveClassPagination
     
     def perform_create(self, serializer):
         user = self.request.user
@@ -225,21 +239,18 @@ class LiveClassScheduleViewSet(ModelViewSet):
         self.notify_users(live_class)
 
     def get_queryset(self):
-        now = timezone.localtime()
         user = self.request.user
+        queryset = LiveClassSchedule.objects.select_related('course')
         if user.role == 'Administrator':
-            queryset = LiveClassSchedule.objects.filter(is_active=True)
+            queryset = queryset.filter(is_active=True)
         elif user.role == 'Instructor':
-            queryset = LiveClassSchedule.objects.filter(instructor=user, is_active=True)
+            queryset = queryset.filter(instructor=user, is_active=True)
         else:
             student = Student.objects.get(user=user)
             enrolled_courses = Course.objects.filter(enrollment__student=student)
-            queryset = LiveClassSchedule.objects.filter(course__in=enrolled_courses, is_active=True)
-
-        for schedule in queryset:
-            schedule.next_class_time = schedule.next_occurrence()
+            queryset = queryset.filter(course__in=enrolled_courses, is_active=True)
 
-        return sorted(queryset, key=lambda x: x.next_class_time)
+        return queryset.order_by_next_occurrence()
     
     def retrieve(self, request, *args, **kwargs):
         try:
@@ -269,29 +280,153 @@ class LiveClassScheduleViewSet(ModelViewSet):
 
     @action(detail=False, methods=['get'], url_path="next-class")
     def next_class(self, request):
-        queryset = self.get_queryset()
-        if queryset:
-            next_class = queryset[0] 
+        next_class = self.get_queryset().next_class()
+        if next_class:
             serializer = self.get_serializer(next_class)
             return Response(serializer.data)
         return Response({"message": "No upcoming classes found."})
 
+    @action(detail=False, methods=['get'], url_path="feed-url")
+    def feed_url(self, request):
+        """
+        Private iCalendar feed URL of the current user's enrolled live classes.
+        URL: /api/elearning/live-classes/feed-url/
+        Method: GET
+        """
+        path = reverse('live-class-feed', kwargs={'token': make_feed_token(request.user)})
+        return Response({"url": request.build_absolute_uri(path)})
+
+    @action(detail=False, methods=['post'], url_path="feed-url/rotate")
+    def rotate_feed_url(self, request):
+        """
+        Revoke the current user's feed URLs and issue a new one.
+        URL: /api/elearning/live-classes/feed-url/rotate/
+        Method: POST
+        """
+        path = reverse('live-class-feed', kwargs={'token': rotate_feed_token(request.user)})
+        return Response({"url": request.build_absolute_uri(path)})
+
     def notify_users(self, live_class : LiveClassSchedule):
         # Get all users enrolled in the course
         enrolled_students = live_class.course.enrollment_set.values_list('student__user', flat=True)
-        
-        # Fetch the actual User objects from the IDs
-        users = User.objects.filter(id__in=enrolled_students)
+        users = User.objects.filter(id__in=enrolled_students).only('id', 'username', 'email')
+
+        NotificationService.send_bulk(
+            users,
+            notification_type='live_class',
+            content=f'A new live class "{live_class.title}" for {live_class.course.name} is scheduled for {live_class.date} at {live_class.start_time}. Venue/Link: {live_class.room}',
+            email_subject='New Live Class Scheduled',
+            email_body=lambda user: f'Dear {user.username},\n\nA new live class "{live_class.title}" for the course "{live_class.course.name}" has been scheduled for {live_class.date} at {live_class.start_time}.\nVenue/Link: {live_class.room}\n\nBest regards,\nYour Team',
+        )
 
-        for user in users:
-            # Send a notification to each enrolled user
-            NotificationService.send_notification(
-                user=user,
-                notification_type='live_class',
-                content=f'A new live class "{live_class.title}" for {live_class.course.name} is scheduled for {live_class.date} at {live_class.start_time}. Venue/Link: {live_class.link_or_venue}',
-                email_subject='New Live Class Scheduled',
-                email_body=f'Dear {user.username},\n\nA new live class "{live_class.title}" for the course "{live_class.course.name}" has been scheduled for {live_class.date} at {live_class.start_time}.\nVenue/Link: {live_class.link_or_venue}\n\nBest regards,\nYour Team',
-            )
+class LiveClassCalendarViewSet(ReadOnlyModelViewSet):
+    """
+    Materialized live class occurrences in a date range.
+    URL: /api/elearning/live-class-calendar/?from=2024-09-01&to=2024-10-01
+    Method: GET
+    """
+    serializer_class = LiveClassOccurrenceSerializer
+    permission_classes = [IsAuthenticated]
+    max_range = timezone.timedelta(days=366)
+
+    def get_queryset(self):
+        user = self.request.user
+        queryset = LiveClassOccurrence.objects.filter(
+            schedule__is_active=True, is_cancelled=False
+        ).select_related('schedule', 'course')
+        if user.role == 'Administrator':
+            return queryset
+        elif user.role == 'Instructor':
+            return queryset.filter(schedule__instructor=user)
+        else:
+            return queryset.filter(course__in=Enrollment.objects.filter(student__user=user).values('course'))
+
+    def list(self, request, *args, **kwargs):
+        start = self.parse_bound('from')
+        end = self.parse_bound('to')
+        if end <= start or end - start > self.max_range:
+            raise serializers.ValidationError({'to': f"Must be after 'from' and at most {self.max_range.days} days later."})
+
+        occurrences = self.get_queryset().filter(start_at__gte=start, start_at__lt=end).order_by('start_at', 'id')
+        serializer = self.get_serializer(occurrences, many=True)
+        return Response(serializer.data)
+
+    def parse_bound(self, name):
+        value = self.request.query_params.get(name, '')
+        moment = parse_datetime(value)
+        if moment is None:
+            day = parse_date(value)
+            if day is None:
+                raise serializers.ValidationError({name: "Required; use an ISO date or datetime."})
+            moment = datetime.combine(day, datetime.min.time())
+        if timezone.is_naive(moment):
+            moment = timezone.make_aware(moment)
+        return moment
+
+    @action(detail=True, methods=['post'])
+    def cancel(self, request, pk=None):
+        """
+        Cancel a single occurrence without touching the rest of the series.
+        URL: /api/elearning/live-class-calendar/{id}/cancel/
+        Method: POST
+        """
+        occurrence = self.get_object()
+        user = request.user
+        if not (user.role == 'Administrator' or (user.role == 'Instructor' and occurrence.schedule.instructor_id == user.id)):
+            raise PermissionDenied("You do not have permission to cancel this live class.")
+
+        occurrence.is_cancelled = True
+        occurrence.save(update_fields=['is_cancelled'])
+        return Response(self.get_serializer(occurrence).data)
+
+class LiveClassFeedView(APIView):
+    """
+    iCalendar feed of the live classes in a user's enrolled courses.
+    URL: /api/elearning/live-classes/feed/<token>.ics
+    Method: GET
+
+    Calendar clients poll this without a JWT, so the user comes from the signed
+    token, checked against the user's current feed key. ETag and Last-Modified
+    come from cached change versions, so an unchanged poll is answered with 304
+    after the key and enrollment lookups.
+    """
+    authentication_classes = []
+    permission_classes = [AllowAny]
+
+    def get(self, request, token):
+        user_id = read_feed_token(token)
+        if user_id is None:
+            return Response({"detail": "Not found."}, status=status.HTTP_404_NOT_FOUND)
+
+        course_ids = list(Enrollment.objects.filter(student__user_id=user_id).values_list('course_id', flat=True))
+        etag, last_modified = get_feed_version(user_id, course_ids)
+        not_modified = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if not_modified is not None:
+            return not_modified
+
+        body = get_cached_feed(user_id, etag)
+        if body is not None:
+            response = HttpResponse(body, content_type='text/calendar; charset=utf-8')
+        else:
+            response = StreamingHttpResponse(self.stream(user_id, etag, course_ids), content_type='text/calendar; charset=utf-8')
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(last_modified)
+        response['Cache-Control'] = 'private, no-cache'
+        return response
+
+    def stream(self, user_id, etag, course_ids):
+        schedules = LiveClassSchedule.objects.filter(course_id__in=course_ids, is_active=True).select_related('course').order_by('id')
+        cancelled = {}
+        for schedule_id, start_at in LiveClassOccurrence.objects.filter(
+            schedule__in=schedules, is_cancelled=True
+        ).values_list('schedule_id', 'start_at'):
+            cancelled.setdefault(schedule_id, []).append(start_at)
+
+        chunks = []
+        for line in render_feed(schedules, cancelled, self.request.get_host()):
+            chunks.append(line)
+            yield line
+        cache_feed(user_id, etag, ''.join(chunks))
 
 class EnrollmentViewSet(ModelViewSet):
     """Viewset for enrollment model."""
@@ -425,17 +560,16 @@ class AssignmentViewSet(ModelViewSet):
         assignment = serializer.save(instructor=instructor, due_date=due_date)
         if due_date is None:
             raise ValidationError("Due date is required bana.")
-        enrolled_students = Enrollment.objects.filter(course=assignment.course).select_related('student')
-
-        for enrollment in enrolled_students:
-            student = enrollment.student
-            NotificationService.send_notification(
-                user=student.user,
-                notification_type='assignment',
-                content=f'A new assignment "{assignment.title}" has been posted for {assignment.course.name}.',
-                email_subject='New Assignment Posted',
-                email_body=f"Dear {student.user.username},\n\nA new assignment titled '{assignment.title}' has been posted for the course '{assignment.course.name}'. Please review the assignment and complete it by the due date: {assignment.due_date.strftime('%d %b, %Y %H:%M')}.",
-            )
+        enrolled_students = Enrollment.objects.filter(course=assignment.course).values_list('student__user', flat=True)
+        users = User.objects.filter(id__in=enrolled_students).only('id', 'username', 'email')
+
+        NotificationService.send_bulk(
+            users,
+            notification_type='assignment',
+            content=f'A new assignment "{assignment.title}" has been posted for {assignment.course.name}.',
+            email_subject='New Assignment Posted',
+            email_body=lambda user: f"Dear {user.username},\n\nA new assignment titled '{assignment.title}' has been posted for the course '{assignment.course.name}'. Please review the assignment and complete it by the due date: {assignment.due_date.strftime('%d %b, %Y %H:%M')}.",
+        )
 
     @action(detail=True, methods=['patch'], permission_classes=[IsAuthenticated])
     @transaction.atomic
@@ -594,62 +728,167 @@ class UserProgressView(APIView):
             return Response(serialized_progress.data)
 
 class AnalyticsDashboard(APIView):
+    """
+    Role-specific analytics dashboard.
+
+    Every part of the payload is a registered DashboardSection, so clients can
+    ask for only what they render with ``?sections=live_classes,submission_stats``.
+    Without the parameter the full role payload is returned.
+    """
     permission_classes = [IsAuthenticated]
+    section_providers = {
+        'Student': [
+            DashboardSection('time_spent', 'get_time_spent_section'),
+            DashboardSection('completion_rate', 'get_completion_rate_section'),
+            DashboardSection('course_enrolled', 'get_course_enrolled_section', cost='heavy'),
+            DashboardSection('assignments', 'get_assignments_section'),
+            DashboardSection('monthly_progress', 'get_monthly_progress_section'),
+            DashboardSection('submission_stats', 'get_submission_stats_section', cost='heavy'),
+            DashboardSection('live_classes', 'get_live_classes_section'),
+            DashboardSection('next_live_class', 'get_next_live_class_section'),
+        ],
+        'Administrator': [
+            DashboardSection('courses', 'get_admin_courses_section', cost='heavy'),
+            DashboardSection('lesson_assignments', 'get_lesson_assignments_section'),
+            DashboardSection('module_assignments', 'get_module_assignments_section'),
+            DashboardSection('user_counts', 'get_user_counts_section'),
+            DashboardSection('submission_stats', 'get_submission_stats_section', cost='heavy'),
+            DashboardSection('live_classes', 'get_live_classes_section'),
+        ],
+        'Instructor': [
+            DashboardSection('summary', 'get_instructor_summary_section'),
+            DashboardSection('courses', 'get_instructor_courses_section', cost='heavy'),
+            DashboardSection('live_classes', 'get_live_classes_section'),
+        ],
+    }
 
     def get(self, request):
         user = request.user
-        data = self.get_user_data(user)
-        data['live_classes'] = self.get_live_classes(user)
+        sections, variant = self.get_requested_sections(user, request.query_params.get('sections'))
+        data = get_cached_dashboard(user, variant)
+        if data is None:
+            versions = snapshot_dashboard_versions(user, self.get_dashboard_course_ids(user))
+            data = self.get_user_data(user, sections)
+            cache_dashboard(user, versions, data, variant)
+        else:
+            data['last_login'] = user.last_login
         return Response(data, status=status.HTTP_200_OK)
 
-    def get_user_data(self, user: User):
+    def get_requested_sections(self, user: User, requested):
+        """
+        Resolve the ``sections`` query parameter against the user's role.
+
+        :return: The sections to build and the cache variant naming them (None for the full payload)
+        """
+        available = self.section_providers.get(user.role, [])
+        if not requested:
+            return available, None
+
+        names = {name.strip() for name in requested.split(',') if name.strip()}
+        unknown = names - {section.name for section in available}
+        if unknown:
+            raise serializers.ValidationError({
+                'sections': f"Unknown section(s): {', '.join(sorted(unknown))}. "
+                            f"Available: {', '.join(section.name for section in available)}."
+            })
+        sections = [section for section in available if section.name in names]
+        return sections, ','.join(section.name for section in sections)
+
+    def get_dashboard_course_ids(self, user: User):
+        if user.role == 'Student':
+            return list(Enrollment.objects.filter(student__user=user).values_list('course_id', flat=True))
+        elif user.role == 'Instructor':
+            return list(Course.objects.filter(instructor__user=user).values_list('id', flat=True))
+        return []
+
+    def get_user_data(self, user: User, sections=None):
         data = {'user': user.username, 'last_login': user.last_login}
-        role_data_methods = {
-            "Student": self.get_student_data,
-            "Administrator": self.get_admin_data,
-            "Instructor": self.get_instructor_data
+        if sections is None:
+            sections = self.section_providers.get(user.role, [])
+
+        context = DashboardContext(user)
+        for section in sections:
+            data.update(section.evaluate(self, context))
+        return data
+
+    # Shared, memoized per request
+    def get_student(self, context):
+        return context.memo('student', lambda: Student.objects.get(user=context.user))
+
+    def get_student_enrollment(self, context):
+        def load():
+            try:
+                return self.get_enrollment(self.get_student(context), context.user)
+            except Enrollment.DoesNotExist:
+                return None
+        return context.memo('enrollment', load)
+
+    def get_student_analytics(self, context):
+        enrollment = self.get_student_enrollment(context)
+        if enrollment is None:
+            return None
+        return context.memo('analytics', lambda: get_progress_analytics(context.user, enrollment.course))
+
+    # Student sections
+    def get_time_spent_section(self, context):
+        analytics = self.get_student_analytics(context)
+        if analytics is None:
+            return {'total_time_spent': {'value': 0, 'change': "0.0% this week"}}
+        return {'total_time_spent': self.get_time_spent_data(analytics)}
+
+    def get_completion_rate_section(self, context):
+        analytics = self.get_student_analytics(context)
+        if analytics is None:
+            return {'course_completion_rate': {'value': 0, 'change': "0.0% this week"}}
+        return {'course_completion_rate': self.get_completion_rate_data(analytics)}
+
+    def get_course_enrolled_section(self, context):
+        enrollment = self.get_student_enrollment(context)
+        if enrollment is None:
+            return {'course_enrolled': None}
+        return {'course_enrolled': self.get_course_data(context.user, enrollment.course)}
+
+    def get_assignments_section(self, context):
+        enrollment = self.get_student_enrollment(context)
+        if enrollment is None:
+            return {'total_assignments': 0, 'completed_assignments': 0}
+        return {
+            'total_assignments': Assignment.objects.filter(course=enrollment.course).count(),
+            'completed_assignments': AssignmentSubmission.objects.filter(student=self.get_student(context)).count(),
         }
-        role_data = role_data_methods.get(user.role, lambda x: {})(user)
-        data.update(role_data)
 
-        # Add live classes data for all roles
-        data['live_classes'] = self.get_live_classes(user)
+    def get_monthly_progress_section(self, context):
+        analytics = self.get_student_analytics(context)
+        return {'monthly_progress': analytics['monthly_progress'] if analytics else []}
 
-        # Add next live class for students
-        if user.role == "Student":
-            course_enrolled = role_data.get('course_enrolled')
-            if course_enrolled:
-                next_class = self.get_next_live_class(course_enrolled['id'])
-                if next_class:
-                    data['next_live_class'] = self.format_next_class_data(next_class)
+    def get_next_live_class_section(self, context):
+        enrollment = self.get_student_enrollment(context)
+        next_class = self.get_next_live_class(enrollment.course_id) if enrollment else None
+        if next_class:
+            return {'next_live_class': self.format_next_class_data(next_class)}
+        return {}
 
-        return data
+    # Sections shared by several roles
+    def get_submission_stats_section(self, context):
+        return {'submission_stats': self.get_submission_stats_by_month(context.user)}
+
+    def get_live_classes_section(self, context):
+        return {'live_classes': self.get_live_classes(context.user)}
 
     def get_live_classes(self, user : User):
-        queryset = self.get_live_classes_queryset(user)
-        for schedule in queryset:
-            schedule.next_class_time = schedule.next_occurrence()
-        sorted_queryset = sorted(queryset, key=lambda x: x.next_class_time)
-        return LiveClassScheduleSerializer(sorted_queryset, many=True).data
+        queryset = self.get_live_classes_queryset(user).order_by_next_occurrence()
+        return LiveClassScheduleSerializer(queryset, many=True).data
 
     def get_live_classes_queryset(self, user : User):
+        schedules = LiveClassSchedule.objects.select_related('course')
         if user.role == 'Administrator':
-            return LiveClassSchedule.objects.filter(is_active=True)
+            return schedules.filter(is_active=True)
         elif user.role == 'Instructor':
-            return LiveClassSchedule.objects.filter(instructor=user, is_active=True)
+            return schedules.filter(instructor=user, is_active=True)
         else:  # Student
             student = Student.objects.get(user=user)
             enrolled_courses = Course.objects.filter(enrollment__student=student)
-            return LiveClassSchedule.objects.filter(course__in=enrolled_courses, is_active=True)
-
-    def get_student_data(self, user: User):
-        try:
-            student = Student.objects.get(user=user)
-            enrollment = self.get_enrollment(student, user)
-            course = enrollment.course
-            return self.get_course_data(user, course, student)
-        except Enrollment.DoesNotExist:
-            return self.get_default_student_data()
+            return schedules.filter(course__in=enrolled_courses, is_active=True)
 
     def get_enrollment(self, student : Student, user: User):
         return Enrollment.objects.select_related('course').prefetch_related(
@@ -661,34 +900,24 @@ class AnalyticsDashboard(APIView):
                      ))
         ).get(student=student)
 
-    def get_course_data(self, user: User, course : Course, student : Student):
+    def get_course_data(self, user: User, course : Course):
         course_data = CourseSerializer(course).data
         course_data.update(self.get_course_profile(course))
         course_data['modules'] = self.get_modules_data(user, course)
-        course_data['overal_progress'] = calculate_user_progress(user, course)
+        course_data['overal_progress'] = get_user_course_progress(user, course)
         course_data['lesson_progress'] = self.get_lesson_progress(user, course)
+        return course_data
 
+    def get_time_spent_data(self, analytics):
         return {
-            'total_time_spent': self.get_time_spent_data(user, course),
-            'course_completion_rate': self.get_completion_rate_data(user, course),
-            'course_enrolled': course_data,
-            'total_assignments': Assignment.objects.filter(course=course).count(),
-            'completed_assignments': AssignmentSubmission.objects.filter(student=student).count(),
-            # 'average_module_progress': self.get_average_module_progress(user, course),
-            'monthly_progress': get_monthly_progress(user, course),
-            'submission_stats': self.get_submission_stats_by_month(user),
+            'value': analytics['time_spent']['value'],
+            'change': f"{analytics['time_spent']['change']:+.1f}% this week"
         }
 
-    def get_time_spent_data(self, user: User, course : Course):
+    def get_completion_rate_data(self, analytics):
         return {
-            'value': calculate_time_spent(user, course),
-            'change': f"{get_weekly_change(user, course, calculate_time_spent):+.1f}% this week"
-        }
-
-    def get_completion_rate_data(self, user : User, course : Course):
-        return {
-            'value': calculate_course_progress(user, course, end_date=datetime.now()),
-            'change': f"{get_weekly_change(user, course, calculate_course_progress):+.1f}% this week"
+            'value': analytics['course_progress']['value'],
+            'change': f"{analytics['course_progress']['change']:+.1f}% this week"
         }
 
     def get_average_module_progress(self, user : User, course : Course):
@@ -712,14 +941,13 @@ class AnalyticsDashboard(APIView):
         } for module in modules]
 
     def get_lesson_progress(self, user : User, course : Course):
-        total_lessons = Lesson.objects.filter(module__course=course).count()
+        total_lessons = CourseModule.objects.filter(course=course).aggregate(total=Sum('lesson_count'))['total'] or 0
 
-        # Get the number of lessons completed by the user from LessonProgress
-        completed_lessons = LessonProgress.objects.filter(
+        # Get the number of lessons completed by the user from the progress store
+        completed_lessons = ModuleCompletion.objects.filter(
             user=user,
-            lesson__module__course=course,
-            completed=True
-        ).count()
+            course=course,
+        ).aggregate(total=Sum('completed_lessons'))['total'] or 0
 
         # Calculate the completion percentage
         if total_lessons > 0:
@@ -733,119 +961,94 @@ class AnalyticsDashboard(APIView):
             'completion_percentage': round(completion_percentage, 2),
         }
 
-    def get_default_student_data(self):
-        return {
-            'total_time_spent': {'value': 0, 'change': "0.0% this week"},
-            'course_completion_rate': {'value': 0, 'change': "0.0% this week"},
-            'course_enrolled': None,
-            'total_assignments': 0,
-            'completed_assignments': 0,
-            'average_module_progress': 0,
-            'monthly_progress': []
-        }
+    # Administrator sections
+    def get_admin_courses_section(self, context):
+        courses = Course.objects.select_related('rollup').prefetch_related('modules__lessons').order_by(
+            F('rollup__enrollment_count').desc(nulls_last=True)
+        )
+        return {'courses': self.annotate_submission_counts(CourseSerializer(courses, many=True).data, courses)}
 
-    def get_admin_data(self, user : User):
-        courses = Course.objects.annotate(enrollment_count=Count('enrollment')).order_by('-enrollment_count')
-        students = get_user_model().objects.filter(role="Student")
-        instructors = get_user_model().objects.filter(role="Instructor")
+    def get_lesson_assignments_section(self, context):
         lesson_assignments = LessonAssignment.objects.all()
-        module_assignments = ModuleAssignment.objects.all()
+        return {'lesson_assignments': self.annotate_lesson_submissions(LessonAssignmentSerializer(lesson_assignments, many=True).data)}
+
+    def get_module_assignments_section(self, context):
+        return {'module_assignments': ModuleAssignmentSerializer(ModuleAssignment.objects.all(), many=True).data}
 
+    def get_user_counts_section(self, context):
+        # The lists themselves are paginated under /api/user/directory/
         return {
-            'courses': self.annotate_submission_counts(CourseSerializer(courses, many=True).data, courses),
-            'lesson_assignments': self.annotate_lesson_submissions(LessonAssignmentSerializer(lesson_assignments, many=True).data),
-            'module_assignments': ModuleAssignmentSerializer(module_assignments, many=True).data,
-            'students': self.serialize_users(students),
-            'instructors': self.serialize_users(instructors),
-            'submission_stats': self.get_submission_stats_by_month(user),
+            'total_students': get_role_count('Student'),
+            'total_instructors': get_role_count('Instructor'),
         }
 
-    def get_instructor_data(self, user : User):
-        instructor = Instructor.objects.get(user=user)
-        courses = Course.objects.filter(instructor=instructor)
-        courses_data = self.annotate_submission_counts(CourseSerializer(courses, many=True).data, courses)
-
-        total_students = sum(Enrollment.objects.filter(course_id=course['id']).count() for course in courses_data)
-        total_submissions = sum(self.get_course_submission_count(Course.objects.get(id=course['id'])) for course in courses_data)
+    # Instructor sections
+    def get_instructor_summary_section(self, context):
+        # Per-course counts come from the rollup join, so this is one query however many courses there are
+        courses = Course.objects.filter(instructor__user=context.user).select_related('rollup')
+        rollups = get_course_rollups(courses)
 
         return {
-            'Total Students': total_students,
-            'Course_count': courses.count(),
-            'Total Submissions': total_submissions,
-            'courses': courses_data,
+            'Total Students': sum(rollup.enrollment_count for rollup in rollups.values()),
+            'Course_count': len(rollups),
+            'Total Submissions': sum(rollup.submission_count for rollup in rollups.values()),
         }
 
+    def get_instructor_courses_section(self, context):
+        courses = Course.objects.filter(instructor__user=context.user).select_related('rollup').prefetch_related('modules__lessons')
+        return {'courses': self.annotate_submission_counts(CourseSerializer(courses, many=True).data, courses)}
+
     def annotate_submission_counts(self, courses_data, courses):
+        rollups = get_course_rollups(courses)
         for course in courses_data:
-            course_obj = courses.get(id=course['id'])
-            course['submission_count'] = self.get_course_submission_count(course_obj)
-            course['enrollment_count'] = Enrollment.objects.filter(course_id=course['id']).count()
+            rollup = rollups[course['id']]
+            course['enrollment_count'] = rollup.enrollment_count
+            course['assignment_count'] = rollup.assignment_count
+            course['submission_count'] = rollup.submission_count
+            course['pending_submission_count'] = rollup.pending_submission_count
+            course['last_activity'] = rollup.last_activity
         return courses_data
 
-    def get_course_submission_count(self, course : Course):
-        assignments = Assignment.objects.filter(course=course)
-        return sum(AssignmentSubmission.objects.filter(assignment=assignment).count() for assignment in assignments)
-
     def annotate_lesson_submissions(self, lesson_assignments_data):
         for assignment in lesson_assignments_data:
             assignment['submission_count'] = AssignmentSubmission.objects.filter(assignment_id=assignment['id']).count()
         return lesson_assignments_data
 
-    def serialize_users(self, users):
-        return [{'username': user.username, 'email': user.email} for user in users]
-
     def get_next_live_class(self, course):
         if course:
-            now = timezone.localtime()
-            return LiveClassSchedule.objects.filter(
-                course=course,
-                is_active=True
-            ).annotate(
-                next_time=ExpressionWrapper(
-                    Case(
-                        When(start_time__gt=now.time(), then=F('start_time')),
-                        default=ExpressionWrapper(F('start_time'), output_field=TimeField())
-                    ),
-                    output_field=TimeField()
-                )
-            ).order_by('next_time').first()
+            return LiveClassSchedule.objects.filter(course=course, is_active=True).select_related('course').next_class()
         return None
 
     def format_next_class_data(self, next_class : LiveClassSchedule):
         return {
             'title': next_class.title,
             'course': next_class.course.name,
-            'time': next_class.next_occurrence(),
+            'time': next_class.next_start_at,
             'room': next_class.room
         }
 
     def get_submission_stats_by_month(self, user):
-        submission_stats = self.get_filtered_submission_stats(user)
+        scope, scope_id = self.get_submission_stats_scope(user)
         current_year, previous_year = datetime.now().year, datetime.now().year - 1
-        chart_data = self.aggregate_submission_stats(submission_stats, current_year, previous_year)
+        chart_data = self.aggregate_submission_stats(scope, scope_id, current_year, previous_year)
         return self.format_chart_data(chart_data, current_year, previous_year)
 
-    def get_filtered_submission_stats(self, user):
-        submission_stats = AssignmentSubmission.objects.all()
+    def get_submission_stats_scope(self, user):
         if user.role == 'Student':
-            student = Student.objects.get(user=user)
-            return submission_stats.filter(student=student)
+            return 'student', Student.objects.get(user=user).id
         elif user.role == 'Instructor':
-            instructor = Instructor.objects.get(user=user)
-            return submission_stats.filter(assignment__course__instructor=instructor)
-        elif user.role != 'Administrator':
-            return submission_stats.none()
-        return submission_stats
-
-    def aggregate_submission_stats(self, submission_stats, current_year, previous_year):
-        aggregated_stats = submission_stats.filter(submitted_date__year__in=[previous_year, current_year]).annotate(
-            month=TruncMonth('submitted_date'),
-            year=TruncYear('submitted_date')
-        ).values('year', 'month').annotate(submission_count=Count('id')).order_by('year', 'month')
+            return 'instructor', Instructor.objects.get(user=user).id
+        elif user.role == 'Administrator':
+            return 'all', 0
+        return None, None
 
+    def aggregate_submission_stats(self, scope, scope_id, current_year, previous_year):
         chart_data = {year: [0] * 12 for year in [previous_year, current_year]}
-        for stat in aggregated_stats:
-            chart_data[stat['year'].year][stat['month'].month - 1] = stat['submission_count']
+        if scope is None:
+            return chart_data
+
+        for date, count in get_daily_submission_counts(scope, scope_id, [previous_year, current_year]):
+            chart_data[date.year][date.month - 1] += count
         return chart_data
 
     def format_chart_data(self, chart_data, current_year, previous_year):
@@ -854,6 +1057,39 @@ class AnalyticsDashboard(APIView):
             {"label": str(current_year), "data": chart_data[current_year][:datetime.now().month]}
         ]
 
+class ConcurrentAnalyticsDashboard(AnalyticsDashboard):
+    """
+    Same payload as AnalyticsDashboard, with the requested sections evaluated
+    in parallel on a bounded thread pool so latency follows the slowest section
+    rather than the sum of all of them.
+    """
+
+    def get_user_data(self, user: User, sections=None):
+        data = {'user': user.username, 'last_login': user.last_login}
+        if sections is None:
+            sections = self.section_providers.get(user.role, [])
+
+        context = DashboardContext(user)
+        for section_data in evaluate_concurrently(sections, self, context):
+            data.update(section_data)
+        return data
+
+
+class DashboardSectionMetricsView(APIView):
+    """
+    Staff-only view of the measured cost of each dashboard section, per role.
+
+    The figures accumulate per process since it started, across the plain and
+    concurrent dashboards, which share their sections.
+    """
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response({
+            role: {section.name: section.metrics() for section in sections}
+            for role, sections in AnalyticsDashboard.section_providers.items()
+        }, status=status.HTTP_200_OK)
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def get_enrolled_course(request):
@@ -864,7 +1100,7 @@ def get_enrolled_course(request):
     # Get the enrollment object
     enrollment = get_object_or_404(Enrollment, user=request.user)
     course = enrollment.course
-    course_completion = calculate_course_progress(request.user, course, end_date=datetime.now())
+    course_completion = get_user_course_progress(request.user, course)['course_progress']
     serializer = CourseSerializer(course, context={'user': request.user})
     complition= {
         "progress" : course_completion
@@ -63,6 +63,8 @@ AUTH_USER_MODEL = 'user_auth.CustomUser'
 MIDDLEWARE = [
     # Default Django middleware
     "django.middleware.security.SecurityMiddleware",
+    # Query budget instrumentation, outermost so it sees every query of the request
+    "elearning.middleware.QueryBudgetMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -219,7 +221,22 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # INTERN_EMAIL = os.environ.get('INTERN_EMAIL')
 # SUPPORT_EMAIL = os.environ.get('SUPPORT_EMAIL')
 
-EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
+# Email goes straight out over pooled SMTP sessions. With EMAIL_USE_OUTBOX it is
+# queued in the outbox with the transaction that sent it instead, and is only
+# delivered while a `manage.py send_outbox` worker runs next to the web processes.
+EMAIL_USE_OUTBOX = str_to_bool(os.environ.get('EMAIL_USE_OUTBOX', 'False'))
+EMAIL_BACKEND = os.environ.get(
+    'EMAIL_BACKEND',
+    'notifications.outbox.OutboxEmailBackend' if EMAIL_USE_OUTBOX else 'elearning.email_backend.PooledSMTPBackend',
+)
+EMAIL_OUTBOX_DELIVERY_BACKEND = 'elearning.email_backend.PooledSMTPBackend'
+EMAIL_POOL_MAX_IDLE = int(os.environ.get('EMAIL_POOL_MAX_IDLE', 4))
+EMAIL_POOL_MAX_AGE = int(os.environ.get('EMAIL_POOL_MAX_AGE', 300))
+EMAIL_POOL_MAX_MESSAGES = int(os.environ.get('EMAIL_POOL_MAX_MESSAGES', 100))
+EMAIL_OUTBOX_MAX_ATTEMPTS = int(os.environ.get('EMAIL_OUTBOX_MAX_ATTEMPTS', 6))
+EMAIL_OUTBOX_BACKOFF_SECONDS = int(os.environ.get('EMAIL_OUTBOX_BACKOFF_SECONDS', 30))
+EMAIL_OUTBOX_SENT_RETENTION_DAYS = int(os.environ.get('EMAIL_OUTBOX_SENT_RETENTION_DAYS', 7))
+EMAIL_OUTBOX_DEAD_RETENTION_DAYS = int(os.environ.get('EMAIL_OUTBOX_DEAD_RETENTION_DAYS', 30))
 EMAIL_HOST = os.environ.get('EMAIL_HOST')
 EMAIL_PORT = os.environ.get('EMAIL_PORT')
 EMAIL_USE_TLS = str_to_bool(os.environ.get('EMAIL_USE_TLS', 'False'))
@@ -227,8 +244,27 @@ EMAIL_HOST_USER = os.environ.get('EMAIL_HOST_USER')
 EMAIL_HOST_PASSWORD = os.environ.get('EMAIL_PASSWORD')
 DEFAULT_FROM_EMAIL = EMAIL_HOST_USER
 
-SESSION_ENGINE = 'django.contrib.sessions.backends.cache'
-SESSION_CACHE_ALIAS = 'default'
+# Shared cache. Unread counters, dashboard/feed version tokens, OTPs and
+# sessions must be visible to every worker, so deployments set REDIS_URL
+# (atomic INCR); `manage.py check --deploy` fails without it. Without it
+# (development) the cache is per-process and sessions are kept in the database.
+REDIS_URL = os.environ.get('REDIS_URL')
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+    SESSION_ENGINE = 'django.contrib.sessions.backends.cache'
+    SESSION_CACHE_ALIAS = 'default'
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+    SESSION_ENGINE = 'django.contrib.sessions.backends.db'
 
 #payments update
 PAYPAL_CLIENT_ID = os.environ.get('PAYPAL_CLIENT_ID')
@@ -246,4 +282,37 @@ MPESA_INITIATOR_SECURITY_CREDENTIAL = 'Safaricom999!*!'
 MPESA_PASSKEY = os.environ.get('MPESA_PASSKEY')
 MPESA_CALLBACK_URL = os.environ.get('MPESA_CALLBACK_URL')
 MPESA_ENVIRONMENT = os.environ.get('MPESA_ENVIRONMENT')
-MPESA_PARTYB = os.environ.get('MPESA_PARTYB')
\ No newline at end of file
+MPESA_PARTYB = os.environ.get('MPESA_PARTYB')
+
+# Analytics dashboard
+DASHBOARD_CACHE_TIMEOUT = int(os.environ.get('DASHBOARD_CACHE_TIMEOUT', 300))
+DASHBOARD_MAX_WORKERS = int(os.environ.get('DASHBOARD_MAX_WORKERS', 4))
+# Seconds a concurrent dashboard's sections may wait for a worker before the request runs them itself
+DASHBOARD_QUEUE_TIMEOUT = float(os.environ.get('DASHBOARD_QUEUE_TIMEOUT', 1))
+
+# Query budgets, keyed by URL name; requests over budget are logged
+QUERY_BUDGET_HEADERS = str_to_bool(os.environ.get('QUERY_BUDGET_HEADERS', str(DEBUG)))
+QUERY_BUDGET_DEFAULT = int(os.environ.get('QUERY_BUDGET_DEFAULT', 50))
+QUERY_BUDGETS = {
+    'analytics-dashboard': 40,
+    'analytics-dashboard-concurrent': 40,
+    'course-full-detail': 10,
+    'assignment-assignment-overview': 10,
+}
+
+# Live classes
+LIVE_CLASS_HORIZON_DAYS = int(os.environ.get('LIVE_CLASS_HORIZON_DAYS', 90))
+LIVE_CLASS_FEED_CACHE_TIMEOUT = int(os.environ.get('LIVE_CLASS_FEED_CACHE_TIMEOUT', 3600))
+
+# Notification stream: only served when running elearning_proj.asgi:application
+# (e.g. uvicorn or daphne); WSGI requests to it get a 501
+NOTIFICATION_BROKER = 'notifications.pubsub.InProcessBroker'
+NOTIFICATION_STREAM_HEARTBEAT = int(os.environ.get('NOTIFICATION_STREAM_HEARTBEAT', 20))
+
+# Notification retention (manage.py archive_notifications)
+NOTIFICATION_RETENTION_DAYS = int(os.environ.get('NOTIFICATION_RETENTION_DAYS', 180))
+NOTIFICATION_RETENTION_MODE = os.environ.get('NOTIFICATION_RETENTION_MODE', 'archive')
+
+# In-process notification preference cache (per worker)
+NOTIFICATION_PREFERENCE_CACHE_SIZE = int(os.environ.get('NOTIFICATION_PREFERENCE_CACHE_SIZE', 10000))
+NOTIFICATION_PREFERENCE_CACHE_TTL = int(os.environ.get('NOTIFICATION_PREFERENCE_CACHE_TTL', 60))
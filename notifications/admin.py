@@ -1,5 +1,33 @@
 from django.contrib import admin
-from .models import NotificationPreference, Notification
+from .models import Announcement, ArchivedNotification, DigestItem, NotificationPreference, Notification, OutboxEmail
 
 admin.site.register(NotificationPreference)
-admin.site.register(Notification)
\ No newline at end of file
+admin.site.register(Notification)
+
+@admin.register(OutboxEmail)
+class OutboxEmailAdmin(admin.ModelAdmin):
+    list_display = ('subject', 'status', 'attempts', 'next_attempt_at', 'created_at', 'sent_at')
+    list_filter = ('status',)
+    # Bodies may hold credentials, OTPs and reset links; only delivery metadata is shown
+    fields = ('subject', 'from_email', 'to', 'cc', 'bcc', 'status', 'attempts', 'next_attempt_at', 'last_error',
+              'created_at', 'sent_at')
+    readonly_fields = fields
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+@admin.register(DigestItem)
+class DigestItemAdmin(admin.ModelAdmin):
+    list_display = ('subject', 'user', 'created_at')
+
+@admin.register(ArchivedNotification)
+class ArchivedNotificationAdmin(admin.ModelAdmin):
+    list_display = ('notification_type', 'user', 'created_at', 'archived_at')
+    list_filter = ('notification_type',)
+
+@admin.register(Announcement)
+class AnnouncementAdmin(admin.ModelAdmin):
+    list_display = ('title', 'course', 'author', 'created_at')
@@ -0,0 +1,62 @@
+import time
+from django.core.cache import cache
+from django.db.models import Exists, OuterRef, Q
+from elearning.models import Enrollment
+from .models import Announcement, AnnouncementRead
+
+ANNOUNCEMENT_VERSION_KEY = 'announcements:version'
+ANNOUNCEMENT_COUNT_TIMEOUT = 86400
+
+
+def with_read_state(queryset, user):
+    """Annotate ``is_read`` from the user's read markers."""
+    return queryset.select_related('course').annotate(
+        is_read=Exists(AnnouncementRead.objects.filter(user=user, announcement=OuterRef('pk')))
+    )
+
+
+def feed_announcements(user):
+    """Announcements of the courses the user is enrolled in, as merged into their feed."""
+    enrolled = Enrollment.objects.filter(student__user=user).values('course')
+    return with_read_state(Announcement.objects.filter(course__in=enrolled), user)
+
+
+def visible_announcements(user):
+    """Announcements the user may see: their enrolled courses' and those of courses they teach."""
+    enrolled = Enrollment.objects.filter(student__user=user).values('course')
+    return with_read_state(Announcement.objects.filter(Q(course__in=enrolled) | Q(course__instructor__user=user)), user)
+
+
+def unread_announcements(user):
+    return feed_announcements(user).filter(is_read=False)
+
+
+def _announcements_version():
+    version = cache.get(ANNOUNCEMENT_VERSION_KEY)
+    if version is None:
+        cache.add(ANNOUNCEMENT_VERSION_KEY, time.time_ns(), timeout=None)
+        version = cache.get(ANNOUNCEMENT_VERSION_KEY)
+    return version
+
+
+def bump_announcements_version():
+    """Invalidate every cached unread announcement count; new announcements reach many users at once."""
+    cache.set(ANNOUNCEMENT_VERSION_KEY, time.time_ns(), timeout=None)
+
+
+def _unread_announcement_count_key(user_id):
+    return f'announcements:unread:{user_id}:{_announcements_version()}'
+
+
+def get_unread_announcement_count(user):
+    """Number of unread announcements in the user's feed, cached until an announcement or their enrolment changes."""
+    key = _unread_announcement_count_key(user.id)
+    count = cache.get(key)
+    if count is None:
+        count = unread_announcements(user).count()
+        cache.set(key, count, timeout=ANNOUNCEMENT_COUNT_TIMEOUT)
+    return count
+
+
+def reset_unread_announcement_count(*user_ids):
+    cache.delete_many([_unread_announcement_count_key(user_id) for user_id in user_ids])
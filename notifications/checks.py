@@ -0,0 +1,31 @@
+from django.conf import settings
+from django.core.checks import Error, Tags, Warning, register
+
+PROCESS_LOCAL_CACHES = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+@register(Tags.caches, deploy=True)
+def check_shared_cache(app_configs, **kwargs):
+    """Unread counters and the dashboard and feed version tokens only work when every worker shares the cache."""
+    if settings.CACHES.get('default', {}).get('BACKEND') in PROCESS_LOCAL_CACHES:
+        return [Error(
+            "The default cache is local to each process.",
+            hint="Set REDIS_URL so every worker shares the unread counters and cache version tokens.",
+            id='notifications.E001',
+        )]
+    return []
+
+
+@register(deploy=True)
+def check_outbox_worker(app_configs, **kwargs):
+    """The outbox backend only queues email; nothing is delivered without the worker."""
+    if settings.EMAIL_BACKEND == 'notifications.outbox.OutboxEmailBackend':
+        return [Warning(
+            "Email is queued in the outbox and is only delivered by 'manage.py send_outbox'.",
+            hint="Run 'manage.py send_outbox' as a long-running worker process alongside the web processes.",
+            id='notifications.W002',
+        )]
+    return []
@@ -0,0 +1,62 @@
+from django.core.cache import cache
+from django.db.models import Count
+from .models import Notification
+
+
+def _unread_count_key(user_id):
+    return f'notifications:unread:{user_id}'
+
+
+def get_unread_count(user_id):
+    """Number of unread notifications, served from a cached counter."""
+    count = cache.get(_unread_count_key(user_id))
+    if count is None:
+        count = Notification.objects.filter(user_id=user_id, is_read=False).count()
+        cache.add(_unread_count_key(user_id), count, timeout=None)
+    return count
+
+
+def adjust_unread_count(user_id, delta):
+    # A missing counter is recounted on the next read
+    try:
+        cache.incr(_unread_count_key(user_id), delta)
+    except ValueError:
+        pass
+
+
+def reset_unread_counts(*user_ids):
+    cache.delete_many([_unread_count_key(user_id) for user_id in user_ids])
+
+
+def reconcile_unread_counts(batch_size=1000):
+    """
+    Recount every user's unread notifications and overwrite counters that drifted.
+
+    :return: Number of counters that were corrected
+    """
+    user_ids = Notification.objects.order_by().values_list('user_id', flat=True).distinct()
+    corrected = 0
+    batch = []
+    for user_id in user_ids.iterator(chunk_size=batch_size):
+        batch.append(user_id)
+        if len(batch) >= batch_size:
+            corrected += _reconcile_batch(batch)
+            batch = []
+    if batch:
+        corrected += _reconcile_batch(batch)
+    return corrected
+
+
+def _reconcile_batch(user_ids):
+    counts = dict.fromkeys(user_ids, 0)
+    counts.update(
+        Notification.objects.filter(user_id__in=user_ids, is_read=False)
+        .order_by().values('user_id').annotate(total=Count('id')).values_list('user_id', 'total')
+    )
+    cached = cache.get_many([_unread_count_key(user_id) for user_id in user_ids])
+    drifted = {
+        _unread_count_key(user_id): count for user_id, count in counts.items()
+        if cached.get(_unread_count_key(user_id), count) != count
+    }
+    cache.set_many(drifted, timeout=None)
+    return len(drifted)
@@ -0,0 +1,94 @@
+from collections import defaultdict
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils.text import Truncator
+from .mailer import send_batch
+from .models import DigestItem
+
+DIGEST_FREQUENCIES = ('hourly', 'daily')
+DIGEST_MAX_ITEMS = 50
+
+
+def queue_digest_items(items):
+    """
+    Hold ``(user_id, notification, subject)`` tuples back for the users' next digest.
+
+    Subjects longer than the column are shortened with an ellipsis; email
+    subjects have no length limit of their own.
+    """
+    max_length = DigestItem._meta.get_field('subject').max_length
+    DigestItem.objects.bulk_create(
+        [
+            DigestItem(user_id=user_id, notification=notification, subject=Truncator(subject).chars(max_length))
+            for user_id, notification, subject in items
+        ],
+        batch_size=500,
+    )
+
+
+def build_digest(user, items, frequency):
+    """
+    Coalesce a user's queued items into one email.
+
+    :return: ``(subject, body)``
+    """
+    period = 'hour' if frequency == 'hourly' else 'day'
+    subject = f"Your {frequency} summary: {len(items)} new notification{'s' if len(items) != 1 else ''}"
+    lines = [f"Dear {user.username},", "", f"Here is what happened in the last {period}:", ""]
+    for item in items[:DIGEST_MAX_ITEMS]:
+        lines.append(f"- {item.subject}: {item.notification.content}")
+    if len(items) > DIGEST_MAX_ITEMS:
+        lines.append(f"- ...and {len(items) - DIGEST_MAX_ITEMS} more in your notifications.")
+    lines += ["", "Best regards,", "Your Team"]
+    return subject, '\n'.join(lines)
+
+
+def send_digests(frequency, batch_size=200):
+    """
+    Send one coalesced email per user with queued items whose preference is
+    ``frequency``. Users who have switched back to immediate email, or whose
+    preferences were reset to the defaults, are flushed too, so nothing stays
+    queued.
+
+    Each batch of users is emailed and dequeued in one transaction; with the
+    outbox backend a failure leaves the items queued for the next run.
+
+    :return: ``(users emailed, items sent)``
+    """
+    user_ids = list(
+        DigestItem.objects
+        .filter(
+            Q(user__notificationpreference__email_frequency__in=[frequency, 'immediate'])
+            | Q(user__notificationpreference__isnull=True)
+        )
+        .order_by().values_list('user_id', flat=True).distinct()
+    )
+    user_count = item_count = 0
+    for start in range(0, len(user_ids), batch_size):
+        users, items = _send_digest_batch(user_ids[start:start + batch_size], frequency)
+        user_count += users
+        item_count += items
+    return user_count, item_count
+
+
+def _send_digest_batch(user_ids, frequency):
+    with transaction.atomic():
+        items = list(
+            DigestItem.objects.select_for_update(skip_locked=True, of=('self',))
+            .filter(user_id__in=user_ids)
+            .select_related('user', 'notification')
+            .order_by('user_id', 'created_at', 'id')
+        )
+        by_user = defaultdict(list)
+        for item in items:
+            by_user[item.user_id].append(item)
+
+        emails = []
+        for user_items in by_user.values():
+            user = user_items[0].user
+            subject, body = build_digest(user, user_items, frequency)
+            emails.append((subject, body, user.email))
+        send_batch(emails, from_email=settings.DEFAULT_FROM_EMAIL)
+        DigestItem.objects.filter(id__in=[item.id for item in items]).delete()
+    return len(by_user), len(items)
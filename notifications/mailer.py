@@ -0,0 +1,18 @@
+from elearning.email_backend import get_email_connection, send_email
+
+
+def send_batch(emails, from_email=None, use_accounts_backend=False, use_styling=True):
+    """
+    Send ``(subject, body, recipient)`` tuples through a single backend connection.
+
+    With the outbox backend this is one bulk insert in the caller's transaction.
+
+    :return: Number of messages the backend accepted
+    """
+    connection = get_email_connection()
+    messages = [
+        send_email(subject, body, recipient_list=[recipient], from_email=from_email,
+                   use_accounts_backend=use_accounts_backend, use_styling=use_styling, connection=connection)
+        for subject, body, recipient in emails
+    ]
+    return connection.send_messages(messages) or 0
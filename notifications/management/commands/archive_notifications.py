@@ -0,0 +1,46 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Min
+from notifications.retention import RETENTION_DAYS, RETENTION_MODE, RetentionJob
+
+
+class Command(BaseCommand):
+    help = "Archive or delete read notifications older than the retention period in small, rate-limited chunks."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=RETENTION_DAYS, help="Keep read notifications newer than this.")
+        parser.add_argument('--mode', choices=('archive', 'delete'), default=RETENTION_MODE,
+                            help="Move rows to the archive table or delete them outright.")
+        parser.add_argument('--chunk-size', type=int, default=1000, help="Rows per transaction.")
+        parser.add_argument('--sleep', type=float, default=0.1, help="Seconds to pause between chunks.")
+        parser.add_argument('--max-rows', type=int, help="Stop after this many rows.")
+        parser.add_argument('--dry-run', action='store_true', help="Report what would be processed and exit.")
+
+    def handle(self, *args, **options):
+        job = RetentionJob(
+            days=options['days'], mode=options['mode'], chunk_size=options['chunk_size'],
+            pause=options['sleep'], max_rows=options['max_rows'],
+        )
+        if options['dry_run']:
+            eligible = job.eligible()
+            count = eligible.count()
+            oldest = eligible.aggregate(oldest=Min('created_at'))['oldest']
+            self.stdout.write(self.style.SUCCESS(
+                f"Dry run: would {options['mode']} {count} read notification(s) created before "
+                f"{job.cutoff:%Y-%m-%d %H:%M}" + (f", oldest from {oldest:%Y-%m-%d}." if oldest else ".")
+            ))
+            return
+
+        try:
+            job.run(progress=self.report)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.report(job, final=True)
+
+    def report(self, job, final=False):
+        metrics = job.metrics()
+        message = (
+            f"{'Done' if final else 'Progress'}: {metrics['moved']} row(s) {job.mode}d in {metrics['chunks']} chunk(s), "
+            f"{metrics['elapsed_seconds']}s ({metrics['per_second']} rows/s)"
+        )
+        self.stdout.write(self.style.SUCCESS(message) if final else message)
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+from notifications.outbox import OUTBOX_DEAD_RETENTION_DAYS, OUTBOX_SENT_RETENTION_DAYS, purge_outbox
+
+
+class Command(BaseCommand):
+    help = "Delete delivered and dead-lettered outbox emails past their retention period. Run daily."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sent-days', type=int, default=OUTBOX_SENT_RETENTION_DAYS, help="Keep sent rows this long.")
+        parser.add_argument('--dead-days', type=int, default=OUTBOX_DEAD_RETENTION_DAYS, help="Keep dead rows this long.")
+
+    def handle(self, *args, **options):
+        count = purge_outbox(sent_days=options['sent_days'], dead_days=options['dead_days'])
+        self.stdout.write(self.style.SUCCESS(f"Deleted {count} outbox email(s)."))
@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from notifications.counters import reconcile_unread_counts
+
+
+class Command(BaseCommand):
+    help = "Recount unread notifications and correct cached badge counters that drifted. Run periodically."
+
+    def handle(self, *args, **options):
+        count = reconcile_unread_counts()
+        self.stdout.write(self.style.SUCCESS(f"Corrected {count} unread counter(s)."))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+from notifications.digest import DIGEST_FREQUENCIES, send_digests
+
+
+class Command(BaseCommand):
+    help = "Send one coalesced email per user for queued digest notifications. Schedule hourly and daily."
+
+    def add_arguments(self, parser):
+        parser.add_argument('frequency', choices=DIGEST_FREQUENCIES, help="Which digest window to send.")
+        parser.add_argument('--batch-size', type=int, default=200, help="Users emailed per transaction.")
+
+    def handle(self, *args, **options):
+        users, items = send_digests(options['frequency'], batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Sent {options['frequency']} digests to {users} user(s) covering {items} notification(s)."))
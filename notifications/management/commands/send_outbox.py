@@ -0,0 +1,39 @@
+import time
+from django.core.management.base import BaseCommand
+from notifications.outbox import OutboxWorker
+
+
+class Command(BaseCommand):
+    help = "Deliver queued outbox emails, retrying failures with backoff. Runs until stopped unless --once is given."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help="Exit once nothing is due instead of polling.")
+        parser.add_argument('--batch-size', type=int, default=100, help="Emails claimed per batch.")
+        parser.add_argument('--sleep', type=float, default=2.0, help="Seconds to wait when the outbox is empty.")
+
+    def handle(self, *args, **options):
+        worker = OutboxWorker(batch_size=options['batch_size'])
+        try:
+            while True:
+                claimed = worker.run_batch()
+                if claimed:
+                    self.report(worker)
+                    continue
+                if options['once']:
+                    break
+                # Release the SMTP connection while idle
+                worker.close()
+                time.sleep(options['sleep'])
+        except KeyboardInterrupt:
+            pass
+        finally:
+            worker.close()
+            self.report(worker, final=True)
+
+    def report(self, worker, final=False):
+        metrics = worker.metrics()
+        message = (
+            f"{'Done' if final else 'Progress'}: {metrics['sent']} sent, {metrics['failed']} to retry, "
+            f"{metrics['dead']} dead in {metrics['elapsed_seconds']}s ({metrics['per_second']}/s)"
+        )
+        self.stdout.write(self.style.SUCCESS(message) if final else message)
@@ -0,0 +1,40 @@
+# Generated by Django 5.0.7 on 2026-10-18 09:58
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0005_notification_digests'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedNotification',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('notification_type', models.CharField(choices=[('chat', 'Chat'), ('live_class', 'Live Class'), ('assignment', 'Assignment'), ('submission', 'Submission'), ('transaction', 'Transaction')], max_length=20)),
+                ('content', models.TextField()),
+                ('created_at', models.DateTimeField()),
+                ('is_read', models.BooleanField(default=True)),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['is_read', 'created_at'], name='notificatio_is_read_3a06ff_idx'),
+        ),
+        migrations.AddField(
+            model_name='archivednotification',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='archivednotification',
+            index=models.Index(fields=['user', 'created_at'], name='notificatio_user_id_9bd585_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+from django.db import migrations
+
+
+def clear_sent_bodies(apps, schema_editor):
+    OutboxEmail = apps.get_model('notifications', 'OutboxEmail')
+    OutboxEmail.objects.filter(status='sent').update(body='', alternatives=[], attachments=[])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0007_announcements'),
+    ]
+
+    operations = [
+        migrations.RunPython(clear_sent_bodies, migrations.RunPython.noop),
+    ]
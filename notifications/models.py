@@ -1,5 +1,6 @@
 from django.db import models
 from django.contrib.auth import get_user_model
+from django.utils import timezone
 
 User = get_user_model()
 
@@ -18,11 +19,76 @@ class Notification(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     is_read = models.BooleanField(default=False)
 
+    # Feed item kind; see notifications.pagination
+    kind = 'notification'
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'is_read', 'created_at']),
+            models.Index(fields=['user', 'created_at']),
+            models.Index(fields=['is_read', 'created_at']),
+        ]
+
     def __str__(self):
         return f"{self.notification_type} for {self.user.username}"
 
+class ArchivedNotification(models.Model):
+    """A read notification moved out of the live table by the retention job; keeps the original id."""
+    id = models.BigIntegerField(primary_key=True)
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    notification_type = models.CharField(max_length=20, choices=Notification.NOTIFICATION_TYPES)
+    content = models.TextField()
+    created_at = models.DateTimeField()
+    is_read = models.BooleanField(default=True)
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'created_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.notification_type} for {self.user.username} (archived)"
+
+class Announcement(models.Model):
+    """A message to everyone enrolled in a course, stored once and merged into each student's feed on read."""
+    course = models.ForeignKey('elearning.Course', on_delete=models.CASCADE, related_name='announcements')
+    author = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, related_name='announcements')
+    title = models.CharField(max_length=255)
+    content = models.TextField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    kind = 'announcement'
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['course', 'created_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.title} ({self.course_id})"
+
+class AnnouncementRead(models.Model):
+    """Marks an announcement as read by one user; its absence means unread."""
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    announcement = models.ForeignKey(Announcement, on_delete=models.CASCADE, related_name='reads')
+    read_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = ('user', 'announcement')
+
+    def __str__(self):
+        return f"{self.announcement_id} read by {self.user_id}"
+
 class NotificationPreference(models.Model):
+    EMAIL_FREQUENCY_CHOICES = (
+        ('immediate', 'Immediate'),
+        ('hourly', 'Hourly digest'),
+        ('daily', 'Daily digest'),
+    )
+
     user = models.OneToOneField(User, on_delete=models.CASCADE)
+    email_frequency = models.CharField(max_length=10, choices=EMAIL_FREQUENCY_CHOICES, default='immediate')
     chat = models.BooleanField(default=True)
     live_class = models.BooleanField(default=True)
     assignment = models.BooleanField(default=True)
@@ -30,4 +96,52 @@ class NotificationPreference(models.Model):
     transaction = models.BooleanField(default=True)
 
     def __str__(self):
-        return f"Preferences for {self.user.username}"
\ No newline at end of file
+        return f"Preferences for {self.user.username}"
+
+class DigestItem(models.Model):
+    """An email-worthy notification held back for the user's next digest."""
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    notification = models.ForeignKey(Notification, on_delete=models.CASCADE)
+    subject = models.CharField(max_length=255)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'created_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.subject} for {self.user.username}"
+
+class OutboxEmail(models.Model):
+    """An email queued by the outbox backend, written in the same transaction as the change that caused it."""
+    STATUS_CHOICES = (
+        ('pending', 'Pending'),
+        ('sent', 'Sent'),
+        ('dead', 'Dead'),
+    )
+
+    subject = models.TextField()
+    body = models.TextField()
+    from_email = models.CharField(max_length=254)
+    to = models.JSONField(default=list)
+    cc = models.JSONField(default=list)
+    bcc = models.JSONField(default=list)
+    reply_to = models.JSONField(default=list)
+    headers = models.JSONField(default=dict)
+    alternatives = models.JSONField(default=list)
+    attachments = models.JSONField(default=list)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.subject} to {', '.join(self.to)} ({self.status})"
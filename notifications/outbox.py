@@ -0,0 +1,208 @@
+import base64
+import logging
+import random
+import smtplib
+import time
+from datetime import timedelta
+from email.mime.base import MIMEBase
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.core.mail.backends.base import BaseEmailBackend
+from django.db import transaction
+from django.utils import timezone
+from .models import OutboxEmail
+
+logger = logging.getLogger(__name__)
+
+OUTBOX_DELIVERY_BACKEND = getattr(settings, 'EMAIL_OUTBOX_DELIVERY_BACKEND', 'django.core.mail.backends.smtp.EmailBackend')
+OUTBOX_MAX_ATTEMPTS = getattr(settings, 'EMAIL_OUTBOX_MAX_ATTEMPTS', 6)
+OUTBOX_BACKOFF_SECONDS = getattr(settings, 'EMAIL_OUTBOX_BACKOFF_SECONDS', 30)
+OUTBOX_LEASE_SECONDS = getattr(settings, 'EMAIL_OUTBOX_LEASE_SECONDS', 300)
+OUTBOX_SENT_RETENTION_DAYS = getattr(settings, 'EMAIL_OUTBOX_SENT_RETENTION_DAYS', 7)
+OUTBOX_DEAD_RETENTION_DAYS = getattr(settings, 'EMAIL_OUTBOX_DEAD_RETENTION_DAYS', 30)
+
+# Message content is only kept until delivery: bodies can carry passwords, OTPs and reset links
+CLEARED_PAYLOAD = {'body': '', 'alternatives': [], 'attachments': []}
+
+
+def _attachment_to_json(attachment):
+    if isinstance(attachment, MIMEBase):
+        attachment = (attachment.get_filename(), attachment.get_payload(decode=True), attachment.get_content_type())
+    name, content, mimetype = attachment
+    if isinstance(content, str):
+        content = content.encode()
+    return {'name': name, 'content': base64.b64encode(content).decode(), 'mimetype': mimetype}
+
+
+def to_outbox_email(message):
+    """Serialise an EmailMessage into an unsaved OutboxEmail."""
+    return OutboxEmail(
+        subject=message.subject,
+        body=message.body,
+        from_email=message.from_email or settings.DEFAULT_FROM_EMAIL or '',
+        to=list(message.to),
+        cc=list(message.cc),
+        bcc=list(message.bcc),
+        reply_to=list(message.reply_to),
+        headers=dict(message.extra_headers),
+        alternatives=[list(alternative) for alternative in getattr(message, 'alternatives', [])],
+        attachments=[_attachment_to_json(attachment) for attachment in message.attachments],
+    )
+
+
+def to_email_message(email, connection=None):
+    """Rebuild the EmailMessage an OutboxEmail was queued from."""
+    message = EmailMultiAlternatives(
+        email.subject, email.body, email.from_email,
+        to=email.to, cc=email.cc, bcc=email.bcc, reply_to=email.reply_to,
+        headers=email.headers, alternatives=[tuple(alternative) for alternative in email.alternatives],
+        connection=connection,
+    )
+    for attachment in email.attachments:
+        message.attach(attachment['name'], base64.b64decode(attachment['content']), attachment['mimetype'])
+    return message
+
+
+class OutboxEmailBackend(BaseEmailBackend):
+    """
+    Email backend that queues messages in the outbox instead of sending them.
+
+    Rows are written on the caller's database connection, so email sent inside
+    a transaction is only delivered if that transaction commits. The
+    ``send_outbox`` command delivers them with EMAIL_OUTBOX_DELIVERY_BACKEND.
+    """
+
+    def __init__(self, fail_silently=False, **kwargs):
+        # SMTP options passed by callers are meant for the delivery backend
+        super().__init__(fail_silently=fail_silently)
+
+    def send_messages(self, email_messages):
+        emails = [to_outbox_email(message) for message in email_messages if message.recipients()]
+        OutboxEmail.objects.bulk_create(emails, batch_size=500)
+        return len(emails)
+
+
+def backoff_delay(attempts):
+    """Exponential backoff with jitter: base * 2^(attempts-1), capped at a day."""
+    delay = min(OUTBOX_BACKOFF_SECONDS * 2 ** max(attempts - 1, 0), 86400)
+    return timedelta(seconds=delay * random.uniform(0.8, 1.2))
+
+
+class OutboxWorker:
+    """
+    Drain the outbox over one reusable connection of the delivery backend.
+
+    Each batch is claimed by pushing ``next_attempt_at`` past a lease, so
+    parallel workers skip it and a crashed worker's batch is retried once the
+    lease runs out.
+    """
+
+    def __init__(self, batch_size=100, backend=None):
+        self.batch_size = batch_size
+        self.backend = backend or OUTBOX_DELIVERY_BACKEND
+        self.connection = None
+        self.sent = 0
+        self.failed = 0
+        self.dead = 0
+        self.started = time.monotonic()
+
+    def claim_batch(self):
+        now = timezone.now()
+        with transaction.atomic():
+            emails = list(
+                OutboxEmail.objects.select_for_update(skip_locked=True)
+                .filter(status='pending', next_attempt_at__lte=now)
+                .order_by('next_attempt_at', 'id')[:self.batch_size]
+            )
+            OutboxEmail.objects.filter(id__in=[email.id for email in emails]).update(
+                next_attempt_at=now + timedelta(seconds=OUTBOX_LEASE_SECONDS)
+            )
+        return emails
+
+    def get_connection(self):
+        if self.connection is None:
+            self.connection = get_connection(backend=self.backend, fail_silently=False)
+            self.connection.open()
+        return self.connection
+
+    def close(self):
+        if self.connection is not None:
+            try:
+                self.connection.close()
+            finally:
+                self.connection = None
+
+    def deliver(self, email):
+        try:
+            self.get_connection().send_messages([to_email_message(email)])
+        except smtplib.SMTPServerDisconnected:
+            # The server dropped an idle connection; reconnect once before counting a failure
+            self.close()
+            self.get_connection().send_messages([to_email_message(email)])
+
+    def run_batch(self):
+        """
+        Deliver one batch.
+
+        :return: Number of emails claimed; 0 when nothing is due
+        """
+        emails = self.claim_batch()
+        sent_ids = []
+        for email in emails:
+            try:
+                self.deliver(email)
+            except Exception as error:
+                self.close()
+                self.record_failure(email, error)
+            else:
+                sent_ids.append(email.id)
+
+        if sent_ids:
+            OutboxEmail.objects.filter(id__in=sent_ids).update(
+                status='sent', sent_at=timezone.now(), last_error='', **CLEARED_PAYLOAD
+            )
+            self.sent += len(sent_ids)
+        return len(emails)
+
+    def record_failure(self, email, error):
+        attempts = email.attempts + 1
+        updates = {'attempts': attempts, 'last_error': f"{type(error).__name__}: {error}"}
+        if attempts >= OUTBOX_MAX_ATTEMPTS:
+            updates['status'] = 'dead'
+            self.dead += 1
+            logger.error("Outbox email %s dead-lettered after %d attempts: %s", email.id, attempts, error)
+        else:
+            updates['next_attempt_at'] = timezone.now() + backoff_delay(attempts)
+            self.failed += 1
+            logger.warning("Outbox email %s failed (attempt %d): %s", email.id, attempts, error)
+        OutboxEmail.objects.filter(id=email.id).update(**updates)
+
+    def metrics(self):
+        elapsed = time.monotonic() - self.started
+        return {
+            'sent': self.sent,
+            'failed': self.failed,
+            'dead': self.dead,
+            'elapsed_seconds': round(elapsed, 2),
+            'per_second': round(self.sent / elapsed, 2) if elapsed else 0.0,
+        }
+
+
+def purge_outbox(sent_days=OUTBOX_SENT_RETENTION_DAYS, dead_days=OUTBOX_DEAD_RETENTION_DAYS, chunk_size=1000):
+    """
+    Delete sent rows older than ``sent_days`` and dead-lettered rows (which
+    keep their content for inspection) older than ``dead_days``, in chunks.
+
+    :return: Number of rows deleted
+    """
+    now = timezone.now()
+    expired = (
+        OutboxEmail.objects.filter(status='sent', sent_at__lt=now - timedelta(days=sent_days))
+        | OutboxEmail.objects.filter(status='dead', created_at__lt=now - timedelta(days=dead_days))
+    )
+    deleted = 0
+    while True:
+        ids = list(expired.order_by('id').values_list('id', flat=True)[:chunk_size])
+        if not ids:
+            return deleted
+        deleted += OutboxEmail.objects.filter(id__in=ids).delete()[0]
@@ -0,0 +1,128 @@
+import base64
+import heapq
+from collections import OrderedDict
+from datetime import datetime
+from django.db.models import Q
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+# Feed items are ordered by (created_at, kind, id); notifications sort before
+# announcements created in the same instant
+KIND_RANKS = {'notification': 0, 'announcement': 1}
+
+
+def feed_key(item):
+    return item.created_at, KIND_RANKS[item.kind], item.id
+
+
+def make_since_token(item):
+    """Opaque cursor pointing at a feed item in (created_at, kind, id) order."""
+    raw = f'{item.created_at.isoformat()}|{item.id}'
+    if item.kind == 'announcement':
+        raw += '|a'
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def read_cursor(token, field='since'):
+    """
+    :return: ``(created_at, kind rank, id)``; tokens without a kind point at a notification
+    """
+    try:
+        created_at, item_id, *kind = base64.urlsafe_b64decode(token.encode()).decode().split('|')
+        return datetime.fromisoformat(created_at), KIND_RANKS['announcement' if kind == ['a'] else 'notification'], int(item_id)
+    except ValueError:
+        raise ValidationError({field: "Invalid cursor."})
+
+
+def position_q(kind, cursor, after, inclusive=False):
+    """Condition selecting the items of one kind after (or before) a cursor position."""
+    created_at, rank, item_id = cursor
+    lookup = 'gt' if after else 'lt'
+    condition = Q(**{f'created_at__{lookup}': created_at})
+    if KIND_RANKS[kind] == rank:
+        condition |= Q(created_at=created_at, **{f'id__{lookup}{"e" if inclusive else ""}': item_id})
+    elif (KIND_RANKS[kind] > rank) == after:
+        condition |= Q(created_at=created_at)
+    return condition
+
+
+def filter_since(queryset, token):
+    """Items strictly after the ``since`` cursor, oldest first."""
+    return queryset.filter(position_q(queryset.model.kind, read_cursor(token), after=True)).order_by('created_at', 'id')
+
+
+def filter_until(queryset, token, field='before'):
+    """Items up to and including the one a cursor points at."""
+    return queryset.filter(position_q(queryset.model.kind, read_cursor(token, field), after=False, inclusive=True))
+
+
+def merge_sources(querysets, cursor=None, limit=20, after=False):
+    """
+    The ``limit`` items nearest to ``cursor`` across several querysets, merged
+    in feed order: newest first, or oldest first when reading ``after`` it.
+
+    Costs one indexed query per queryset however deep the cursor is.
+    """
+    ordering = ('created_at', 'id') if after else ('-created_at', '-id')
+    streams = []
+    for queryset in querysets:
+        if cursor is not None:
+            queryset = queryset.filter(position_q(queryset.model.kind, cursor, after))
+        streams.append(list(queryset.order_by(*ordering)[:limit]))
+    return list(heapq.merge(*streams, key=feed_key, reverse=not after))[:limit]
+
+
+class FeedPagination(BasePagination):
+    """
+    Keyset pagination over the merged notification and announcement feed,
+    newest first; follow ``next`` (``?before=``) and ``previous`` (``?after=``).
+
+    The first page also carries a ``since`` cursor for its newest item; pass
+    it back as ``?since=`` to poll for only what arrived afterwards.
+    """
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params.get(self.page_size_query_param, self.page_size))
+        except ValueError:
+            page_size = self.page_size
+        return max(1, min(page_size, self.max_page_size))
+
+    def paginate_querysets(self, querysets, request):
+        self.request = request
+        page_size = self.get_page_size(request)
+        before = request.query_params.get('before')
+        after = request.query_params.get('after')
+        self.is_first_page = not (before or after)
+
+        if after:
+            items = merge_sources(querysets, read_cursor(after, 'after'), page_size + 1, after=True)
+            self.has_newer = len(items) > page_size
+            self.has_older = True
+            self.page = items[:page_size][::-1]
+        else:
+            cursor = read_cursor(before, 'before') if before else None
+            items = merge_sources(querysets, cursor, page_size + 1)
+            self.has_newer = bool(before)
+            self.has_older = len(items) > page_size
+            self.page = items[:page_size]
+        return self.page
+
+    def get_link(self, param, item):
+        url = remove_query_param(self.request.build_absolute_uri(), 'after' if param == 'before' else 'before')
+        return replace_query_param(url, param, make_since_token(item))
+
+    def get_paginated_response(self, data):
+        newest = self.page[0] if self.page else None
+        oldest = self.page[-1] if self.page else None
+        return Response(OrderedDict([
+            ('next', self.get_link('before', oldest) if self.has_older and oldest else None),
+            ('previous', self.get_link('after', newest) if self.has_newer and newest else None),
+            ('since', make_since_token(newest) if newest and self.is_first_page else None),
+            ('results', data),
+        ]))
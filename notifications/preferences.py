@@ -0,0 +1,77 @@
+import time
+from collections import OrderedDict
+from threading import Lock
+from django.conf import settings
+from .models import NotificationPreference
+
+PREFERENCE_CACHE_SIZE = getattr(settings, 'NOTIFICATION_PREFERENCE_CACHE_SIZE', 10000)
+PREFERENCE_CACHE_TTL = getattr(settings, 'NOTIFICATION_PREFERENCE_CACHE_TTL', 60)
+
+
+class PreferenceResolver:
+    """
+    Resolve users' notification preferences through a bounded in-process LRU
+    cache whose entries expire after ``ttl`` seconds.
+
+    Users without a row get an unsaved NotificationPreference with the model
+    defaults; nothing is inserted on read. Saves and deletes in this process
+    invalidate their entry through signals, and the TTL bounds how long other
+    processes can serve a stale one.
+    """
+
+    def __init__(self, maxsize=PREFERENCE_CACHE_SIZE, ttl=PREFERENCE_CACHE_TTL):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, user_id):
+        return self.get_many([user_id])[user_id]
+
+    def get_many(self, user_ids):
+        """
+        Preferences for several users, loading every uncached one in a single query.
+
+        :return: Dict of user id to NotificationPreference
+        """
+        now = time.monotonic()
+        found = {}
+        with self._lock:
+            for user_id in user_ids:
+                entry = self._entries.get(user_id)
+                if entry is not None and entry[0] > now:
+                    self._entries.move_to_end(user_id)
+                    found[user_id] = entry[1]
+            self.hits += len(found)
+
+        missing = {user_id for user_id in user_ids if user_id not in found}
+        if missing:
+            loaded = {preference.user_id: preference for preference in NotificationPreference.objects.filter(user_id__in=missing)}
+            for user_id in missing:
+                loaded.setdefault(user_id, NotificationPreference(user_id=user_id))
+            self._store(loaded, now + self.ttl)
+            found.update(loaded)
+        return found
+
+    def _store(self, preferences, expires_at):
+        with self._lock:
+            self.misses += len(preferences)
+            for user_id, preference in preferences.items():
+                self._entries[user_id] = (expires_at, preference)
+                self._entries.move_to_end(user_id)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, *user_ids):
+        with self._lock:
+            for user_id in user_ids:
+                self._entries.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+preference_resolver = PreferenceResolver()
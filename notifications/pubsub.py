@@ -0,0 +1,64 @@
+import asyncio
+import logging
+from collections import defaultdict
+from contextlib import contextmanager
+from threading import Lock
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+
+class InProcessBroker:
+    """
+    Per-user pub/sub between request threads and SSE connections in one process.
+
+    Publishing is thread-safe and never blocks: events are handed to each
+    subscriber's event loop. Deployments with several worker processes need a
+    shared broker with the same ``publish``/``subscribe`` interface, set via
+    NOTIFICATION_BROKER.
+    """
+
+    def __init__(self):
+        self._subscribers = defaultdict(set)
+        self._lock = Lock()
+
+    @contextmanager
+    def subscribe(self, user_id):
+        """Yield an asyncio.Queue receiving the user's events; call from the consuming event loop."""
+        subscriber = (asyncio.get_running_loop(), asyncio.Queue())
+        with self._lock:
+            self._subscribers[user_id].add(subscriber)
+        try:
+            yield subscriber[1]
+        finally:
+            with self._lock:
+                self._subscribers[user_id].discard(subscriber)
+                if not self._subscribers[user_id]:
+                    del self._subscribers[user_id]
+
+    def publish(self, user_id, event):
+        with self._lock:
+            subscribers = list(self._subscribers.get(user_id, ()))
+        for loop, queue in subscribers:
+            try:
+                loop.call_soon_threadsafe(queue.put_nowait, event)
+            except RuntimeError:
+                # The subscriber's loop has closed; it unsubscribes on its way out
+                logger.debug("Dropped notification event for closed subscriber of user %s", user_id)
+
+    def subscriber_count(self):
+        with self._lock:
+            return sum(len(subscribers) for subscribers in self._subscribers.values())
+
+
+_broker = None
+_broker_lock = Lock()
+
+
+def get_broker():
+    global _broker
+    with _broker_lock:
+        if _broker is None:
+            _broker = import_string(getattr(settings, 'NOTIFICATION_BROKER', 'notifications.pubsub.InProcessBroker'))()
+    return _broker
@@ -1,15 +1,33 @@
 from rest_framework import serializers
-from .models import Notification, NotificationPreference
+from .models import Announcement, Notification, NotificationPreference
 
 class NotificationSerializer(serializers.ModelSerializer):
     notification_type_display = serializers.CharField(source='get_notification_type_display', read_only=True)
+    kind = serializers.ReadOnlyField()
 
     class Meta:
         model = Notification
-        fields = ['id', 'notification_type', 'notification_type_display', 'content', 'created_at', 'is_read']
+        fields = ['id', 'kind', 'notification_type', 'notification_type_display', 'content', 'created_at', 'is_read']
         read_only_fields = ['created_at', 'notification_type_display']
 
 class UserPreferenceSerializer(serializers.ModelSerializer):
     class Meta:
         model = NotificationPreference
-        fields = ['chat', 'live_class', 'assignment', 'submission', 'transaction']
+        fields = ['chat', 'live_class', 'assignment', 'submission', 'transaction', 'email_frequency']
+
+class AnnouncementSerializer(serializers.ModelSerializer):
+    kind = serializers.ReadOnlyField()
+    course_name = serializers.CharField(source='course.name', read_only=True)
+    is_read = serializers.BooleanField(read_only=True, default=False)
+
+    class Meta:
+        model = Announcement
+        fields = ['id', 'kind', 'course', 'course_name', 'title', 'content', 'author', 'created_at', 'is_read']
+        read_only_fields = ['author', 'created_at']
+
+class FeedItemSerializer(serializers.BaseSerializer):
+    """Serialises a merged feed item, notification or announcement, with the serializer of its kind."""
+
+    def to_representation(self, instance):
+        serializer_class = AnnouncementSerializer if instance.kind == 'announcement' else NotificationSerializer
+        return serializer_class(instance, context=self.context).data
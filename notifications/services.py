@@ -1,6 +1,13 @@
-from .models import Notification, NotificationPreference
+from .models import AnnouncementRead, Notification
 from django.conf import settings
+from django.db import transaction
 from elearning.email_backend import send_email
+from .announcements import reset_unread_announcement_count, unread_announcements
+from .counters import adjust_unread_count, reset_unread_counts
+from .digest import queue_digest_items
+from .mailer import send_batch
+from .preferences import preference_resolver
+from .stream import publish_notifications
 
 class NotificationService:
     @staticmethod
@@ -15,14 +22,14 @@ class NotificationService:
         )
 
         # Check user preferences
-        try:
-            preferences = NotificationPreference.objects.get(user=user)
-        except NotificationPreference.DoesNotExist:
-            preferences = NotificationPreference.objects.create(user=user)
+        preferences = preference_resolver.get(user.id)
 
         # Check if the user has turned off this notification type
         if getattr(preferences, notification_type, True):
-            if email_subject and email_body:
+            if email_subject and email_body and preferences.email_frequency != 'immediate' and not attachments:
+                # Held back for the user's hourly or daily digest
+                queue_digest_items([(user.id, notification, email_subject)])
+            elif email_subject and email_body:
                 recipient_email = recipient_email or user.email
                 sender_email = sender_email or settings.DEFAULT_FROM_EMAIL
 
@@ -46,12 +53,100 @@ class NotificationService:
 
         return notification
 
+    @staticmethod
+    def send_bulk(users, notification_type, content, email_subject=None, email_body=None,
+                  sender_email=None, use_accounts_backend=False, use_styling=True):
+        """
+        Notify many users at once.
+
+        Preferences are resolved in at most one query, notifications are inserted with
+        bulk_create, and emails are sent as one batch over a single connection.
+        Users on an hourly or daily digest get a digest item instead of an email.
+        Notifications, digest items and (with the outbox backend) queued emails
+        are written in one transaction; counters and live streams are updated
+        once it commits.
+
+        ``content`` and ``email_body`` may be strings or callables taking the
+        user, for per-recipient text.
+
+        :return: The created notifications
+        """
+        users = list(users)
+        user_ids = [user.id for user in users]
+        preferences = preference_resolver.get_many(user_ids)
+
+        with transaction.atomic():
+            notifications = Notification.objects.bulk_create([
+                Notification(
+                    user_id=user.id,
+                    notification_type=notification_type,
+                    content=content(user) if callable(content) else content,
+                )
+                for user in users
+            ], batch_size=500)
+            # bulk_create skips post_save; one delete_many drops the counters, recounted on next read
+            transaction.on_commit(lambda: reset_unread_counts(*user_ids))
+            publish_notifications(notifications)
+
+            if email_subject and email_body:
+                emails = []
+                digest_items = []
+                for user, notification in zip(users, notifications):
+                    preference = preferences[user.id]
+                    if not getattr(preference, notification_type, True):
+                        continue
+                    if preference.email_frequency == 'immediate':
+                        emails.append((email_subject, email_body(user) if callable(email_body) else email_body, user.email))
+                    else:
+                        digest_items.append((user.id, notification, email_subject))
+                queue_digest_items(digest_items)
+                send_batch(
+                    emails,
+                    from_email=sender_email or settings.DEFAULT_FROM_EMAIL,
+                    use_accounts_backend=use_accounts_backend,
+                    use_styling=use_styling,
+                )
+
+        return notifications
+
     @staticmethod
     def get_unread_notifications(user):
         return Notification.objects.filter(user=user, is_read=False)
 
     @staticmethod
-    def mark_as_read(notification_id):
-        notification = Notification.objects.get(id=notification_id)
-        notification.is_read = True
-        notification.save()
\ No newline at end of file
+    def mark_as_read(user, notification_id):
+        return NotificationService.mark_many_as_read(user, Notification.objects.filter(id=notification_id))
+
+    @staticmethod
+    def mark_many_as_read(user, notifications=None):
+        """
+        Mark the user's unread notifications among ``notifications`` (all of them
+        if None) as read with one UPDATE scoped to the user.
+
+        :return: Number of notifications that were unread
+        """
+        queryset = Notification.objects.all() if notifications is None else notifications
+        updated = queryset.filter(user=user, is_read=False).update(is_read=True)
+        if updated:
+            adjust_unread_count(user.id, -updated)
+        return updated
+
+    @staticmethod
+    def mark_announcements_read(user, announcements=None):
+        """
+        Record read markers for the user's unread feed announcements among
+        ``announcements`` (all of them if None).
+
+        :return: Number of announcements that were unread
+        """
+        queryset = unread_announcements(user)
+        if announcements is not None:
+            queryset = queryset.filter(pk__in=announcements.values('pk'))
+        announcement_ids = list(queryset.values_list('id', flat=True))
+        AnnouncementRead.objects.bulk_create(
+            [AnnouncementRead(user=user, announcement_id=announcement_id) for announcement_id in announcement_ids],
+            batch_size=500, ignore_conflicts=True,
+        )
+        if announcement_ids:
+            reset_unread_announcement_count(user.id)
+        return len(announcement_ids)
@@ -0,0 +1,39 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from elearning.models import Enrollment, Student
+from .announcements import bump_announcements_version, reset_unread_announcement_count
+from .counters import adjust_unread_count
+from .models import Announcement, Notification, NotificationPreference
+from .preferences import preference_resolver
+from .stream import publish_notifications
+
+
+@receiver(post_save, sender=Notification)
+def notification_saved(sender, instance, created, **kwargs):
+    if created and not instance.is_read:
+        adjust_unread_count(instance.user_id, 1)
+    if created:
+        publish_notifications([instance])
+
+
+@receiver(post_delete, sender=Notification)
+def notification_deleted(sender, instance, **kwargs):
+    if not instance.is_read:
+        adjust_unread_count(instance.user_id, -1)
+
+
+@receiver([post_save, post_delete], sender=Announcement)
+def announcement_changed(sender, instance, **kwargs):
+    if kwargs.get('created', True):
+        bump_announcements_version()
+
+
+@receiver([post_save, post_delete], sender=Enrollment)
+def announcement_enrollment_changed(sender, instance, **kwargs):
+    user_id = Student.objects.filter(pk=instance.student_id).values_list('user_id', flat=True).first()
+    reset_unread_announcement_count(user_id)
+
+
+@receiver([post_save, post_delete], sender=NotificationPreference)
+def preference_changed(sender, instance, **kwargs):
+    preference_resolver.invalidate(instance.user_id)
@@ -0,0 +1,113 @@
+import asyncio
+import json
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.handlers.asgi import ASGIRequest
+from django.db import close_old_connections, transaction
+from django.http import HttpResponse, StreamingHttpResponse
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.tokens import AccessToken
+from .models import Notification
+from .pubsub import get_broker
+from .serializers import NotificationSerializer
+
+HEARTBEAT_SECONDS = getattr(settings, 'NOTIFICATION_STREAM_HEARTBEAT', 20)
+BACKLOG_LIMIT = 100
+
+
+def publish_notifications(notifications):
+    """Push new notifications to their users' open streams once the transaction commits."""
+    events = [
+        (notification.user_id, notification.id, NotificationSerializer(notification).data)
+        for notification in notifications if notification.id is not None
+    ]
+
+    def publish():
+        broker = get_broker()
+        for user_id, event_id, data in events:
+            broker.publish(user_id, (event_id, data))
+
+    transaction.on_commit(publish)
+
+
+def format_event(event_id, data):
+    return f'id: {event_id}\nevent: notification\ndata: {json.dumps(data, default=str)}\n\n'.encode()
+
+
+def authenticate(request):
+    """
+    Resolve an active user's id from an access token; EventSource cannot set
+    headers, so it comes in ``?token=``.
+    """
+    try:
+        user_id = AccessToken(request.GET.get('token', ''))[settings.SIMPLE_JWT.get('USER_ID_CLAIM', 'user_id')]
+    except (TokenError, KeyError):
+        return None
+    close_old_connections()
+    try:
+        return get_user_model().objects.filter(pk=user_id, is_active=True).values_list('pk', flat=True).first()
+    finally:
+        close_old_connections()
+
+
+def last_event_id(request):
+    value = request.headers.get('Last-Event-ID', '') or request.GET.get('last_event_id', '')
+    return int(value) if value.isdigit() else None
+
+
+def load_backlog(user_id, after_id):
+    close_old_connections()
+    try:
+        notifications = Notification.objects.filter(user_id=user_id, id__gt=after_id).order_by('id')[:BACKLOG_LIMIT]
+        return [(notification.id, NotificationSerializer(notification).data) for notification in notifications]
+    finally:
+        close_old_connections()
+
+
+async def notification_stream(request):
+    """
+    Async view streaming a user's new notifications as server-sent events.
+
+    It goes through the regular middleware stack, so host, CORS and security
+    checks apply. The stream itself holds no thread or database connection
+    while idle: it resumes from ``Last-Event-ID`` by replaying newer rows,
+    then relays live events from the broker, with a comment frame every
+    HEARTBEAT_SECONDS to keep proxies from closing it. When the client
+    disconnects Django cancels the stream, which unsubscribes it.
+
+    Only ASGI can serve it: under WSGI Django would buffer the endless stream
+    and never finish the request, so those requests get a 501.
+    """
+    if not isinstance(request, ASGIRequest):
+        return HttpResponse('The notification stream requires an ASGI server.', status=501, content_type='text/plain')
+
+    user_id = await sync_to_async(authenticate)(request)
+    if user_id is None:
+        return HttpResponse('Authentication required.', status=401, content_type='text/plain')
+
+    response = StreamingHttpResponse(_events(user_id, last_event_id(request)), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+async def _events(user_id, replayed_up_to):
+    with get_broker().subscribe(user_id) as queue:
+        # Subscribe before replaying so nothing created in between is missed
+        yield b'retry: 5000\n\n'
+        if replayed_up_to is not None:
+            for event_id, data in await sync_to_async(load_backlog)(user_id, replayed_up_to):
+                yield format_event(event_id, data)
+                replayed_up_to = event_id
+
+        while True:
+            try:
+                event_id, data = await asyncio.wait_for(queue.get(), timeout=HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                yield b': heartbeat\n\n'
+                continue
+            if replayed_up_to is not None and event_id <= replayed_up_to:
+                # Already sent while replaying the backlog
+                continue
+            yield format_event(event_id, data)
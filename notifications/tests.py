@@ -1,3 +1,595 @@
-from django.test import TestCase
+import asyncio
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+from urllib.parse import parse_qsl, urlsplit
+from django.core import mail
+from django.core.cache import cache
+from django.core.checks import run_checks
+from django.core.mail import EmailMultiAlternatives
+from django.core.mail.backends.base import BaseEmailBackend
+from django.core.management import call_command
+from django.db import connection
+from django.test import AsyncClient, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory, force_authenticate
+from rest_framework_simplejwt.tokens import AccessToken
+from elearning.models import Course, Enrollment
+from user_auth.models import CustomUser, Instructor, Student
+from .announcements import get_unread_announcement_count
+from .counters import adjust_unread_count, get_unread_count, reset_unread_counts
+from .digest import queue_digest_items, send_digests
+from .models import (
+    Announcement, ArchivedNotification, DigestItem, Notification, NotificationPreference, OutboxEmail,
+)
+from .outbox import OutboxEmailBackend, OutboxWorker, purge_outbox
+from .preferences import PreferenceResolver, preference_resolver
+from .pubsub import InProcessBroker
+from .retention import RetentionJob
+from .serializers import NotificationSerializer
+from .services import NotificationService
+from .views import NotificationViewSet
 
-# Create your tests here.
+
+def create_user(name, **fields):
+    return CustomUser.objects.create_user(email=f'{name}@example.com', username=name, password='secret', **fields)
+
+
+class UnreadCounterTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        preference_resolver.clear()
+        self.user = create_user('student')
+
+    def notify(self, count=1):
+        for _ in range(count):
+            Notification.objects.create(user=self.user, notification_type='chat', content='Hello')
+
+    def test_missing_counter_is_recounted(self):
+        self.notify(2)
+        reset_unread_counts(self.user.id)
+        with self.assertNumQueries(1):
+            self.assertEqual(get_unread_count(self.user.id), 2)
+        with self.assertNumQueries(0):
+            self.assertEqual(get_unread_count(self.user.id), 2)
+
+    def test_counter_follows_creates_reads_and_deletes(self):
+        self.assertEqual(get_unread_count(self.user.id), 0)
+        self.notify(3)
+        self.assertEqual(get_unread_count(self.user.id), 3)
+        NotificationService.mark_many_as_read(self.user, Notification.objects.filter(pk=Notification.objects.first().pk))
+        self.assertEqual(get_unread_count(self.user.id), 2)
+        Notification.objects.filter(is_read=False).first().delete()
+        self.assertEqual(get_unread_count(self.user.id), 1)
+
+    def test_reconcile_corrects_drifted_counters(self):
+        self.notify(2)
+        self.assertEqual(get_unread_count(self.user.id), 2)
+        adjust_unread_count(self.user.id, 5)
+
+        out = StringIO()
+        call_command('reconcile_unread_counts', stdout=out)
+        self.assertIn('Corrected 1 unread counter(s).', out.getvalue())
+        self.assertEqual(get_unread_count(self.user.id), 2)
+
+    def test_unread_count_endpoint_adds_announcements(self):
+        instructor = Instructor.objects.create(user=create_user('instructor', role='Instructor'))
+        course = Course.objects.create(code='C', name='Course', description='', instructor=instructor)
+        Enrollment.objects.create(student=Student.objects.create(user=self.user), course=course)
+        Announcement.objects.create(course=course, author=instructor.user, title='Welcome', content='')
+        self.notify(2)
+
+        request = APIRequestFactory().get('/api/notifications/platform/unread-count/')
+        force_authenticate(request, user=self.user)
+        response = NotificationViewSet.as_view({'get': 'unread_count'})(request)
+        self.assertEqual(response.data, {'unread_count': 3})
+
+    # A database-backed cache makes any per-recipient counter update visible as queries
+    @override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.db.DatabaseCache', 'LOCATION': 'test_cache'}})
+    def test_send_bulk_query_count_is_independent_of_recipients(self):
+        call_command('createcachetable')
+
+        def send_to(count):
+            users = [create_user(f'bulk{len(self.bulk_users) + number}') for number in range(count)]
+            self.bulk_users += users
+            with CaptureQueriesContext(connection) as queries, self.captureOnCommitCallbacks(execute=True):
+                NotificationService.send_bulk(users, 'assignment', 'New assignment', 'New assignment', 'Body')
+            return len(queries)
+
+        self.bulk_users = []
+        self.assertEqual(send_to(2), send_to(20))
+        self.assertEqual(len(mail.outbox), 22)
+        self.assertEqual(get_unread_count(self.bulk_users[-1].id), 1)
+
+    def test_deploy_check_requires_a_shared_cache(self):
+        with override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}):
+            self.assertIn('notifications.E001', [error.id for error in run_checks(include_deployment_checks=True)])
+        with override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.redis.RedisCache'}}):
+            self.assertNotIn('notifications.E001', [error.id for error in run_checks(include_deployment_checks=True)])
+
+
+class FeedPaginationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = create_user('student')
+        instructor = Instructor.objects.create(user=create_user('instructor', role='Instructor'))
+        self.course = Course.objects.create(code='C', name='Course', description='', instructor=instructor)
+        other_course = Course.objects.create(code='D', name='Other', description='', instructor=instructor)
+        Enrollment.objects.create(student=Student.objects.create(user=self.user), course=self.course)
+        self.start = timezone.now() - timedelta(hours=1)
+
+        # Oldest first; the notification and announcement at minute 1 tie, and notifications sort first
+        self.items = [
+            self.notify(0), self.notify(1), self.announce(1), self.notify(2), self.announce(3), self.notify(4),
+        ]
+        self.notify(5, user=create_user('other'))
+        self.announce(5, course=other_course)
+
+    def notify(self, minutes, user=None):
+        notification = Notification.objects.create(user=user or self.user, notification_type='chat', content='Hello')
+        Notification.objects.filter(pk=notification.pk).update(created_at=self.start + timedelta(minutes=minutes))
+        return ('notification', notification.pk)
+
+    def announce(self, minutes, course=None):
+        announcement = Announcement.objects.create(course=course or self.course, author=self.user, title='News', content='')
+        Announcement.objects.filter(pk=announcement.pk).update(created_at=self.start + timedelta(minutes=minutes))
+        return ('announcement', announcement.pk)
+
+    def get(self, link=None, **params):
+        if link:
+            params.update(parse_qsl(urlsplit(link).query))
+        request = APIRequestFactory().get('/api/notifications/platform/', params)
+        force_authenticate(request, user=self.user)
+        return NotificationViewSet.as_view({'get': 'list'})(request).data
+
+    def keys(self, data):
+        return [(item['kind'], item['id']) for item in data['results']]
+
+    def test_next_links_walk_the_merged_feed(self):
+        page = self.get(page_size=4)
+        self.assertIsNone(page['previous'])
+        self.assertIsNotNone(page['since'])
+        seen = self.keys(page)
+        while page['next']:
+            page = self.get(page['next'])
+            self.assertIsNone(page['since'])
+            seen += self.keys(page)
+        self.assertEqual(seen, self.items[::-1])
+
+    def test_previous_link_returns_the_newer_page(self):
+        first = self.get(page_size=2)
+        second = self.get(first['next'])
+        self.assertEqual(self.keys(second), self.items[3:1:-1])
+        newer = self.get(second['previous'])
+        self.assertEqual(self.keys(newer), self.keys(first))
+        self.assertIsNone(newer['previous'])
+
+    def test_since_returns_only_newer_items_oldest_first(self):
+        since = self.get()['since']
+        self.assertEqual(self.get(since=since)['results'], [])
+
+        arrived = [self.notify(10), self.announce(11)]
+        data = self.get(since=since)
+        self.assertEqual(self.keys(data), arrived)
+        self.assertEqual(self.get(since=data['since'])['results'], [])
+
+    def test_invalid_cursor_is_rejected(self):
+        request = APIRequestFactory().get('/api/notifications/platform/', {'before': 'not-a-cursor'})
+        force_authenticate(request, user=self.user)
+        response = NotificationViewSet.as_view({'get': 'list'})(request)
+        self.assertEqual(response.status_code, 400)
+
+
+class MarkAsReadTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = create_user('student')
+        self.other = create_user('other')
+        self.own = Notification.objects.create(user=self.user, notification_type='chat', content='Mine')
+        self.foreign = Notification.objects.create(user=self.other, notification_type='chat', content='Theirs')
+
+    def post(self, action, data=None, pk=None):
+        request = APIRequestFactory().post('/api/notifications/platform/', data or {}, format='json')
+        force_authenticate(request, user=self.user)
+        return NotificationViewSet.as_view({'post': action})(request, **({'pk': pk} if pk else {}))
+
+    def test_marking_another_users_notification_is_not_found(self):
+        self.assertEqual(self.post('mark_as_read', pk=self.foreign.pk).status_code, 404)
+        self.foreign.refresh_from_db()
+        self.assertFalse(self.foreign.is_read)
+        self.assertEqual(get_unread_count(self.other.id), 1)
+
+        self.assertEqual(self.post('mark_as_read', pk=self.own.pk).status_code, 200)
+        self.own.refresh_from_db()
+        self.assertTrue(self.own.is_read)
+        self.assertEqual(get_unread_count(self.user.id), 0)
+
+    def test_bulk_marking_skips_other_users_notifications(self):
+        response = self.post('mark_read', {'ids': [self.own.pk, self.foreign.pk]})
+        self.assertEqual(response.data['updated'], 1)
+        self.assertEqual(get_unread_count(self.user.id), 0)
+        self.assertFalse(Notification.objects.get(pk=self.foreign.pk).is_read)
+
+    def test_mark_all_read_only_touches_own_notifications(self):
+        self.assertEqual(self.post('mark_all_read').data['updated'], 1)
+        self.assertEqual(get_unread_count(self.other.id), 1)
+
+
+class AnnouncementCountTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = create_user('student')
+        instructor = Instructor.objects.create(user=create_user('instructor', role='Instructor'))
+        self.course = Course.objects.create(code='C', name='Course', description='', instructor=instructor)
+        self.other_course = Course.objects.create(code='D', name='Other', description='', instructor=instructor)
+        self.student = Student.objects.create(user=self.user)
+        Enrollment.objects.create(student=self.student, course=self.course)
+
+    def announce(self, course=None):
+        return Announcement.objects.create(course=course or self.course, author=self.user, title='News', content='')
+
+    def test_count_is_cached(self):
+        self.announce()
+        self.assertEqual(get_unread_announcement_count(self.user), 1)
+        with self.assertNumQueries(0):
+            self.assertEqual(get_unread_announcement_count(self.user), 1)
+
+    def test_new_and_deleted_announcements_invalidate_the_count(self):
+        self.assertEqual(get_unread_announcement_count(self.user), 0)
+        announcement = self.announce()
+        self.assertEqual(get_unread_announcement_count(self.user), 1)
+        announcement.delete()
+        self.assertEqual(get_unread_announcement_count(self.user), 0)
+
+    def test_enrollment_changes_invalidate_the_count(self):
+        self.announce(self.other_course)
+        self.assertEqual(get_unread_announcement_count(self.user), 0)
+        enrollment = Enrollment.objects.create(student=self.student, course=self.other_course)
+        self.assertEqual(get_unread_announcement_count(self.user), 1)
+        enrollment.delete()
+        self.assertEqual(get_unread_announcement_count(self.user), 0)
+
+    def test_reading_resets_only_the_readers_count(self):
+        announcement = self.announce()
+        classmate = create_user('classmate')
+        Enrollment.objects.create(student=Student.objects.create(user=classmate), course=self.course)
+        self.assertEqual((get_unread_announcement_count(self.user), get_unread_announcement_count(classmate)), (1, 1))
+
+        NotificationService.mark_announcements_read(self.user, Announcement.objects.filter(pk=announcement.pk))
+        self.assertEqual(get_unread_announcement_count(self.user), 0)
+        with self.assertNumQueries(0):
+            self.assertEqual(get_unread_announcement_count(classmate), 1)
+
+
+class SendBulkTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        preference_resolver.clear()
+        self.immediate = create_user('immediate')
+        self.hourly = create_user('hourly')
+        self.muted = create_user('muted')
+        self.default = create_user('default')
+        NotificationPreference.objects.create(user=self.immediate, email_frequency='immediate')
+        NotificationPreference.objects.create(user=self.hourly, email_frequency='hourly')
+        NotificationPreference.objects.create(user=self.muted, assignment=False)
+        self.users = [self.immediate, self.hourly, self.muted, self.default]
+
+    def send(self):
+        return NotificationService.send_bulk(
+            self.users, 'assignment', lambda user: f'Hi {user.username}', 'New assignment', lambda user: f'Dear {user.username}',
+        )
+
+    def test_preferences_are_read_in_one_query(self):
+        with self.assertNumQueries(1):
+            preferences = preference_resolver.get_many([user.id for user in self.users])
+        self.assertEqual(preferences[self.hourly.id].email_frequency, 'hourly')
+        self.assertIsNone(preferences[self.default.id].pk)
+
+    def test_routes_email_and_digest_items_by_preference(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            notifications = self.send()
+
+        self.assertEqual([notification.content for notification in notifications], [f'Hi {user.username}' for user in self.users])
+        self.assertEqual(Notification.objects.filter(notification_type='assignment').count(), 4)
+        self.assertEqual(sorted(message.to[0] for message in mail.outbox), [self.default.email, self.immediate.email])
+        self.assertEqual(mail.outbox[0].body, f'Dear {mail.outbox[0].to[0].split("@")[0]}')
+        self.assertEqual(list(DigestItem.objects.values_list('user_id', 'subject')), [(self.hourly.id, 'New assignment')])
+        self.assertEqual(get_unread_count(self.muted.id), 1)
+
+    def test_emails_go_out_over_one_connection(self):
+        connection = mock.Mock()
+        connection.send_messages.return_value = 2
+        with mock.patch('notifications.mailer.get_email_connection', return_value=connection):
+            self.send()
+        connection.send_messages.assert_called_once()
+        self.assertEqual(len(connection.send_messages.call_args.args[0]), 2)
+
+    def test_failure_rolls_back_notifications_and_counters(self):
+        self.assertEqual(get_unread_count(self.immediate.id), 0)
+        with mock.patch('notifications.services.send_batch', side_effect=RuntimeError('SMTP down')):
+            with self.assertRaises(RuntimeError), self.captureOnCommitCallbacks(execute=True) as callbacks:
+                self.send()
+        self.assertEqual(callbacks, [])
+        self.assertFalse(Notification.objects.exists())
+        self.assertFalse(DigestItem.objects.exists())
+
+
+class PreferenceResolverTests(TestCase):
+    def setUp(self):
+        preference_resolver.clear()
+        self.now = 1000.0
+        patcher = mock.patch('notifications.preferences.time.monotonic', side_effect=lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.users = [create_user(f'user{number}') for number in range(3)]
+        NotificationPreference.objects.create(user=self.users[0], email_frequency='daily')
+
+    def test_entries_expire_after_the_ttl(self):
+        resolver = PreferenceResolver(ttl=60)
+        with self.assertNumQueries(1):
+            self.assertEqual(resolver.get(self.users[0].id).email_frequency, 'daily')
+        self.now += 59
+        with self.assertNumQueries(0):
+            resolver.get(self.users[0].id)
+        self.now += 2
+        with self.assertNumQueries(1):
+            resolver.get(self.users[0].id)
+        self.assertEqual((resolver.hits, resolver.misses), (1, 2))
+
+    def test_missing_rows_resolve_to_unsaved_defaults(self):
+        preference = PreferenceResolver().get(self.users[1].id)
+        self.assertIsNone(preference.pk)
+        self.assertEqual(preference.email_frequency, NotificationPreference._meta.get_field('email_frequency').default)
+        self.assertEqual(NotificationPreference.objects.count(), 1)
+
+    def test_least_recently_used_entries_are_evicted(self):
+        resolver = PreferenceResolver(maxsize=2)
+        resolver.get_many([user.id for user in self.users[:2]])
+        resolver.get(self.users[0].id)
+        resolver.get(self.users[2].id)
+        with self.assertNumQueries(0):
+            resolver.get(self.users[0].id)
+        with self.assertNumQueries(1):
+            resolver.get(self.users[1].id)
+
+    def test_saves_and_deletes_invalidate_the_shared_resolver(self):
+        self.assertEqual(preference_resolver.get(self.users[0].id).email_frequency, 'daily')
+        preference = NotificationPreference.objects.get(user=self.users[0])
+        preference.email_frequency = 'hourly'
+        preference.save()
+        self.assertEqual(preference_resolver.get(self.users[0].id).email_frequency, 'hourly')
+        preference.delete()
+        self.assertIsNone(preference_resolver.get(self.users[0].id).pk)
+
+
+class DigestTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        preference_resolver.clear()
+        self.hourly = create_user('hourly')
+        self.daily = create_user('daily')
+        self.default = create_user('default')
+        NotificationPreference.objects.create(user=self.hourly, email_frequency='hourly')
+        NotificationPreference.objects.create(user=self.daily, email_frequency='daily')
+
+    def queue(self, user, subject='New assignment'):
+        notification = Notification.objects.create(user=user, notification_type='assignment', content='Read chapter 2')
+        queue_digest_items([(user.id, notification, subject)])
+
+    def test_long_subjects_are_truncated_to_the_column(self):
+        self.queue(self.hourly, 'x' * 300)
+        subject = DigestItem.objects.get().subject
+        self.assertEqual(len(subject), 255)
+        self.assertTrue(subject.endswith('…'))
+
+    def test_flush_sends_one_email_per_user_and_dequeues(self):
+        self.queue(self.hourly)
+        self.queue(self.hourly, 'Grade posted')
+        self.queue(self.daily)
+        self.queue(self.default)
+
+        self.assertEqual(send_digests('hourly'), (2, 3))
+        emails = {message.to[0]: message for message in mail.outbox}
+        self.assertEqual(set(emails), {self.hourly.email, self.default.email})
+        self.assertEqual(emails[self.hourly.email].subject, 'Your hourly summary: 2 new notifications')
+        self.assertIn('- New assignment: Read chapter 2\n- Grade posted: Read chapter 2', emails[self.hourly.email].body)
+        self.assertEqual(list(DigestItem.objects.values_list('user_id', flat=True)), [self.daily.id])
+
+        out = StringIO()
+        call_command('send_digests', 'daily', stdout=out)
+        self.assertIn('Sent daily digests to 1 user(s) covering 1 notification(s).', out.getvalue())
+        self.assertEqual(mail.outbox[-1].subject, 'Your daily summary: 1 new notification')
+        self.assertFalse(DigestItem.objects.exists())
+
+    def test_failed_send_keeps_items_queued(self):
+        self.queue(self.hourly)
+        with mock.patch('notifications.digest.send_batch', side_effect=ConnectionRefusedError('SMTP down')):
+            with self.assertRaises(ConnectionRefusedError):
+                send_digests('hourly')
+        self.assertEqual(DigestItem.objects.count(), 1)
+
+
+class FailingEmailBackend(BaseEmailBackend):
+    def send_messages(self, email_messages):
+        raise ConnectionRefusedError('SMTP down')
+
+
+class OutboxTests(TestCase):
+    def queue(self, count=1):
+        messages = []
+        for number in range(count):
+            message = EmailMultiAlternatives(f'Subject {number}', 'Your code is 123456', 'from@example.com', ['to@example.com'])
+            message.attach_alternative('<p>Your code is 123456</p>', 'text/html')
+            messages.append(message)
+        OutboxEmailBackend().send_messages(messages)
+        return list(OutboxEmail.objects.order_by('id'))
+
+    def test_claimed_batches_are_leased(self):
+        self.queue(3)
+        worker = OutboxWorker(batch_size=2)
+        self.assertEqual(len(worker.claim_batch()), 2)
+        self.assertEqual(len(worker.claim_batch()), 1)
+        self.assertEqual(worker.claim_batch(), [])
+        self.assertFalse(OutboxEmail.objects.filter(next_attempt_at__lte=timezone.now()).exists())
+
+    def test_sent_rows_lose_their_content(self):
+        self.queue()
+        worker = OutboxWorker(backend='django.core.mail.backends.locmem.EmailBackend')
+        self.assertEqual(worker.run_batch(), 1)
+
+        self.assertEqual(mail.outbox[0].body, 'Your code is 123456')
+        self.assertEqual(mail.outbox[0].alternatives[0][0], '<p>Your code is 123456</p>')
+        email = OutboxEmail.objects.get()
+        self.assertEqual((email.status, email.body, email.alternatives), ('sent', '', []))
+        self.assertIsNotNone(email.sent_at)
+
+    @mock.patch('notifications.outbox.OUTBOX_MAX_ATTEMPTS', 2)
+    @mock.patch('notifications.outbox.OUTBOX_BACKOFF_SECONDS', 30)
+    def test_failures_back_off_then_dead_letter(self):
+        self.queue()
+        worker = OutboxWorker(backend='notifications.tests.FailingEmailBackend')
+        before = timezone.now()
+        with self.assertLogs('notifications.outbox', 'WARNING'):
+            worker.run_batch()
+
+        email = OutboxEmail.objects.get()
+        self.assertEqual((email.status, email.attempts), ('pending', 1))
+        self.assertIn('SMTP down', email.last_error)
+        self.assertGreaterEqual(email.next_attempt_at, before + timedelta(seconds=24))
+        self.assertLessEqual(email.next_attempt_at, timezone.now() + timedelta(seconds=36))
+        self.assertEqual(worker.run_batch(), 0)
+
+        OutboxEmail.objects.update(next_attempt_at=timezone.now())
+        with self.assertLogs('notifications.outbox', 'ERROR'):
+            worker.run_batch()
+        email.refresh_from_db()
+        self.assertEqual((email.status, email.attempts), ('dead', 2))
+        self.assertEqual(email.body, 'Your code is 123456')
+        self.assertEqual(worker.metrics()['dead'], 1)
+
+    def test_purge_removes_only_expired_rows(self):
+        sent, dead, pending, recent = self.queue(4)
+        old = timezone.now() - timedelta(days=60)
+        OutboxEmail.objects.filter(pk=sent.pk).update(status='sent', sent_at=old)
+        OutboxEmail.objects.filter(pk=dead.pk).update(status='dead')
+        OutboxEmail.objects.filter(pk__in=[sent.pk, dead.pk, pending.pk]).update(created_at=old)
+        OutboxEmail.objects.filter(pk=recent.pk).update(status='sent', sent_at=timezone.now())
+
+        self.assertEqual(purge_outbox(sent_days=7, dead_days=30, chunk_size=1), 2)
+        self.assertEqual(set(OutboxEmail.objects.values_list('pk', flat=True)), {pending.pk, recent.pk})
+
+    def test_deploy_check_reminds_to_run_the_worker(self):
+        with override_settings(EMAIL_BACKEND='notifications.outbox.OutboxEmailBackend'):
+            self.assertIn('notifications.W002', [error.id for error in run_checks(include_deployment_checks=True)])
+        with override_settings(EMAIL_BACKEND='elearning.email_backend.PooledSMTPBackend'):
+            self.assertNotIn('notifications.W002', [error.id for error in run_checks(include_deployment_checks=True)])
+
+
+class NotificationStreamTests(TestCase):
+    url = '/api/notifications/stream/'
+
+    def setUp(self):
+        self.user = create_user('student')
+        self.token = str(AccessToken.for_user(self.user))
+        self.broker = InProcessBroker()
+        patcher = mock.patch('notifications.stream.get_broker', return_value=self.broker)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_wsgi_requests_are_rejected(self):
+        response = self.client.get(self.url, {'token': self.token})
+        self.assertEqual(response.status_code, 501)
+
+    async def test_requires_a_valid_token(self):
+        for params in ({}, {'token': 'not-a-token'}):
+            response = await AsyncClient().get(self.url, params)
+            self.assertEqual(response.status_code, 401)
+
+        self.user.is_active = False
+        await self.user.asave()
+        response = await AsyncClient().get(self.url, {'token': self.token})
+        self.assertEqual(response.status_code, 401)
+
+    async def test_replays_missed_events_without_duplicates(self):
+        first, second, third = [
+            await Notification.objects.acreate(user=self.user, notification_type='chat', content=f'Message {number}')
+            for number in range(3)
+        ]
+        response = await AsyncClient().get(self.url, {'token': self.token}, headers={'Last-Event-ID': str(first.id)})
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+
+        chunks = []
+
+        async def consume():
+            async for chunk in response.streaming_content:
+                chunks.append(chunk.decode())
+
+        async def wait_for_chunks(count):
+            while len(chunks) < count:
+                await asyncio.sleep(0.01)
+
+        task = asyncio.create_task(consume())
+        await asyncio.wait_for(wait_for_chunks(3), timeout=5)
+        self.assertEqual(self.broker.subscriber_count(), 1)
+
+        fourth = await Notification.objects.acreate(user=self.user, notification_type='chat', content='Message 3')
+        for notification in (third, fourth):
+            self.broker.publish(self.user.id, (notification.id, NotificationSerializer(notification).data))
+        await asyncio.wait_for(wait_for_chunks(4), timeout=5)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+        self.assertEqual(chunks[0], 'retry: 5000\n\n')
+        self.assertEqual([chunk.split('\n')[0] for chunk in chunks[1:]], [f'id: {second.id}', f'id: {third.id}', f'id: {fourth.id}'])
+        self.assertEqual(len(chunks), 4)
+        self.assertEqual(self.broker.subscriber_count(), 0)
+
+
+class RetentionJobTests(TestCase):
+    def setUp(self):
+        user = create_user('student')
+        old = timezone.now() - timedelta(days=60)
+
+        def notify(is_read=True, created_at=old):
+            notification = Notification.objects.create(user=user, notification_type='chat', content='Hello', is_read=is_read)
+            Notification.objects.filter(pk=notification.pk).update(created_at=created_at)
+            return notification
+
+        self.expired = [notify() for _ in range(3)]
+        self.kept = [notify(is_read=False), notify(created_at=timezone.now())]
+        digested = notify()
+        DigestItem.objects.create(user=user, notification=digested, subject='Hello')
+        self.kept.append(digested)
+
+    def run_job(self, **options):
+        return RetentionJob(days=30, chunk_size=2, pause=0, **options).run()
+
+    def assert_kept(self):
+        self.assertEqual(set(Notification.objects.values_list('pk', flat=True)), {notification.pk for notification in self.kept})
+        self.assertEqual(DigestItem.objects.count(), 1)
+
+    def test_archive_moves_expired_rows(self):
+        self.assertEqual(self.run_job(mode='archive'), 3)
+        self.assert_kept()
+        self.assertEqual(
+            set(ArchivedNotification.objects.values_list('pk', flat=True)), {notification.pk for notification in self.expired}
+        )
+
+    def test_delete_skips_the_archive(self):
+        self.assertEqual(self.run_job(mode='delete'), 3)
+        self.assert_kept()
+        self.assertFalse(ArchivedNotification.objects.exists())
+
+    def test_max_rows_and_rerun(self):
+        self.assertEqual(self.run_job(max_rows=2), 2)
+        self.assertEqual(Notification.objects.count(), 4)
+        # A chunk archived before a crash is archived again without duplicates
+        ArchivedNotification.objects.create(
+            id=self.expired[2].pk, user_id=self.expired[2].user_id, notification_type='chat', content='Hello',
+            created_at=timezone.now(),
+        )
+        self.assertEqual(self.run_job(), 1)
+        self.assertEqual(self.run_job(), 0)
+        self.assert_kept()
+        self.assertEqual(ArchivedNotification.objects.count(), 3)
@@ -1,11 +1,14 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import UserPreferenceViewSet, NotificationViewSet
+from .stream import notification_stream
+from .views import AnnouncementViewSet, UserPreferenceViewSet, NotificationViewSet
 
 router = DefaultRouter()
 router.register(r'platform', NotificationViewSet, basename='notification')
+router.register(r'announcements', AnnouncementViewSet, basename='announcement')
 router.register(r'preferences', UserPreferenceViewSet, basename='preference')
 
 urlpatterns = [
+    path('stream/', notification_stream, name='notification-stream'),
     path('', include(router.urls)),
 ]
@@ -1,26 +1,130 @@
 from rest_framework import viewsets, permissions
 from rest_framework.decorators import action
+from rest_framework.exceptions import PermissionDenied, ValidationError
 from rest_framework.response import Response
-from .models import Notification, NotificationPreference
-from .serializers import NotificationSerializer, UserPreferenceSerializer
+from .announcements import feed_announcements, get_unread_announcement_count, unread_announcements, visible_announcements
+from .models import Announcement, Notification, NotificationPreference
+from .serializers import AnnouncementSerializer, FeedItemSerializer, NotificationSerializer, UserPreferenceSerializer
+from .counters import get_unread_count
+from .pagination import FeedPagination, filter_until, make_since_token, merge_sources, read_cursor
 from .services import NotificationService
 
 class NotificationViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    The user's feed, newest first and cursor-paginated: their own
+    notifications merged with the announcements of their enrolled courses
+    (``kind`` tells them apart).
+
+    Pass ``?since=<cursor>`` (from a previous response) to get only the
+    items that arrived afterwards, oldest first, with the next cursor.
+    """
     serializer_class = NotificationSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = FeedPagination
 
     def get_queryset(self):
         return Notification.objects.filter(user=self.request.user)
 
+    def list(self, request, *args, **kwargs):
+        return self.feed(self.get_queryset(), feed_announcements(request.user))
+
     @action(detail=False, methods=['get'])
     def unread(self, request):
-        unread = NotificationService.get_unread_notifications(request.user)
-        serializer = self.get_serializer(unread, many=True)
-        return Response(serializer.data)
+        return self.feed(NotificationService.get_unread_notifications(request.user), unread_announcements(request.user))
+
+    def feed(self, *querysets):
+        since = self.request.query_params.get('since')
+        if since:
+            items = merge_sources(querysets, read_cursor(since), self.paginator.max_page_size, after=True)
+            serializer = FeedItemSerializer(items, many=True, context=self.get_serializer_context())
+            return Response({
+                "since": make_since_token(items[-1]) if items else since,
+                "results": serializer.data,
+            })
+
+        page = self.paginator.paginate_querysets(querysets, self.request)
+        serializer = FeedItemSerializer(page, many=True, context=self.get_serializer_context())
+        return self.paginator.get_paginated_response(serializer.data)
+
+    @action(detail=False, methods=['get'], url_path='unread-count')
+    def unread_count(self, request):
+        """Unread badge count from cached per-user counters; does not query the feed."""
+        return Response({
+            "unread_count": get_unread_count(request.user.id) + get_unread_announcement_count(request.user),
+        })
+
+    @action(detail=True, methods=['post'])
+    def mark_as_read(self, request, pk=None):
+        notification = self.get_object()
+        NotificationService.mark_as_read(request.user, notification.id)
+        return Response({"status": "marked as read"})
+
+    @action(detail=False, methods=['post'], url_path='mark-read')
+    def mark_read(self, request):
+        """
+        Mark a list of the user's notifications and announcements as read.
+        Body: {"ids": [1, 2, 3], "announcement_ids": [4]} (either list may be left out)
+        """
+        ids = request.data.get('ids')
+        announcement_ids = request.data.get('announcement_ids')
+        if ids is None and announcement_ids is None:
+            raise ValidationError({'ids': "A list of notification ids is required."})
+        for field, value in (('ids', ids), ('announcement_ids', announcement_ids)):
+            if value is not None and (not isinstance(value, list) or not all(isinstance(pk, int) for pk in value)):
+                raise ValidationError({field: "A list of ids is required."})
+
+        updated = 0
+        if ids:
+            updated += NotificationService.mark_many_as_read(request.user, Notification.objects.filter(id__in=ids))
+        if announcement_ids:
+            updated += NotificationService.mark_announcements_read(
+                request.user, Announcement.objects.filter(id__in=announcement_ids)
+            )
+        return Response({"status": "marked as read", "updated": updated})
+
+    @action(detail=False, methods=['post'], url_path='mark-all-read')
+    def mark_all_read(self, request):
+        """
+        Mark everything as read, or only up to a feed cursor.
+        Body: {"before": "<since cursor>"} (optional)
+        """
+        before = request.data.get('before')
+        notifications = filter_until(Notification.objects.all(), before) if before else None
+        announcements = filter_until(Announcement.objects.all(), before) if before else None
+        updated = NotificationService.mark_many_as_read(request.user, notifications)
+        updated += NotificationService.mark_announcements_read(request.user, announcements)
+        return Response({"status": "marked as read", "updated": updated})
+
+class AnnouncementViewSet(viewsets.ModelViewSet):
+    """
+    Course announcements. Each is stored once for its course and merged into
+    every enrolled student's feed on read, so posting to a large course is a
+    single insert. Only the course instructor (or staff) may post or delete.
+    """
+    serializer_class = AnnouncementSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    http_method_names = ['get', 'post', 'delete', 'head', 'options']
+
+    def get_queryset(self):
+        return visible_announcements(self.request.user).order_by('-created_at', '-id')
+
+    def check_course_permission(self, course):
+        user = self.request.user
+        if not (user.is_staff or course.instructor.user_id == user.id):
+            raise PermissionDenied("Only the course instructor can manage its announcements.")
+
+    def perform_create(self, serializer):
+        self.check_course_permission(serializer.validated_data['course'])
+        serializer.save(author=self.request.user)
+
+    def perform_destroy(self, instance):
+        self.check_course_permission(instance.course)
+        instance.delete()
 
     @action(detail=True, methods=['post'])
     def mark_as_read(self, request, pk=None):
-        NotificationService.mark_as_read(pk)
+        announcement = self.get_object()
+        NotificationService.mark_announcements_read(request.user, Announcement.objects.filter(id=announcement.id))
         return Response({"status": "marked as read"})
 
 class UserPreferenceViewSet(viewsets.ModelViewSet):
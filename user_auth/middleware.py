@@ -4,7 +4,7 @@ from django.core.mail import send_mail
 from django.conf import settings
 import requests
 
-from elearning.email_backend import send_email
+from elearning.email_templates import email_templates
 from .models import KnownDevice
 
 from django.core.mail import send_mail
@@ -39,34 +39,10 @@ class DeviceMiddleware:
         city = self.get_city_from_ip(ip_address)
         login_time = timezone.now().strftime("%Y-%m-%d %H:%M:%S")
         device_identifier = f"{device} - {os} - {browser}"
-        subject = 'Security Alert: New Device Login Notification'
-        
-        message = f"""
-        Dear {user.email},
-
-        We wanted to inform you that a new device has logged into your wHTa Networks account. For your security, we want to ensure that it was you who authorized this login.
-
-        Login Details:
-        Date and Time: {login_time}
-        Device: {device_identifier}
-        Location: {city}
-
-        If this login was authorized by you, no further action is needed. However, if you do not recognize this activity, please follow these steps immediately:
-        Change Your Password: [link to change password]
-        Report Unauthorized Access: Contact Support via the form on the website.
-        Review Account Activity: [link to account activities]
-
-        Your security is our priority, and we are here to assist you with any concerns.
-
-        Best Regards,
-        """
-        
-        my_email = send_email(
-            subject, 
-            message, 
-            recipient_list=[user.email],
-            use_accounts_backend=True ,
-            use_styling=False,
+        my_email = email_templates.build_message(
+            'new_device_alert',
+            {'email': user.email, 'login_time': login_time, 'device': device_identifier, 'city': city},
+            to=[user.email],
         )
         my_email.send()
         # print("Email sent")
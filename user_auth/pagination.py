@@ -0,0 +1,24 @@
+from collections import OrderedDict
+from rest_framework.pagination import CursorPagination
+from rest_framework.response import Response
+
+
+class UserDirectoryPagination(CursorPagination):
+    """
+    Keyset pagination over user ids.
+
+    The total is passed in by the view from a cached counter, so paging never
+    runs a COUNT over the users table.
+    """
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 500
+    ordering = 'id'
+
+    def get_paginated_response(self, data, count=None):
+        return Response(OrderedDict([
+            ('count', count),
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ]))
@@ -291,6 +291,11 @@ class CustomUserSerializer(serializers.ModelSerializer):
         
         return super().update(instance, validated_data)
 
+class UserDirectorySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = CustomUser
+        fields = ['id', 'username', 'email']
+
 class ProfileSerializer(serializers.ModelSerializer):
     user = CustomUserSerializer()
 
@@ -0,0 +1,32 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from elearning.dashboard_cache import bump_dashboard_versions
+from .models import CustomUser
+from .utils import adjust_role_count
+
+
+@receiver(pre_save, sender=CustomUser)
+def remember_user_role(sender, instance, update_fields=None, **kwargs):
+    # Needed to tell whether a save moved the user to another role
+    instance._previous_role = None
+    if instance.pk and (update_fields is None or 'role' in update_fields):
+        instance._previous_role = CustomUser.objects.filter(pk=instance.pk).values_list('role', flat=True).first()
+
+
+@receiver(post_save, sender=CustomUser)
+def user_saved(sender, instance, created, **kwargs):
+    if created:
+        adjust_role_count(instance.role, 1)
+    else:
+        previous_role = getattr(instance, '_previous_role', None)
+        if previous_role is None or previous_role == instance.role:
+            return
+        adjust_role_count(previous_role, -1)
+        adjust_role_count(instance.role, 1)
+    bump_dashboard_versions()
+
+
+@receiver(post_delete, sender=CustomUser)
+def user_deleted(sender, instance, **kwargs):
+    adjust_role_count(instance.role, -1)
+    bump_dashboard_versions()
@@ -1,3 +1,77 @@
+import json
+from unittest import mock
+from django.core.cache import cache
 from django.test import TestCase
+from rest_framework.test import APIRequestFactory, force_authenticate
+from .models import CustomUser, Instructor, Student
+from .utils import get_role_count
+from .views import StudentDirectoryView
 
-# Create your tests here.
+
+def create_user(name, **fields):
+    return CustomUser.objects.create_user(email=f'{name}@example.com', username=name, password='secret', **fields)
+
+
+class RoleCountTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = create_user('user')
+
+    def test_counters_follow_creates_and_deletes(self):
+        self.assertEqual(get_role_count('Student'), 1)
+        other = create_user('other')
+        self.assertEqual(get_role_count('Student'), 2)
+        other.delete()
+        self.assertEqual(get_role_count('Student'), 1)
+
+    @mock.patch('user_auth.signals.bump_dashboard_versions')
+    def test_profile_edits_leave_counters_and_dashboards_alone(self, bump):
+        self.assertEqual(get_role_count('Student'), 1)
+        self.user.first_name = 'Ada'
+        self.user.save()
+        Student.objects.create(user=self.user)
+
+        bump.assert_not_called()
+        self.assertEqual(cache.get('user_directory:count:Student'), 1)
+
+    @mock.patch('user_auth.signals.bump_dashboard_versions')
+    def test_role_change_moves_the_count(self, bump):
+        Student.objects.create(user=self.user)
+        self.assertEqual((get_role_count('Student'), get_role_count('Instructor')), (1, 0))
+        Instructor.objects.create(user=self.user)
+
+        bump.assert_called_once_with()
+        with self.assertNumQueries(0):
+            self.assertEqual((get_role_count('Student'), get_role_count('Instructor')), (0, 1))
+
+
+class UserDirectoryTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.admin = CustomUser.objects.create_superuser(email='admin@example.com', username='admin', password='secret')
+        self.students = [create_user(f'student{number}') for number in range(5)]
+
+    def get(self, params):
+        request = APIRequestFactory().get('/api/user/directory/students/', params)
+        force_authenticate(request, user=self.admin)
+        return StudentDirectoryView.as_view()(request)
+
+    def test_pages_are_keyset_paginated(self):
+        response = self.get({'page_size': 2})
+        self.assertEqual(response.data['count'], 5)
+        self.assertEqual([row['id'] for row in response.data['results']], [user.id for user in self.students[:2]])
+
+        cursor = response.data['next'].split('?', 1)[1]
+        response = self.get(dict(pair.split('=') for pair in cursor.split('&')))
+        self.assertEqual([row['id'] for row in response.data['results']], [user.id for user in self.students[2:4]])
+
+    def test_stream_exports_every_user(self):
+        response = self.get({'stream': 'true'})
+        rows = json.loads(b''.join(response.streaming_content))
+        self.assertEqual([row['username'] for row in rows], [user.username for user in self.students])
+
+    def test_false_stream_flag_paginates(self):
+        for value in ('0', 'false'):
+            response = self.get({'stream': value})
+            self.assertFalse(response.streaming)
+            self.assertEqual(len(response.data['results']), 5)
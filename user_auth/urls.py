@@ -2,7 +2,8 @@ from django.urls import path, include
 from user_auth.views import (
     SignUpView, UserLoginView, PasswordResetView, PasswordResetConfirmView, 
     VerifyOTPView,UserProfileView, StudentManagementView,
-    InstructorManagementView, TotalStudentsView, TotalInstructorsView
+    InstructorManagementView, TotalStudentsView, TotalInstructorsView,
+    StudentDirectoryView, InstructorDirectoryView
 )
 
 
@@ -17,6 +18,8 @@ urlpatterns = [
     path('profile/', UserProfileView.as_view(), name='user-profile'),
     path('total-students/', TotalStudentsView.as_view(), name='total-students'),
     path('total-instructors/', TotalInstructorsView.as_view(), name='total-instructors'),
+    path('directory/students/', StudentDirectoryView.as_view(), name='student-directory'),
+    path('directory/instructors/', InstructorDirectoryView.as_view(), name='instructor-directory'),
     path('students/<int:student_id>/', StudentManagementView.as_view(), name='student-management'),
     path('instructors/<int:instructor_id>/', InstructorManagementView.as_view(), name='instructor-management'),
 ]
\ No newline at end of file
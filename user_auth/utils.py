@@ -3,6 +3,8 @@ import string
 from django_otp.oath import TOTP
 from django_otp.util import random_hex
 import time
+from django.core.cache import cache
+from .models import CustomUser
 
 class OTPManager:
     @staticmethod
@@ -33,4 +35,22 @@ class OTPManager:
 def generate_password(length):
     characters = string.ascii_letters + string.digits
     password = ''.join(random.choice(characters) for i in range(length))
-    return password   
\ No newline at end of file
+    return password   
+
+def _role_count_key(role):
+    return f'user_directory:count:{role}'
+
+def get_role_count(role):
+    """Number of users with the given role, served from a cached counter."""
+    count = cache.get(_role_count_key(role))
+    if count is None:
+        count = CustomUser.objects.filter(role=role).count()
+        cache.add(_role_count_key(role), count, timeout=None)
+    return count
+
+def adjust_role_count(role, delta):
+    # A missing counter is recounted on the next read
+    try:
+        cache.incr(_role_count_key(role), delta)
+    except ValueError:
+        pass
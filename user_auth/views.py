@@ -23,6 +23,14 @@ from .models import Student, Administrator, Instructor
 from .serializers import StudentProfileSerializer, AdministratorProfileSerializer, InstructorProfileSerializer
 from rest_framework.exceptions import NotFound
 from django.shortcuts import get_object_or_404
+#user directory
+import json
+from django.http import StreamingHttpResponse
+from rest_framework.fields import BooleanField
+from rest_framework.permissions import IsAdminUser
+from .pagination import UserDirectoryPagination
+from .serializers import UserDirectorySerializer
+from .utils import get_role_count
 
 class SignUpView(generics.CreateAPIView):
     """
@@ -298,4 +306,45 @@ class InstructorManagementView(UserManagementView):
         return self.perform_action(request, instructor_id, 'instructor', action)
 
     def delete(self, request, instructor_id):
-        return self.perform_action(request, instructor_id, 'instructor', 'remove')
\ No newline at end of file
+        return self.perform_action(request, instructor_id, 'instructor', 'remove')
+
+class UserDirectoryView(generics.ListAPIView):
+    """
+    Keyset-paginated list of the users with one role, for the admin dashboard.
+
+    Pass ``?stream=1`` to export the whole directory as a streamed JSON array
+    that is never held in memory at once.
+    """
+    permission_classes = [IsAuthenticated, IsAdminUser]
+    serializer_class = UserDirectorySerializer
+    pagination_class = UserDirectoryPagination
+    role = None
+    stream_chunk_size = 2000
+
+    def get_queryset(self):
+        return User.objects.filter(role=self.role).only('id', 'username', 'email')
+
+    def list(self, request, *args, **kwargs):
+        if request.query_params.get('stream', '').lower() in BooleanField.TRUE_VALUES:
+            return self.stream()
+
+        page = self.paginate_queryset(self.get_queryset())
+        serializer = self.get_serializer(page, many=True)
+        return self.paginator.get_paginated_response(serializer.data, count=get_role_count(self.role))
+
+    def stream(self):
+        rows = self.get_queryset().order_by('id').values('id', 'username', 'email').iterator(chunk_size=self.stream_chunk_size)
+
+        def render():
+            yield '['
+            for index, row in enumerate(rows):
+                yield (',' if index else '') + json.dumps(row)
+            yield ']'
+
+        return StreamingHttpResponse(render(), content_type='application/json')
+
+class StudentDirectoryView(UserDirectoryView):
+    role = 'Student'
+
+class InstructorDirectoryView(UserDirectoryView):
+    role = 'Instructor'